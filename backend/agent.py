@@ -4,14 +4,13 @@ AI Agent for food parsing, nutrition analysis, and personalized recommendations
 Uses a Supervisor to orchestrate specialized Workers (NO API keys required)
 """
 
-from typing import TypedDict, List, Dict, Any, Literal
-from langgraph.graph import StateGraph, END
-from datetime import datetime
+from typing import TypedDict, List, Dict, Any, Literal, Optional
+from langgraph.constants import END
 import random
+import threading
 
 # Import utilities
 from utils.data_loader import (
-    load_food_database,
     load_user_prompts,
     load_app_config,
     load_nutrition_goals
@@ -20,10 +19,11 @@ from utils.food_parser import FoodParser
 from utils.recommendation_engine import RecommendationEngine
 from utils.gemini_nutrition import get_gemini_nutrition_lookup
 from utils.nutrition_cache import NutritionCache
-from utils.chromadb_client import ChromaDBClient
+from utils.chromadb_client import ChromaDBClient, FoodLogOperations
+from utils.pattern_store import PatternStore
+from utils.food_catalog import get_catalog_registry
 
-# Load configurations
-FOOD_DATABASE = load_food_database()
+# Load configurations (the food catalogue is shared process-wide, see utils.food_catalog)
 USER_PROMPTS = load_user_prompts()
 APP_CONFIG = load_app_config()
 NUTRITION_GOALS = load_nutrition_goals()
@@ -34,18 +34,21 @@ _nutrition_cache = None
 _gemini_lookup = None
 _food_parser = None
 _recommendation_engine = None
+_pattern_store = None
 
-def initialize_agent(chroma_client: ChromaDBClient):
-    """Initialize agent with ChromaDB client"""
-    global _chroma_client, _nutrition_cache, _gemini_lookup, _food_parser, _recommendation_engine
+def initialize_agent(chroma_client: ChromaDBClient, food_log_ops: Optional[FoodLogOperations] = None):
+    """Initialize agent with ChromaDB client (and the app's FoodLogOperations, if any)"""
+    global _chroma_client, _nutrition_cache, _gemini_lookup, _food_parser, _recommendation_engine, _pattern_store
     
     _chroma_client = chroma_client
     
     # Initialize nutrition cache
     _nutrition_cache = NutritionCache(chroma_client)
     
-    # Populate cache with static database
-    _nutrition_cache.populate_from_static_db(FOOD_DATABASE)
+    # Populate cache with static database (and follow catalogue reloads)
+    catalog_registry = get_catalog_registry()
+    _nutrition_cache.populate_from_static_db(catalog_registry.current.foods)
+    catalog_registry.subscribe(_on_catalog_reload)
     
     # Initialize Gemini lookup
     try:
@@ -56,7 +59,7 @@ def initialize_agent(chroma_client: ChromaDBClient):
     
     # Initialize food parser with cache and Gemini
     _food_parser = FoodParser(
-        FOOD_DATABASE,
+        catalog_registry,
         APP_CONFIG.get('portion_patterns', {}),
         APP_CONFIG.get('portion_sizes', {}),
         nutrition_cache=_nutrition_cache,
@@ -69,8 +72,16 @@ def initialize_agent(chroma_client: ChromaDBClient):
         USER_PROMPTS
     )
     
+    # Rolling patterns from the daily rollups that food_log_ops maintains
+    _pattern_store = PatternStore(food_log_ops or FoodLogOperations(chroma_client))
+    
     print("✅ Agent initialized with Gemini AI and nutrition cache")
 
+def _on_catalog_reload(catalog):
+    """Point the nutrition cache's static lookups at the new catalogue"""
+    if _nutrition_cache is not None:
+        _nutrition_cache.populate_from_static_db(catalog.foods)
+
 def get_food_parser():
     """Get the food parser instance"""
     return _food_parser
@@ -155,7 +166,11 @@ def food_parser_worker(state: AgentState) -> AgentState:
         return state
     
     # Parse using enhanced FoodParser utility
-    foods_found = parser.parse_food_text(text)
+    return _apply_parsed_foods(state, parser, parser.parse_food_text(text))
+
+def _apply_parsed_foods(state: AgentState, parser: FoodParser, foods_found: List[Dict]) -> AgentState:
+    """Record parser output in the state: clarification, ingredient fallback or not recognized"""
+    text = state['input_text']
     
     # Check if we need clarification
     if foods_found and foods_found[0].get('needs_clarification'):
@@ -166,8 +181,7 @@ def food_parser_worker(state: AgentState) -> AgentState:
     
     # If no exact matches, try ingredient-based estimation
     if not foods_found:
-        parser = get_food_parser()
-        ingredient_result = parser.estimate_from_ingredients(text) if parser else {'success': False}
+        ingredient_result = parser.estimate_from_ingredients(text)
         if ingredient_result['success']:
             foods_found.append({
                 'name': 'Mixed Dish (estimated)',
@@ -195,22 +209,33 @@ def food_parser_worker(state: AgentState) -> AgentState:
 
 def nutrition_worker(state: AgentState) -> AgentState:
     """Worker 2: Specialized in calculating nutrition totals"""
-    total_nutrition = {
-        'calories': sum(f['nutrition']['calories'] for f in state['parsed_foods']),
-        'protein': sum(f['nutrition']['protein'] for f in state['parsed_foods']),
-        'carbs': sum(f['nutrition']['carbs'] for f in state['parsed_foods']),
-        'fat': sum(f['nutrition']['fat'] for f in state['parsed_foods']),
-        'fiber': sum(f['nutrition']['fiber'] for f in state['parsed_foods']),
-    }
-    
-    state['nutrition_data'] = total_nutrition
+    state['nutrition_data'] = _total_nutrition(state['parsed_foods'])
     return state
 
+def _total_nutrition(foods: List[Dict]) -> Dict[str, float]:
+    """Sum the nutrition of parsed foods"""
+    return {
+        'calories': sum(f['nutrition']['calories'] for f in foods),
+        'protein': sum(f['nutrition']['protein'] for f in foods),
+        'carbs': sum(f['nutrition']['carbs'] for f in foods),
+        'fat': sum(f['nutrition']['fat'] for f in foods),
+        'fiber': sum(f['nutrition']['fiber'] for f in foods),
+    }
+
 def pattern_analyst_worker(state: AgentState) -> AgentState:
     """Worker 3: Specialized in analyzing user history"""
     user_history = state.get('user_history', [])
     engine = get_recommendation_engine()
-    patterns = engine.analyze_patterns(user_history) if engine else {}
+    
+    if engine and _pattern_store and not isinstance(user_history, list):
+        # History came from our store, so read the incrementally kept patterns instead
+        patterns = _pattern_store.get_patterns(state['user_id'], engine.thresholds)
+        if not patterns['total_meals']:
+            patterns = {'status': 'insufficient_data'}
+    else:
+        # Caller-supplied history (e.g. external API) is analyzed as given
+        patterns = engine.analyze_patterns(user_history) if engine else {}
+    
     state['patterns'] = patterns
     return state
 
@@ -286,6 +311,8 @@ def route_from_supervisor(state: AgentState) -> Literal['food_parser_worker', 'n
 # Build the Supervisor-Worker Graph
 def create_mindful_eating_agent():
     """Create the LangGraph agent workflow with Supervisor architecture"""
+    # Imported here: langgraph.graph pulls in langchain_core and takes most of a second
+    from langgraph.graph import StateGraph
     
     workflow = StateGraph(AgentState)
     
@@ -318,24 +345,28 @@ def create_mindful_eating_agent():
     
     return app
 
-# Create the agent instance
-mindful_eating_agent = create_mindful_eating_agent()
+# The agent instance is compiled on first use and shared
+_mindful_eating_agent = None
+_agent_lock = threading.Lock()
 
-def process_food_log(user_id: str, food_text: str, meal_type: str, user_history: List[Dict]) -> Dict:
-    """
-    Process food log using the Supervisor-Worker Agent
-    
-    Args:
-        user_id: User identifier
-        food_text: Text description of food
-        meal_type: Type of meal (breakfast, lunch, dinner, snack)
-        user_history: User's meal history
-    
-    Returns:
-        Dict with parsed foods, nutrition, and recommendations
-    """
-    
-    initial_state = {
+def get_mindful_eating_agent():
+    """Get the compiled Supervisor-Worker graph (built on first call)"""
+    global _mindful_eating_agent
+    if _mindful_eating_agent is None:
+        with _agent_lock:
+            if _mindful_eating_agent is None:
+                _mindful_eating_agent = create_mindful_eating_agent()
+    return _mindful_eating_agent
+
+def __getattr__(name):
+    """Keep `from agent import mindful_eating_agent` working without compiling at import"""
+    if name == 'mindful_eating_agent':
+        return get_mindful_eating_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _initial_state(user_id: str, food_text: str, meal_type: str, user_history: List[Dict]) -> AgentState:
+    """Starting state for one meal"""
+    return {
         'user_id': user_id,
         'input_text': food_text,
         'meal_type': meal_type,
@@ -352,9 +383,26 @@ def process_food_log(user_id: str, food_text: str, meal_type: str, user_history:
         'needs_clarification': False,
         'clarification_question': ''
     }
+
+def process_food_log(user_id: str, food_text: str, meal_type: str, user_history: List[Dict]) -> Dict:
+    """
+    Process food log using the Supervisor-Worker Agent
+    
+    Args:
+        user_id: User identifier
+        food_text: Text description of food
+        meal_type: Type of meal (breakfast, lunch, dinner, snack)
+        user_history: User's meal history, newest first (a UserHistoryView lets
+                      workers take date windows without another query)
+    
+    Returns:
+        Dict with parsed foods, nutrition, and recommendations
+    """
+    
+    initial_state = _initial_state(user_id, food_text, meal_type, user_history)
     
     # Run the agent
-    result = mindful_eating_agent.invoke(initial_state)
+    result = get_mindful_eating_agent().invoke(initial_state)
     
     return {
         'success': not result.get('error') or result.get('ingredient_fallback'),
@@ -368,3 +416,68 @@ def process_food_log(user_id: str, food_text: str, meal_type: str, user_history:
         'needs_clarification': result.get('needs_clarification', False),
         'clarification_question': result.get('clarification_question', '')
     }
+
+def process_food_logs(user_id: str, entries: List[Dict]) -> List[Dict]:
+    """
+    Parse many meals in one pass, without a graph run per meal
+    
+    All texts go through FoodParser.parse_food_texts together (one catalogue
+    snapshot, one Gemini batch per portion size), then through the same
+    parse and nutrition steps as the graph. Recommendations are left to
+    recommend_after_logging, once for the whole batch.
+    
+    Args:
+        user_id: User identifier
+        entries: Dicts with food_text and meal_type
+    
+    Returns:
+        One dict per entry with success, error, foods, total_nutrition,
+        user_message, needs_ingredients, needs_clarification and clarification_question
+    """
+    parser = get_food_parser()
+    if not parser:
+        return [{'success': False, 'error': 'parser_not_initialized'} for _ in entries]
+    
+    parsed = parser.parse_food_texts([entry['food_text'] for entry in entries])
+    
+    results = []
+    for entry, foods_found in zip(entries, parsed):
+        state = _apply_parsed_foods(
+            _initial_state(user_id, entry['food_text'], entry['meal_type'], []), parser, foods_found
+        )
+        failed = state['needs_clarification'] or (state['error'] and not state['ingredient_fallback'])
+        if not failed:
+            state = nutrition_worker(state)
+        
+        results.append({
+            'success': not failed,
+            'error': state['error'] or ('needs_clarification' if state['needs_clarification'] else ''),
+            'foods': state['parsed_foods'],
+            'total_nutrition': state['nutrition_data'],
+            'user_message': state['user_message'],
+            'needs_ingredients': state['needs_ingredients'],
+            'needs_clarification': state['needs_clarification'],
+            'clarification_question': state['clarification_question']
+        })
+    
+    return results
+
+def recommend_after_logging(user_id: str, total_nutrition: Dict, user_history: List[Dict]) -> Dict:
+    """
+    Patterns and recommendations for newly logged meals, computed once
+    
+    Args:
+        user_id: User identifier
+        total_nutrition: Combined nutrition of the new meals
+        user_history: User's meal history, newest first
+    
+    Returns:
+        Dict with recommendations and patterns
+    """
+    state = _initial_state(user_id, '', '', user_history)
+    state['nutrition_data'] = total_nutrition
+    state = recommendation_worker(pattern_analyst_worker(state))
+    return {
+        'recommendations': state['recommendations'],
+        'patterns': state['patterns']
+    }
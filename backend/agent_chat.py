@@ -3,19 +3,19 @@ Conversational Food Logging Agent - Enhanced LangGraph Implementation
 Handles misspellings, unknown foods, and conversational interactions
 """
 
-from typing import TypedDict, List, Dict, Any, Optional
-from langgraph.graph import StateGraph, END
-from datetime import datetime
+from typing import TypedDict, List, Dict, Any, Iterator, Tuple
+from langgraph.constants import END
 import re
-from difflib import get_close_matches
+import threading
 
 # Import utilities
-from utils.data_loader import load_food_database, load_user_prompts
+from utils.data_loader import load_user_prompts
+from utils.food_catalog import get_catalog_registry
 from utils.food_parser import FoodParser
 from utils.recommendation_engine import RecommendationEngine
+from utils.user_history import UserHistoryView
 
-# Load configurations
-FOOD_DATABASE = load_food_database()
+# Load configurations (the food catalogue is shared process-wide, see utils.food_catalog)
 USER_PROMPTS = load_user_prompts()
 
 # Define portion patterns and sizes
@@ -78,8 +78,8 @@ NUTRITION_THRESHOLDS = {
     'food_frequency_alert': 3,
 }
 
-# Initialize utilities
-food_parser = FoodParser(FOOD_DATABASE, PORTION_PATTERNS, PORTION_SIZES)
+# Initialize utilities (the parser follows the shared catalogue, including reloads)
+food_parser = FoodParser(get_catalog_registry(), PORTION_PATTERNS, PORTION_SIZES)
 recommendation_engine = RecommendationEngine(NUTRITION_THRESHOLDS, USER_PROMPTS)
 
 # Define the Conversational Agent State
@@ -135,8 +135,8 @@ def detect_intent_node(state: ConversationalAgentState) -> ConversationalAgentSt
 
 def calculate_from_ingredients(ingredients_text: str) -> Dict[str, Any]:
     """Calculate nutrition from a list of ingredients"""
+    catalog = food_parser.catalog
     ingredients = re.split(r'[,;]|\band\b', ingredients_text.lower())
-    all_food_names = list(FOOD_DATABASE.keys())
     
     total_nutrition = {
         'calories': 0,
@@ -153,25 +153,25 @@ def calculate_from_ingredients(ingredients_text: str) -> Dict[str, Any]:
         if not ingredient or len(ingredient) < 3:
             continue
         
-        # Try exact match
+        # Try exact match (longest food name in the ingredient wins)
         matched = False
-        for food_name in all_food_names:
-            if food_name in ingredient or ingredient in food_name:
-                nutrition = FOOD_DATABASE[food_name]
-                # Use smaller portions for ingredients (0.5 serving)
-                for key in total_nutrition:
-                    if key in nutrition:
-                        total_nutrition[key] += nutrition[key] * 0.5
-                found_ingredients.append(food_name.title())
-                matched = True
-                break
+        matches = catalog.name_matcher.find_longest(ingredient)
+        if matches:
+            food_name = matches[0].name
+            nutrition = catalog.foods[food_name]
+            # Use smaller portions for ingredients (0.5 serving)
+            for key in total_nutrition:
+                if key in nutrition:
+                    total_nutrition[key] += nutrition[key] * 0.5
+            found_ingredients.append(food_name.title())
+            matched = True
         
         # Try fuzzy match if no exact match
         if not matched:
-            close_matches = get_close_matches(ingredient, all_food_names, n=1, cutoff=0.6)
+            close_matches = catalog.fuzzy_index.get_close_matches(ingredient, n=1, cutoff=0.6)
             if close_matches:
                 food_name = close_matches[0]
-                nutrition = FOOD_DATABASE[food_name]
+                nutrition = catalog.foods[food_name]
                 for key in total_nutrition:
                     if key in nutrition:
                         total_nutrition[key] += nutrition[key] * 0.5
@@ -190,6 +190,7 @@ def parse_conversational_food_node(state: ConversationalAgentState) -> Conversat
     
     message = state['user_message'].lower().strip()
     conversation_history = state.get('conversation_history', [])
+    catalog = food_parser.catalog
     
     # Check if this is a confirmation response (yes/no)
     confirmation_words = ['yes', 'yeah', 'yep', 'yup', 'sure', 'ok', 'okay', 'correct', 'right']
@@ -213,8 +214,8 @@ def parse_conversational_food_node(state: ConversationalAgentState) -> Conversat
             if quoted_foods:
                 # Use the suggested food
                 food_name = quoted_foods[0].lower()
-                if food_name in FOOD_DATABASE:
-                    nutrition = FOOD_DATABASE[food_name]
+                if food_name in catalog.foods:
+                    nutrition = catalog.foods[food_name]
                     foods_found = [{
                         'name': food_name.title(),
                         'portion': 1.0,
@@ -232,8 +233,8 @@ def parse_conversational_food_node(state: ConversationalAgentState) -> Conversat
                 match = re.search(r'did you mean\s+([a-z\s]+)\?', last_agent_message)
                 if match:
                     food_name = match.group(1).strip().lower()
-                    if food_name in FOOD_DATABASE:
-                        nutrition = FOOD_DATABASE[food_name]
+                    if food_name in catalog.foods:
+                        nutrition = catalog.foods[food_name]
                         foods_found = [{
                             'name': food_name.title(),
                             'portion': 1.0,
@@ -278,7 +279,6 @@ def parse_conversational_food_node(state: ConversationalAgentState) -> Conversat
     # Extract food items with fuzzy matching
     foods_found = []
     unknown_foods = []
-    all_food_names = list(FOOD_DATABASE.keys())
     
     # Common conversational patterns
     message = re.sub(r'\b(i ate|i had|just ate|just had|for (breakfast|lunch|dinner|snack))\b', '', message)
@@ -292,41 +292,41 @@ def parse_conversational_food_node(state: ConversationalAgentState) -> Conversat
         if not food_text or len(food_text) < 3:
             continue
         
-        # Try exact match first
+        # Try exact match first (longest food name in the fragment wins)
         matched = False
-        for food_name in all_food_names:
-            if food_name in food_text:
-                # Use shared FoodParser logic for base portion (oz, cups, grams, etc.)
-                portion, portion_text = food_parser.parse_portion(food_text)
+        matches = catalog.name_matcher.find_longest(food_text)
+        if matches:
+            food_name = matches[0].name
+            # Use shared FoodParser logic for base portion (oz, cups, grams, etc.)
+            portion, portion_text = food_parser.parse_portion(food_text)
 
-                # Detect count multiplier like "3 burger" or "two pizza" and apply it
-                count_multiplier = _extract_count_multiplier(food_text, food_name)
-                if count_multiplier != 1.0:
-                    portion *= count_multiplier
-                    if portion_text and portion_text != "1 serving":
-                        count_str = str(int(count_multiplier)) if count_multiplier.is_integer() else str(count_multiplier)
-                        portion_text = f"{count_str} x {portion_text}"
-                    else:
-                        count_str = str(int(count_multiplier)) if count_multiplier.is_integer() else str(count_multiplier)
-                        portion_text = f"{count_str} serving{'s' if count_multiplier != 1 else ''}"
+            # Detect count multiplier like "3 burger" or "two pizza" and apply it
+            count_multiplier = _extract_count_multiplier(food_text, food_name)
+            if count_multiplier != 1.0:
+                portion *= count_multiplier
+                if portion_text and portion_text != "1 serving":
+                    count_str = str(int(count_multiplier)) if count_multiplier.is_integer() else str(count_multiplier)
+                    portion_text = f"{count_str} x {portion_text}"
+                else:
+                    count_str = str(int(count_multiplier)) if count_multiplier.is_integer() else str(count_multiplier)
+                    portion_text = f"{count_str} serving{'s' if count_multiplier != 1 else ''}"
 
-                nutrition = FOOD_DATABASE[food_name]
-                portioned_nutrition = {
-                    k: round(v * portion, 1) 
-                    for k, v in nutrition.items() 
-                    if k != 'category'
-                }
-                
-                foods_found.append({
-                    'name': food_name.title(),
-                    'portion': portion,
-                    'portion_text': portion_text,
-                    'nutrition': portioned_nutrition,
-                    'category': nutrition['category'],
-                    'confidence': 1.0
-                })
-                matched = True
-                break
+            nutrition = catalog.foods[food_name]
+            portioned_nutrition = {
+                k: round(v * portion, 1) 
+                for k, v in nutrition.items() 
+                if k != 'category'
+            }
+            
+            foods_found.append({
+                'name': food_name.title(),
+                'portion': portion,
+                'portion_text': portion_text,
+                'nutrition': portioned_nutrition,
+                'category': nutrition['category'],
+                'confidence': 1.0
+            })
+            matched = True
         
         # If no exact match, try fuzzy matching
         if not matched:
@@ -335,12 +335,12 @@ def parse_conversational_food_node(state: ConversationalAgentState) -> Conversat
             
             if food_word:
                 # Find close matches
-                close_matches = get_close_matches(food_word, all_food_names, n=3, cutoff=0.6)
+                close_matches = catalog.fuzzy_index.get_close_matches(food_word, n=3, cutoff=0.6)
                 
                 if close_matches:
                     # Use the best match
                     best_match = close_matches[0]
-                    nutrition = FOOD_DATABASE[best_match]
+                    nutrition = catalog.foods[best_match]
                     
                     foods_found.append({
                         'name': best_match.title(),
@@ -361,10 +361,12 @@ def parse_conversational_food_node(state: ConversationalAgentState) -> Conversat
             from utils.gemini_nutrition import get_gemini_nutrition_lookup
             gemini = get_gemini_nutrition_lookup()
             
+            # Ask Gemini AI about all unknown foods in one request
+            print(f"🔍 Asking Gemini about: {', '.join(unknown_foods)}")
+            gemini_results = gemini.get_nutrition_batch(unknown_foods, "1 serving")
+            
             for unknown_food in unknown_foods:
-                # Ask Gemini AI
-                print(f"🔍 Asking Gemini about: {unknown_food}")
-                gemini_result = gemini.get_nutrition_data(unknown_food, "1 serving")
+                gemini_result = gemini_results.get(unknown_food)
                 
                 if gemini_result:
                     # Add Gemini result to foods_found
@@ -493,7 +495,10 @@ def generate_recommendations_node(state: ConversationalAgentState) -> Conversati
     # Analyze patterns from history
     patterns = {}
     if user_history:
-        recent_logs = user_history[-14:]  # Last 2 weeks
+        if isinstance(user_history, UserHistoryView):
+            recent_logs = user_history.last_days(14)  # Last 2 weeks
+        else:
+            recent_logs = user_history[-14:]  # Last 2 weeks
         food_frequency = {}
         for log in recent_logs:
             for food in log.get('foods', []):
@@ -534,6 +539,8 @@ def should_continue(state: ConversationalAgentState) -> str:
 # Build the Conversational LangGraph Agent
 def create_conversational_agent():
     """Create the conversational LangGraph agent workflow"""
+    # Imported here: langgraph.graph pulls in langchain_core and takes most of a second
+    from langgraph.graph import StateGraph
     
     workflow = StateGraph(ConversationalAgentState)
     
@@ -575,29 +582,29 @@ def create_conversational_agent():
     
     return app
 
-# Create the agent instance
-conversational_agent = create_conversational_agent()
+# The agent instance is compiled on first use and shared
+_conversational_agent = None
+_agent_lock = threading.Lock()
 
-def process_conversational_message(
-    user_id: str, 
-    message: str, 
-    conversation_history: List[Dict[str, str]],
-    user_history: List[Dict]
-) -> Dict:
-    """
-    Process a conversational message from the user
-    
-    Args:
-        user_id: User identifier
-        message: User's message
-        conversation_history: Previous conversation messages
-        user_history: User's meal history
-    
-    Returns:
-        Dict with agent response, parsed foods, and recommendations
-    """
-    
-    initial_state = {
+def get_conversational_agent():
+    """Get the compiled conversational graph (built on first call)"""
+    global _conversational_agent
+    if _conversational_agent is None:
+        with _agent_lock:
+            if _conversational_agent is None:
+                _conversational_agent = create_conversational_agent()
+    return _conversational_agent
+
+def __getattr__(name):
+    """Keep `from agent_chat import conversational_agent` working without compiling at import"""
+    if name == 'conversational_agent':
+        return get_conversational_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _initial_state(user_id: str, message: str, conversation_history: List[Dict[str, str]],
+                   user_history: List[Dict]) -> ConversationalAgentState:
+    """Starting graph state for one message"""
+    return {
         'user_id': user_id,
         'user_message': message,
         'conversation_history': conversation_history,
@@ -614,10 +621,9 @@ def process_conversational_message(
         'confidence': 1.0,
         'step': 'initial'
     }
-    
-    # Run the agent
-    result = conversational_agent.invoke(initial_state)
-    
+
+def _final_result(result: Dict) -> Dict:
+    """Shape the final graph state into the API response"""
     needs_clarification = result.get('needs_clarification', False)
     agent_response = (result.get('agent_response') or '').strip()
     clarification_question = (result.get('clarification_question') or '').strip()
@@ -634,4 +640,74 @@ def process_conversational_message(
         'needs_clarification': needs_clarification,
         'clarification_question': clarification_question,
         'intent': result.get('intent', 'log_food')
-    }
\ No newline at end of file
+    }
+
+def process_conversational_message(
+    user_id: str, 
+    message: str, 
+    conversation_history: List[Dict[str, str]],
+    user_history: List[Dict]
+) -> Dict:
+    """
+    Process a conversational message from the user
+    
+    Args:
+        user_id: User identifier
+        message: User's message
+        conversation_history: Previous conversation messages
+        user_history: User's meal history, newest first (a UserHistoryView lets
+                      the pipeline take date windows without another query)
+    
+    Returns:
+        Dict with agent response, parsed foods, and recommendations
+    """
+    initial_state = _initial_state(user_id, message, conversation_history, user_history)
+    
+    # Run the agent
+    result = get_conversational_agent().invoke(initial_state)
+    
+    return _final_result(result)
+
+# What each node contributes to the stream: (event name, fields taken from the state)
+STREAM_EVENTS = {
+    'detect_intent': ('intent', lambda state: {'intent': state['intent']}),
+    'parse_food': ('foods', lambda state: {
+        'foods': state['parsed_foods'],
+        'needs_clarification': state['needs_clarification'],
+        'clarification_question': state['clarification_question']
+    }),
+    'calculate_nutrition': ('nutrition', lambda state: {'total_nutrition': state['nutrition_data']}),
+    'generate_response': ('response', lambda state: {'agent_response': state['agent_response']}),
+    'generate_recommendations': ('recommendations', lambda state: {'recommendations': state['recommendations']}),
+}
+
+def stream_conversational_message(
+    user_id: str,
+    message: str,
+    conversation_history: List[Dict[str, str]],
+    user_history: List[Dict]
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    Process a message like process_conversational_message, yielding as each node finishes
+    
+    Args:
+        user_id: User identifier
+        message: User's message
+        conversation_history: Previous conversation messages
+        user_history: User's meal history, newest first
+    
+    Yields:
+        (event, data) pairs from STREAM_EVENTS in graph order, then
+        ('result', <the process_conversational_message dict>)
+    """
+    state = _initial_state(user_id, message, conversation_history, user_history)
+    
+    for update in get_conversational_agent().stream(state, stream_mode='updates'):
+        for node, node_state in update.items():
+            if node_state:
+                state.update(node_state)
+            if node in STREAM_EVENTS:
+                event, fields = STREAM_EVENTS[node]
+                yield event, fields(state)
+    
+    yield 'result', _final_result(state)
@@ -2,6 +2,6 @@
 API Package Initialization
 """
 
-from .external import external_api
+from .external import external_api, init_external_api
 
-__all__ = ['external_api']
+__all__ = ['external_api', 'init_external_api']
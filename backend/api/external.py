@@ -6,20 +6,29 @@ Production-grade with proper error handling and validation
 
 from flask import Blueprint, request, jsonify
 from agent import process_food_log
-from utils.chromadb_client import ChromaDBClient, FoodLogOperations
-import os
+from utils.chromadb_client import FoodLogOperations, get_chroma_client
+from utils.user_history import UserHistoryView
 
 # Create Blueprint for external API
 external_api = Blueprint('external_api', __name__, url_prefix='/api/v1/agent')
 
-# Initialize ChromaDB client
-try:
-    chroma_client = ChromaDBClient()
-    food_log_ops = FoodLogOperations(chroma_client)
-except Exception as e:
-    print(f"Warning: ChromaDB not available for external API: {e}")
-    chroma_client = None
-    food_log_ops = None
+# Set by the app (init_external_api) so the blueprint shares its ChromaDB connection
+_food_log_ops = None
+
+def init_external_api(food_log_ops: FoodLogOperations):
+    """Use the app's FoodLogOperations (and so its ChromaDB client)"""
+    global _food_log_ops
+    _food_log_ops = food_log_ops
+
+def get_food_log_ops():
+    """Shared FoodLogOperations; built from the shared client on first use if the app did not set one"""
+    global _food_log_ops
+    if _food_log_ops is None:
+        try:
+            _food_log_ops = FoodLogOperations(get_chroma_client())
+        except Exception as e:
+            print(f"Warning: ChromaDB not available for external API: {e}")
+    return _food_log_ops
 
 @external_api.route('/health', methods=['GET'])
 def health_check():
@@ -27,7 +36,7 @@ def health_check():
     Health check endpoint for supervisor systems
     Returns system status and availability
     """
-    db_status = "connected" if chroma_client else "disconnected"
+    db_status = "connected" if get_food_log_ops() else "disconnected"
     
     return jsonify({
         "status": "healthy",
@@ -101,9 +110,10 @@ def process_food_external():
         user_history = data.get('user_history', [])
         
         # If no history provided and MongoDB is available, fetch from DB
+        food_log_ops = get_food_log_ops()
         if not user_history and food_log_ops:
             try:
-                user_history = food_log_ops.get_recent_logs(user_id, days=14)
+                user_history = UserHistoryView.load(food_log_ops, user_id, days=14)
             except Exception as e:
                 print(f"Could not fetch user history: {e}")
                 user_history = []
@@ -8,10 +8,12 @@ import warnings
 warnings.filterwarnings('ignore', category=RuntimeWarning)
 warnings.filterwarnings('ignore', message='.*MINGW-W64.*')
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for, stream_with_context
 from flask_session import Session
 from flask_cors import CORS
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import atexit
 import json
 import os
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -19,21 +21,27 @@ from collections import defaultdict
 import re
 
 # Import LangGraph Agents
-from agent import process_food_log, mindful_eating_agent, initialize_agent
-from agent_chat import process_conversational_message
+from agent import process_food_log, process_food_logs, recommend_after_logging, initialize_agent
+from agent_chat import process_conversational_message, stream_conversational_message
 
 # Import ChromaDB utilities
 from utils.chromadb_client import (
-    ChromaDBClient, 
+    get_chroma_client,
     UserOperations, 
     FoodLogOperations,
     SessionOperations,
-    ChatLogOperations
+    ChatLogOperations,
+    MigrationOperations
 )
 from utils.chroma_session import ChromaSessionInterface
+from utils.chat_log_writer import ChatLogWriter
+from utils.session_sweeper import SessionSweeper
+from utils.food_catalog import get_food_catalog, reload_on_signal
+from utils.user_history import UserHistoryView
+from utils.pattern_store import PatternStore
 
 # Import External API for supervisor integration
-from api.external import external_api
+from api.external import external_api, init_external_api
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -51,19 +59,29 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 # Initialize ChromaDB
 try:
     print("🔌 Connecting to ChromaDB...")
-    chroma_client = ChromaDBClient()
+    chroma_client = get_chroma_client()
     
     # Initialize database operations
     user_ops = UserOperations(chroma_client)
     food_log_ops = FoodLogOperations(chroma_client)
     session_ops = SessionOperations(chroma_client)
     chat_log_ops = ChatLogOperations(chroma_client)
+    pattern_store = PatternStore(food_log_ops)
+    migrations = MigrationOperations(chroma_client)
+    
+    # Older logs need numeric time keys before range queries can see them
+    # (each backfill runs once per database, then a marker row skips it)
+    migrations.run_once('food_log_time_keys', food_log_ops.backfill_timestamps)
+    # ...and older sessions need a numeric expiry before the sweeper can find them
+    migrations.run_once('session_expiry_keys', session_ops.backfill_expiry)
+    # ...and users created with random ids move to their email-derived id
+    migrations.run_once('user_email_ids', user_ops.backfill_user_ids)
     
     print("✅ ChromaDB initialized successfully")
     
     # Initialize AI agent with ChromaDB and Gemini
     print("🤖 Initializing AI agent...")
-    initialize_agent(chroma_client)
+    initialize_agent(chroma_client, food_log_ops)
     print("✅ AI agent initialized")
     
 except Exception as e:
@@ -81,72 +99,27 @@ except Exception as e:
 # Set custom session interface for ChromaDB
 app.session_interface = ChromaSessionInterface(session_ops)
 
-# Register External API Blueprint for supervisor integration
-app.register_blueprint(external_api)
+# kill -HUP <pid> reloads the food catalogue after the food JSON is edited
+reload_on_signal()
 
-# Comprehensive nutritional database
-FOOD_DATABASE = {
-    # Proteins
-    'chicken breast': {'calories': 165, 'protein': 31, 'carbs': 0, 'fat': 3.6, 'fiber': 0, 'category': 'protein'},
-    'grilled chicken': {'calories': 165, 'protein': 31, 'carbs': 0, 'fat': 3.6, 'fiber': 0, 'category': 'protein'},
-    'chicken': {'calories': 165, 'protein': 31, 'carbs': 0, 'fat': 3.6, 'fiber': 0, 'category': 'protein'},
-    'salmon': {'calories': 206, 'protein': 22, 'carbs': 0, 'fat': 13, 'fiber': 0, 'category': 'protein'},
-    'fish': {'calories': 206, 'protein': 22, 'carbs': 0, 'fat': 13, 'fiber': 0, 'category': 'protein'},
-    'tuna': {'calories': 132, 'protein': 28, 'carbs': 0, 'fat': 1.3, 'fiber': 0, 'category': 'protein'},
-    'beef': {'calories': 250, 'protein': 26, 'carbs': 0, 'fat': 15, 'fiber': 0, 'category': 'protein'},
-    'steak': {'calories': 250, 'protein': 26, 'carbs': 0, 'fat': 15, 'fiber': 0, 'category': 'protein'},
-    'turkey': {'calories': 135, 'protein': 30, 'carbs': 0, 'fat': 0.7, 'fiber': 0, 'category': 'protein'},
-    'pork': {'calories': 242, 'protein': 27, 'carbs': 0, 'fat': 14, 'fiber': 0, 'category': 'protein'},
-    'eggs': {'calories': 155, 'protein': 13, 'carbs': 1.1, 'fat': 11, 'fiber': 0, 'category': 'protein'},
-    'egg': {'calories': 78, 'protein': 6.5, 'carbs': 0.6, 'fat': 5.5, 'fiber': 0, 'category': 'protein'},
-    'tofu': {'calories': 76, 'protein': 8, 'carbs': 1.9, 'fat': 4.8, 'fiber': 0.3, 'category': 'protein'},
-    
-    # Carbs
-    'brown rice': {'calories': 216, 'protein': 5, 'carbs': 45, 'fat': 1.8, 'fiber': 3.5, 'category': 'carbs'},
-    'white rice': {'calories': 205, 'protein': 4.3, 'carbs': 45, 'fat': 0.4, 'fiber': 0.6, 'category': 'carbs'},
-    'rice': {'calories': 205, 'protein': 4.3, 'carbs': 45, 'fat': 0.4, 'fiber': 0.6, 'category': 'carbs'},
-    'quinoa': {'calories': 222, 'protein': 8, 'carbs': 39, 'fat': 3.6, 'fiber': 5.2, 'category': 'carbs'},
-    'pasta': {'calories': 221, 'protein': 8, 'carbs': 43, 'fat': 1.3, 'fiber': 2.5, 'category': 'carbs'},
-    'bread': {'calories': 265, 'protein': 9, 'carbs': 49, 'fat': 3.2, 'fiber': 2.7, 'category': 'carbs'},
-    'toast': {'calories': 79, 'protein': 2.6, 'carbs': 15, 'fat': 1, 'fiber': 0.8, 'category': 'carbs'},
-    'bagel': {'calories': 289, 'protein': 11, 'carbs': 56, 'fat': 2, 'fiber': 2.3, 'category': 'carbs'},
-    'oatmeal': {'calories': 158, 'protein': 6, 'carbs': 27, 'fat': 3.2, 'fiber': 4, 'category': 'carbs'},
-    'potato': {'calories': 163, 'protein': 4.3, 'carbs': 37, 'fat': 0.2, 'fiber': 2.5, 'category': 'carbs'},
-    'sweet potato': {'calories': 180, 'protein': 4, 'carbs': 41, 'fat': 0.3, 'fiber': 6.6, 'category': 'carbs'},
-    
-    # Vegetables
-    'broccoli': {'calories': 55, 'protein': 3.7, 'carbs': 11, 'fat': 0.6, 'fiber': 2.4, 'category': 'vegetables'},
-    'spinach': {'calories': 23, 'protein': 2.9, 'carbs': 3.6, 'fat': 0.4, 'fiber': 2.2, 'category': 'vegetables'},
-    'carrots': {'calories': 41, 'protein': 0.9, 'carbs': 10, 'fat': 0.2, 'fiber': 2.8, 'category': 'vegetables'},
-    'tomato': {'calories': 18, 'protein': 0.9, 'carbs': 3.9, 'fat': 0.2, 'fiber': 1.2, 'category': 'vegetables'},
-    'lettuce': {'calories': 15, 'protein': 1.4, 'carbs': 2.9, 'fat': 0.2, 'fiber': 1.3, 'category': 'vegetables'},
-    'cucumber': {'calories': 16, 'protein': 0.7, 'carbs': 3.6, 'fat': 0.1, 'fiber': 0.5, 'category': 'vegetables'},
-    'bell pepper': {'calories': 31, 'protein': 1, 'carbs': 6, 'fat': 0.3, 'fiber': 2.1, 'category': 'vegetables'},
-    'onion': {'calories': 40, 'protein': 1.1, 'carbs': 9.3, 'fat': 0.1, 'fiber': 1.7, 'category': 'vegetables'},
-    'mushroom': {'calories': 22, 'protein': 3.1, 'carbs': 3.3, 'fat': 0.3, 'fiber': 1, 'category': 'vegetables'},
-    
-    # Dairy
-    'milk': {'calories': 149, 'protein': 8, 'carbs': 12, 'fat': 8, 'fiber': 0, 'category': 'dairy'},
-    'cheese': {'calories': 402, 'protein': 25, 'carbs': 1.3, 'fat': 33, 'fiber': 0, 'category': 'dairy'},
-    'yogurt': {'calories': 59, 'protein': 10, 'carbs': 3.6, 'fat': 0.4, 'fiber': 0, 'category': 'dairy'},
-    'greek yogurt': {'calories': 100, 'protein': 17, 'carbs': 6, 'fat': 0.7, 'fiber': 0, 'category': 'dairy'},
-    'cream cheese': {'calories': 99, 'protein': 2, 'carbs': 1.6, 'fat': 10, 'fiber': 0, 'category': 'dairy'},
-    
-    # Fast Food / Treats
-    'pizza': {'calories': 285, 'protein': 12, 'carbs': 36, 'fat': 10, 'fiber': 2.5, 'category': 'fast_food'},
-    'burger': {'calories': 354, 'protein': 20, 'carbs': 30, 'fat': 17, 'fiber': 1.5, 'category': 'fast_food'},
-    'fries': {'calories': 312, 'protein': 3.4, 'carbs': 41, 'fat': 15, 'fiber': 3.8, 'category': 'fast_food'},
-    'donut': {'calories': 269, 'protein': 3, 'carbs': 31, 'fat': 15, 'fiber': 0.9, 'category': 'treats'},
-    'cookie': {'calories': 142, 'protein': 2, 'carbs': 20, 'fat': 6.5, 'fiber': 0.7, 'category': 'treats'},
-    'ice cream': {'calories': 207, 'protein': 3.5, 'carbs': 24, 'fat': 11, 'fiber': 0.7, 'category': 'treats'},
-    
-    # Fruits
-    'apple': {'calories': 95, 'protein': 0.5, 'carbs': 25, 'fat': 0.3, 'fiber': 4.4, 'category': 'fruits'},
-    'banana': {'calories': 105, 'protein': 1.3, 'carbs': 27, 'fat': 0.4, 'fiber': 3.1, 'category': 'fruits'},
-    'orange': {'calories': 62, 'protein': 1.2, 'carbs': 15, 'fat': 0.2, 'fiber': 3.1, 'category': 'fruits'},
-    'berries': {'calories': 57, 'protein': 1.1, 'carbs': 14, 'fat': 0.5, 'fiber': 2.4, 'category': 'fruits'},
-    'strawberry': {'calories': 32, 'protein': 0.7, 'carbs': 7.7, 'fat': 0.3, 'fiber': 2, 'category': 'fruits'},
-}
+# Expired sessions are deleted in the background. Every worker process imports
+# this module, so with several workers set SESSION_SWEEPER_ENABLED=false and
+# run one sweeper on its own: python -m utils.session_sweeper
+session_sweeper = SessionSweeper(
+    session_ops,
+    interval=float(os.getenv('SESSION_SWEEP_INTERVAL_SECONDS', '3600')),
+    batch_size=int(os.getenv('SESSION_SWEEP_BATCH_SIZE', '500'))
+)
+if os.getenv('SESSION_SWEEPER_ENABLED', 'true').lower() == 'true':
+    session_sweeper.start()
+    atexit.register(session_sweeper.stop)
+
+# Runs history queries for streamed chat replies alongside the agent's first steps
+history_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='history')
+
+# Register External API Blueprint for supervisor integration (shares this app's ChromaDB client)
+init_external_api(food_log_ops)
+app.register_blueprint(external_api)
 
 def parse_food_text(text):
     """
@@ -164,105 +137,63 @@ def parse_food_text(text):
         'serving': r'(\d+\.?\d*)\s*(?:serving|servings)',
     }
     
-    # Find all foods in the database that match
-    for food_name, nutrition in FOOD_DATABASE.items():
-        if food_name in text:
-            portion = 1.0  # default serving
-            portion_text = ""
-            
-            # Check for portion specifications
-            if 'oz' in text or 'ounce' in text:
-                match = re.search(portion_patterns['oz'], text)
-                if match:
-                    oz_amount = float(match.group(1))
-                    portion = oz_amount / 4  # 4oz = 1 serving
-                    portion_text = f"{oz_amount} oz"
-            
-            elif 'cup' in text:
-                match = re.search(portion_patterns['cup'], text)
-                if match:
-                    cup_str = match.group(1)
-                    if cup_str in ['1/2', 'half']:
-                        portion = 0.5
-                        portion_text = "1/2 cup"
-                    else:
-                        portion = float(cup_str)
-                        portion_text = f"{portion} cup"
-            
-            elif 'gram' in text or ' g ' in text:
-                match = re.search(portion_patterns['gram'], text)
-                if match:
-                    grams = float(match.group(1))
-                    portion = grams / 100  # 100g = 1 serving
-                    portion_text = f"{grams}g"
-            
-            # Calculate nutrition for this portion
-            portioned_nutrition = {
-                k: round(v * portion, 1) 
-                for k, v in nutrition.items() 
-                if k != 'category'
-            }
-            
-            foods_found.append({
-                'name': food_name.title(),
-                'portion': portion,
-                'portion_text': portion_text or f"{portion} serving",
-                'nutrition': portioned_nutrition,
-                'category': nutrition['category']
-            })
+    # Find all foods in the text in one pass (longest name wins)
+    catalog = get_food_catalog()
+    for food_name in catalog.name_matcher.find_names(text):
+        nutrition = catalog.foods[food_name]
+        portion = 1.0  # default serving
+        portion_text = ""
+        
+        # Check for portion specifications
+        if 'oz' in text or 'ounce' in text:
+            match = re.search(portion_patterns['oz'], text)
+            if match:
+                oz_amount = float(match.group(1))
+                portion = oz_amount / 4  # 4oz = 1 serving
+                portion_text = f"{oz_amount} oz"
+        
+        elif 'cup' in text:
+            match = re.search(portion_patterns['cup'], text)
+            if match:
+                cup_str = match.group(1)
+                if cup_str in ['1/2', 'half']:
+                    portion = 0.5
+                    portion_text = "1/2 cup"
+                else:
+                    portion = float(cup_str)
+                    portion_text = f"{portion} cup"
+        
+        elif 'gram' in text or ' g ' in text:
+            match = re.search(portion_patterns['gram'], text)
+            if match:
+                grams = float(match.group(1))
+                portion = grams / 100  # 100g = 1 serving
+                portion_text = f"{grams}g"
+        
+        # Calculate nutrition for this portion
+        portioned_nutrition = {
+            k: round(v * portion, 1) 
+            for k, v in nutrition.items() 
+            if k != 'category'
+        }
+        
+        foods_found.append({
+            'name': food_name.title(),
+            'portion': portion,
+            'portion_text': portion_text or f"{portion} serving",
+            'nutrition': portioned_nutrition,
+            'category': nutrition['category']
+        })
     
     return foods_found
 
 def analyze_eating_patterns(user_id):
-    """Analyze user's eating patterns for recommendations"""
-    logs = food_log_ops.get_recent_logs(user_id, days=14)
+    """Analyze user's eating patterns for recommendations (last 14 days, from daily rollups)"""
+    patterns = pattern_store.get_patterns(user_id, {'low_protein': 80, 'high_calories': 2200})
     
-    if not logs:
+    if not patterns['total_meals']:
         return None
     
-    recent_logs = logs  # Already filtered to last 2 weeks
-    
-    patterns = {
-        'total_meals': len(recent_logs),
-        'avg_calories': 0,
-        'avg_protein': 0,
-        'food_frequency': defaultdict(int),
-        'meal_times': defaultdict(int),
-        'low_protein_days': 0,
-        'high_calorie_days': 0,
-    }
-    
-    daily_totals = defaultdict(lambda: {'calories': 0, 'protein': 0})
-    
-    for log in recent_logs:
-        # Handle both string and datetime timestamps
-        if isinstance(log['timestamp'], str):
-            date = log['timestamp'].split('T')[0]
-        else:
-            date = log['timestamp'].date().isoformat()
-        
-        daily_totals[date]['calories'] += log['total_nutrition']['calories']
-        daily_totals[date]['protein'] += log['total_nutrition']['protein']
-        
-        # Track food frequency
-        for food in log['foods']:
-            patterns['food_frequency'][food['name']] += 1
-        
-        # Track meal times
-        hour = int(log['timestamp'].split('T')[1].split(':')[0])
-        patterns['meal_times'][log['meal_type']] += 1
-    
-    # Calculate averages
-    if daily_totals:
-        patterns['avg_calories'] = sum(d['calories'] for d in daily_totals.values()) / len(daily_totals)
-        patterns['avg_protein'] = sum(d['protein'] for d in daily_totals.values()) / len(daily_totals)
-        
-        for day_data in daily_totals.values():
-            if day_data['protein'] < 80:
-                patterns['low_protein_days'] += 1
-            if day_data['calories'] > 2200:
-                patterns['high_calorie_days'] += 1
-    
     return patterns
 
 def generate_recommendations(user_id):
@@ -278,11 +209,11 @@ def generate_recommendations(user_id):
         })
         return recommendations
     
-    # Get today's logs
-    today_logs = food_log_ops.get_today_logs(user_id)
+    # Get today's totals from the daily rollup
+    today_total = food_log_ops.get_daily_total(user_id)
     
-    today_protein = sum(log['total_nutrition']['protein'] for log in today_logs)
-    today_calories = sum(log['total_nutrition']['calories'] for log in today_logs)
+    today_protein = today_total['protein']
+    today_calories = today_total['calories']
     
     # Protein recommendation
     if today_protein < 60:
@@ -299,7 +230,7 @@ def generate_recommendations(user_id):
             'message': f"You've consumed {round(today_calories)} calories today. Consider lighter options for your next meal.",
             'icon': '⚠️'
         })
-    elif today_calories < 1200 and len(today_logs) >= 2:
+    elif today_calories < 1200 and today_total['log_count'] >= 2:
         recommendations.append({
             'type': 'calories',
             'message': f"You're at {round(today_calories)} calories. Make sure you're eating enough to fuel your body!",
@@ -337,38 +268,21 @@ def generate_recommendations(user_id):
 
 # Chat logging utilities
 CHAT_LOG_DIR = os.path.join(os.path.dirname(__file__), 'chat_logs')
-os.makedirs(CHAT_LOG_DIR, exist_ok=True)
+
+# Chat logs are written behind the request: daily NDJSON files plus bulk ChromaDB adds
+chat_log_writer = ChatLogWriter(
+    chat_log_ops,
+    CHAT_LOG_DIR,
+    max_pending=int(os.getenv('CHAT_LOG_MAX_PENDING', '10000')),
+    compress=os.getenv('CHAT_LOG_COMPRESS', 'false').lower() == 'true'
+)
+atexit.register(chat_log_writer.close)
 
 
 def log_chat_interaction(user_id, message, result, status='success'):
-    """Persist chat interactions (prompt + response) to JSON file and ChromaDB."""
+    """Queue a chat interaction (prompt + response) for the NDJSON log and ChromaDB."""
     try:
-        timestamp = datetime.utcnow().isoformat()
-        log_entry = {
-            'user_id': user_id,
-            'timestamp': timestamp,
-            'status': status,
-            'message': message,
-            'agent_response': result.get('agent_response'),
-            'foods': result.get('foods', []),
-            'total_nutrition': result.get('total_nutrition', {}),
-            'recommendations': result.get('recommendations', []),
-            'intent': result.get('intent'),
-            'needs_clarification': result.get('needs_clarification', False),
-        }
-
-        # Write JSON file per interaction
-        safe_user = str(user_id).replace('@', '_at_').replace('.', '_')
-        filename = f"chat_{safe_user}_{timestamp.replace(':', '-').replace('.', '-')}.json"
-        filepath = os.path.join(CHAT_LOG_DIR, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(log_entry, f, ensure_ascii=False, indent=2)
-
-        # Store in ChromaDB (chat_logs collection)
-        try:
-            chat_log_ops.create_chat_log(user_id, message, result, status)
-        except Exception as e:
-            print(f"⚠️ Failed to save chat log to ChromaDB: {e}")
+        chat_log_writer.submit(user_id, message, result, status)
     except Exception as e:
         print(f"⚠️ Failed to log chat interaction: {e}")
 
@@ -383,6 +297,10 @@ def health_check():
         chroma_client.client.heartbeat()
     except Exception:
         db_status = "disconnected"
+    
+    from utils.gemini_nutrition import get_gemini_lookup_stats
+    
+    catalog = get_food_catalog()
         
     return jsonify({
         'status': 'healthy',
@@ -390,6 +308,10 @@ def health_check():
         'timestamp': datetime.utcnow().isoformat(),
         'database': 'ChromaDB',
         'database_status': db_status,
+        'gemini_lookups': get_gemini_lookup_stats(),
+        'food_catalog': {'version': catalog.version, 'foods': len(catalog)},
+        'chat_log_queue': chat_log_writer.get_stats(),
+        'session_sweeper': session_sweeper.get_stats(),
         'version': '1.0.0'
     })
 
@@ -455,11 +377,6 @@ def register():
         daily_carbs = request.form.get('daily_carbs', type=int)
         daily_fat = request.form.get('daily_fat', type=int)
         
-        if user_ops.user_exists(email):
-            if request.content_type == 'application/x-www-form-urlencoded':
-                return render_template('register.html', error='Email already registered')
-            return jsonify({'error': 'Email already registered'}), 400
-        
         password_hash = generate_password_hash(password)
         
         # Create custom goals dictionary
@@ -470,8 +387,14 @@ def register():
             'daily_fat': daily_fat or 65
         }
         
+        # create_user checks for an existing account itself
         result = user_ops.create_user(email, name, password_hash, custom_goals)
         
+        if result.get('error') == 'User already exists':
+            if request.content_type == 'application/x-www-form-urlencoded':
+                return render_template('register.html', error='Email already registered')
+            return jsonify({'error': 'Email already registered'}), 400
+        
         if not result['success']:
             if request.content_type == 'application/x-www-form-urlencoded':
                 return render_template('register.html', error='Registration failed. Please try again.')
@@ -553,8 +476,8 @@ def log_food():
     
     user_id = session['user_id']
     
-    # Get user history for the agent
-    user_history = food_log_ops.get_recent_logs(user_id, days=30)
+    # Load history once; the agent slices the windows it needs from this view
+    user_history = UserHistoryView.load(food_log_ops, user_id, days=30)
     
     # Process food log using LangGraph Agent
     result = process_food_log(
@@ -586,6 +509,116 @@ def log_food():
         'message': 'Meal logged successfully with AI analysis!'
     })
 
+MAX_BATCH_ENTRIES = int(os.getenv('LOG_FOOD_BATCH_MAX', '500'))
+VALID_MEAL_TYPES = ('breakfast', 'lunch', 'dinner', 'snack')
+
+
+@app.route('/api/log-food/batch', methods=['POST'])
+def log_food_batch():
+    """
+    Log many meals in one request (offline sync and imports)
+    
+    Request JSON:
+    {
+        "entries": [
+            {"food_text": "string", "meal_type": "breakfast|lunch|dinner|snack",  // optional
+             "timestamp": "ISO 8601"},  // optional, defaults to now
+            ...
+        ]
+    }
+    
+    All entries are parsed in one pass and stored with one add; recommendations
+    are computed once for the whole batch. Each entry gets its own result, and
+    one bad entry does not fail the others.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    entries = data.get('entries')
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'error': 'Provide a non-empty "entries" list'}), 400
+    if len(entries) > MAX_BATCH_ENTRIES:
+        return jsonify({'error': f'At most {MAX_BATCH_ENTRIES} entries per request'}), 400
+    
+    user_id = session['user_id']
+    results = [{'index': i, 'success': False} for i in range(len(entries))]
+    
+    # Validate each entry; only valid ones are parsed
+    valid = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not entry.get('food_text'):
+            results[i]['error'] = 'Missing food_text'
+            continue
+        if not isinstance(entry['food_text'], str) or not entry['food_text'].strip():
+            results[i]['error'] = 'food_text must be a non-empty string'
+            continue
+        try:
+            timestamp = datetime.fromisoformat(entry['timestamp']) if entry.get('timestamp') else datetime.now()
+        except (TypeError, ValueError):
+            results[i]['error'] = 'Invalid timestamp (use ISO 8601)'
+            continue
+        if timestamp.tzinfo is not None:
+            # Stored times are naive local time
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        meal_type = entry.get('meal_type') or meal_type_for(timestamp.hour)
+        if meal_type not in VALID_MEAL_TYPES:
+            results[i]['error'] = f"Invalid meal_type. Must be one of: {', '.join(VALID_MEAL_TYPES)}"
+            continue
+        valid.append((i, {'food_text': entry['food_text'], 'meal_type': meal_type, 'timestamp': timestamp}))
+    
+    # One parser pass for every entry
+    parsed = process_food_logs(user_id, [entry for _, entry in valid])
+    
+    to_store = []
+    for (i, entry), result in zip(valid, parsed):
+        if not result['success']:
+            results[i]['error'] = result.get('clarification_question') or result.get('user_message') or result.get('error')
+            continue
+        to_store.append((i, {
+            'meal_type': entry['meal_type'],
+            'foods': result['foods'],
+            'total_nutrition': result['total_nutrition'],
+            'original_text': entry['food_text'],
+            'timestamp': entry['timestamp']
+        }))
+    
+    # Recommendations once, over what the batch adds to today. Like /api/log-food
+    # they run before the add: the recommendation engine adds the batch's
+    # nutrition on top of the history, and the stored patterns must not
+    # already include it either
+    recommendations = []
+    if to_store:
+        user_history = UserHistoryView.load(food_log_ops, user_id, days=30)
+        today = datetime.now().date()
+        todays_entries = [entry for _, entry in to_store if entry['timestamp'].date() == today]
+        combined = {key: sum(entry['total_nutrition'].get(key, 0) for entry in todays_entries)
+                    for key in FoodLogOperations.NUTRIENT_KEYS}
+        recommendations = recommend_after_logging(user_id, combined, user_history)['recommendations']
+    
+    # One add for every recognized entry
+    logs = food_log_ops.create_logs(user_id, [entry for _, entry in to_store]) if to_store else []
+    if to_store and not logs:
+        for i, _ in to_store:
+            results[i]['error'] = 'Could not save log'
+    for (i, _), log in zip(to_store, logs):
+        results[i].update({
+            'success': True,
+            'log_id': log['_id'],
+            'timestamp': log['timestamp'],
+            'meal_type': log['meal_type'],
+            'foods': log['foods'],
+            'total_nutrition': log['total_nutrition']
+        })
+    
+    return jsonify({
+        'success': bool(logs),
+        'logged': len(logs),
+        'failed': len(entries) - len(logs),
+        'results': results,
+        'recommendations': recommendations if logs else []
+    })
+
 @app.route('/api/get-logs')
 def get_logs():
     if 'user_id' not in session:
@@ -593,17 +626,9 @@ def get_logs():
     
     user_id = session['user_id']
     
-    # Get today's logs from MongoDB
+    # Get today's logs and the materialized daily totals
     today_logs = food_log_ops.get_today_logs(user_id)
-    
-    # Calculate daily totals
-    daily_total = {
-        'calories': sum(log['total_nutrition']['calories'] for log in today_logs),
-        'protein': sum(log['total_nutrition']['protein'] for log in today_logs),
-        'carbs': sum(log['total_nutrition']['carbs'] for log in today_logs),
-        'fat': sum(log['total_nutrition']['fat'] for log in today_logs),
-        'fiber': sum(log['total_nutrition']['fiber'] for log in today_logs),
-    }
+    daily_total = food_log_ops.get_daily_total(user_id)
     
     # Get user goals
     user = user_ops.get_user_by_email(user_id)
@@ -620,6 +645,34 @@ def get_logs():
         'goals': goals
     })
 
+# Logs per page for /api/logs and /api/calendar-logs when no limit is given
+LOG_PAGE_SIZE = 50
+
+def log_page_args(default_days=None):
+    """limit, cursor and start date (from ?days=) shared by the paginated log endpoints"""
+    limit = request.args.get('limit', LOG_PAGE_SIZE, type=int)
+    cursor = request.args.get('cursor') or None
+    days = request.args.get('days', default_days, type=int)
+    start_date = None
+    if days:
+        # Whole days, so the oldest day on the page is not cut off mid-day
+        start_date = (datetime.now() - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return limit, cursor, start_date
+
+@app.route('/api/logs')
+def list_logs():
+    """Page through the user's logs, newest first"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    limit, cursor, start_date = log_page_args()
+    try:
+        page = food_log_ops.get_logs_page(session['user_id'], limit=limit, cursor=cursor, start_date=start_date)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    return jsonify(page)
+
 @app.route('/api/get-recommendations')
 def get_recommendations():
     if 'user_id' not in session:
@@ -661,14 +714,7 @@ def chat_daily_suggestion():
     
     user_id = session['user_id']
     
-    today_logs = food_log_ops.get_today_logs(user_id)
-    daily_total = {
-        'calories': sum(log['total_nutrition']['calories'] for log in today_logs),
-        'protein': sum(log['total_nutrition']['protein'] for log in today_logs),
-        'carbs': sum(log['total_nutrition']['carbs'] for log in today_logs),
-        'fat': sum(log['total_nutrition']['fat'] for log in today_logs),
-        'fiber': sum(log['total_nutrition']['fiber'] for log in today_logs),
-    }
+    daily_total = food_log_ops.get_daily_total(user_id)
     
     user = user_ops.get_user_by_email(user_id)
     goals = user.get('goals', {
@@ -680,7 +726,7 @@ def chat_daily_suggestion():
     
     recommendations = generate_recommendations(user_id)
     
-    if daily_total['calories'] == 0 and daily_total['protein'] == 0 and not today_logs:
+    if daily_total['calories'] == 0 and daily_total['protein'] == 0 and not daily_total['log_count']:
         prefix = "Good day! It looks like you haven't logged anything yet today. "
     else:
         prefix = (
@@ -710,44 +756,21 @@ def weekly_insight():
     user_id = session['user_id']
     days = request.args.get('days', 7, type=int)
     
-    logs = food_log_ops.get_recent_logs(user_id, days=days)
+    # Whole days from the daily rollups, one small row per day instead of every log
+    week = pattern_store.get_summary(user_id, days=days)
     
-    if not logs:
+    if not week['days_logged']:
         return jsonify({
             'summary': None,
             'insight': "Not enough data yet. Log meals for a couple of days and I'll summarize your week.",
             'suggestions': []
         })
     
-    daily_totals = defaultdict(lambda: {
-        'calories': 0,
-        'protein': 0,
-        'carbs': 0,
-        'fat': 0
-    })
-    category_counts = defaultdict(int)
-    
-    for log in logs:
-        if isinstance(log['timestamp'], str):
-            date = log['timestamp'].split('T')[0]
-        else:
-            date = log['timestamp'].date().isoformat()
-        
-        totals = log['total_nutrition']
-        daily_totals[date]['calories'] += totals.get('calories', 0)
-        daily_totals[date]['protein'] += totals.get('protein', 0)
-        daily_totals[date]['carbs'] += totals.get('carbs', 0)
-        daily_totals[date]['fat'] += totals.get('fat', 0)
-        
-        for food in log.get('foods', []):
-            category = food.get('category')
-            if category:
-                category_counts[category] += 1
-    
-    num_days = len(daily_totals)
-    avg_calories = sum(v['calories'] for v in daily_totals.values()) / num_days
-    avg_protein = sum(v['protein'] for v in daily_totals.values()) / num_days
-    avg_carbs = sum(v['carbs'] for v in daily_totals.values()) / num_days
+    num_days = week['days_logged']
+    avg_calories = week['avg_calories']
+    avg_protein = week['avg_protein']
+    avg_carbs = week['avg_carbs']
+    category_counts = week['category_counts']
     
     fast_food_meals = category_counts.get('fast_food', 0) + category_counts.get('treats', 0)
     veg_meals = category_counts.get('vegetables', 0)
@@ -802,13 +825,8 @@ def get_meal_suggestions():
     user_id = session['user_id']
     
     # Get today's nutrition
-    today_logs = food_log_ops.get_today_logs(user_id)
-    daily_total = {
-        'calories': sum(log['total_nutrition']['calories'] for log in today_logs),
-        'protein': sum(log['total_nutrition']['protein'] for log in today_logs),
-        'carbs': sum(log['total_nutrition']['carbs'] for log in today_logs),
-        'fat': sum(log['total_nutrition']['fat'] for log in today_logs),
-    }
+    today_total = food_log_ops.get_daily_total(user_id)
+    daily_total = {key: today_total[key] for key in ('calories', 'protein', 'carbs', 'fat')}
     
     # Get user goals
     user = user_ops.get_user_by_email(user_id)
@@ -838,9 +856,54 @@ def get_meal_suggestions():
             'suggestions': []
         }), 500
 
+def meal_type_for(hour):
+    """Meal type for a log made at this hour of the day"""
+    if hour < 11:
+        return 'breakfast'
+    elif hour < 15:
+        return 'lunch'
+    elif hour < 20:
+        return 'dinner'
+    return 'snack'
+
+
+def record_chat_result(user_id, message, result):
+    """Save logged foods and queue the chat log for a finished chat turn"""
+    # If food was successfully logged, save to database
+    if result.get('success') and result.get('foods'):
+        food_log_ops.create_log(
+            user_id=user_id,
+            meal_type=meal_type_for(datetime.now().hour),
+            foods=result['foods'],
+            total_nutrition=result['total_nutrition'],
+            original_text=message
+        )
+    
+    # Persist chat interaction (prompt + response) to the NDJSON log and ChromaDB
+    if result.get('success'):
+        status = 'success'
+    elif result.get('needs_clarification'):
+        status = 'clarification'
+    else:
+        status = 'info'
+    
+    log_chat_interaction(user_id, message, result, status=status)
+
+
+def sse_event(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @app.route('/api/chat', methods=['POST'])
 def api_chat():
-    """Conversational food logging endpoint"""
+    """
+    Conversational food logging endpoint
+    
+    With `Accept: text/event-stream` the reply is streamed as server-sent events:
+    intent, foods, nutrition, response and recommendations as each agent step
+    finishes, then `done` with the same JSON the plain endpoint returns.
+    """
     if 'user_id' not in session:
         return jsonify({'error': 'Not authenticated'}), 401
     
@@ -853,8 +916,34 @@ def api_chat():
     
     user_id = session['user_id']
     
-    # Get user history for context
-    user_history = food_log_ops.get_recent_logs(user_id, days=30)
+    if request.accept_mimetypes.best == 'text/event-stream':
+        # History is only needed by the last step, so fetch it while the first steps run
+        user_history = UserHistoryView.load_in_background(food_log_ops, user_id, history_executor, days=30)
+        
+        def generate():
+            try:
+                for event, payload in stream_conversational_message(
+                    user_id=user_id,
+                    message=message,
+                    conversation_history=conversation_history,
+                    user_history=user_history
+                ):
+                    if event == 'result':
+                        record_chat_result(user_id, message, payload)
+                        event = 'done'
+                    yield sse_event(event, payload)
+            except Exception as e:
+                print(f"❌ Chat stream failed: {e}")
+                yield sse_event('error', {'error': 'Sorry, something went wrong.'})
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    # Load history once; the agent slices the windows it needs from this view
+    user_history = UserHistoryView.load(food_log_ops, user_id, days=30)
     
     # Process message with conversational agent
     result = process_conversational_message(
@@ -864,37 +953,7 @@ def api_chat():
         user_history=user_history
     )
     
-    # If food was successfully logged, save to database
-    if result.get('success') and result.get('foods'):
-        # Determine meal type based on time
-        hour = datetime.now().hour
-        if hour < 11:
-            meal_type = 'breakfast'
-        elif hour < 15:
-            meal_type = 'lunch'
-        elif hour < 20:
-            meal_type = 'dinner'
-        else:
-            meal_type = 'snack'
-        
-        # Create log entry
-        log_entry = food_log_ops.create_log(
-            user_id=user_id,
-            meal_type=meal_type,
-            foods=result['foods'],
-            total_nutrition=result['total_nutrition'],
-            original_text=message
-        )
-    
-    # Persist chat interaction (prompt + response) to JSON file and MongoDB
-    if result.get('success'):
-        status = 'success'
-    elif result.get('needs_clarification'):
-        status = 'clarification'
-    else:
-        status = 'info'
-    
-    log_chat_interaction(user_id, message, result, status=status)
+    record_chat_result(user_id, message, result)
 
     return jsonify(result)
 
@@ -905,46 +964,43 @@ def calendar_logs():
         return jsonify({'error': 'Not authenticated'}), 401
     
     user_id = session['user_id']
-    days = request.args.get('days', 30, type=int)
-    
-    # Get logs for the specified period
-    logs = food_log_ops.get_recent_logs(user_id, days=days)
-    
-    # Organize by date
-    logs_by_date = defaultdict(lambda: {
-        'meals': [],
-        'total_calories': 0,
-        'total_protein': 0,
-        'total_carbs': 0,
-        'total_fat': 0,
-        'meal_count': 0
-    })
+    limit, cursor, start_date = log_page_args(default_days=30)
     
-    for log in logs:
-        # Handle both string and datetime timestamps
-        if isinstance(log['timestamp'], str):
-            date = log['timestamp'].split('T')[0]
-        else:
-            date = log['timestamp'].date().isoformat()
-        
-        logs_by_date[date]['meals'].append(log)
-        logs_by_date[date]['total_calories'] += log['total_nutrition']['calories']
-        logs_by_date[date]['total_protein'] += log['total_nutrition']['protein']
-        logs_by_date[date]['total_carbs'] += log['total_nutrition']['carbs']
-        logs_by_date[date]['total_fat'] += log['total_nutrition']['fat']
-        logs_by_date[date]['meal_count'] += 1
-    
-    # Convert to list and sort by date
-    calendar_data = [
-        {
-            'date': date,
-            'data': data
-        }
-        for date, data in logs_by_date.items()
-    ]
-    calendar_data.sort(key=lambda x: x['date'], reverse=True)
+    # One page of logs for the specified period
+    try:
+        page = food_log_ops.get_logs_page(user_id, limit=limit, cursor=cursor, start_date=start_date)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    # Organize by date (logs arrive newest first)
+    logs_by_date = defaultdict(list)
+    for log in page['logs']:
+        logs_by_date[log['timestamp'].split('T')[0]].append(log)
+    
+    # A day can span two pages: report whole-day totals from the rollups
+    calendar_data = []
+    if logs_by_date:
+        dates = list(logs_by_date)
+        buckets = food_log_ops.get_daily_buckets(
+            user_id,
+            datetime.fromisoformat(dates[-1]),
+            datetime.fromisoformat(dates[0])
+        )
+        for date in dates:
+            bucket = buckets[date]
+            calendar_data.append({
+                'date': date,
+                'data': {
+                    'meals': logs_by_date[date],
+                    'total_calories': bucket['calories'],
+                    'total_protein': bucket['protein'],
+                    'total_carbs': bucket['carbs'],
+                    'total_fat': bucket['fat'],
+                    'meal_count': int(bucket['log_count'])
+                }
+            })
     
-    return jsonify({'calendar': calendar_data})
+    return jsonify({'calendar': calendar_data, 'next_cursor': page['next_cursor']})
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,67 @@
+"""
+Benchmark: cold load of the food database, json.load vs the memory-mapped table
+Run from backend/: python benchmarks/food_table_benchmark.py
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.food_table import FoodTable, compile_food_table
+
+SIZES = [156, 10_000, 200_000]
+CATEGORIES = ['protein', 'carbs', 'vegetables', 'fruits', 'dairy', 'fast_food', 'treats', 'snacks']
+REPEATS = 5
+
+
+def write_json(path, size, rng):
+    foods = {
+        f"food {i}": {
+            'calories': rng.randint(0, 900), 'protein': round(rng.uniform(0, 60), 1),
+            'carbs': round(rng.uniform(0, 90), 1), 'fat': round(rng.uniform(0, 50), 1),
+            'fiber': round(rng.uniform(0, 15), 1), 'category': rng.choice(CATEGORIES)
+        }
+        for i in range(size)
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(foods, f)
+
+
+def best_ms(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def open_and_lookup(path):
+    table = FoodTable(path)
+    table.get('food 1')
+    table.close()
+
+
+if __name__ == '__main__':
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            json_path = os.path.join(directory, f"{size}.json")
+            table_path = os.path.join(directory, f"{size}.bin")
+            write_json(json_path, size, rng)
+            compile_food_table([json_path], table_path)
+
+            json_ms = best_ms(lambda: load_json(json_path))
+            table_ms = best_ms(lambda: open_and_lookup(table_path))
+            print(f"{size:>7} foods | json.load {json_ms:9.2f} ms ({os.path.getsize(json_path) / 1e6:6.2f} MB) | "
+                  f"mmap open+lookup {table_ms:6.3f} ms ({os.path.getsize(table_path) / 1e6:6.2f} MB)")
@@ -0,0 +1,81 @@
+"""
+Benchmark: FuzzyFoodIndex vs difflib.get_close_matches
+Run from backend/: python benchmarks/fuzzy_index_benchmark.py
+"""
+
+import os
+import random
+import sys
+import time
+from difflib import get_close_matches
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.data_loader import load_food_database
+from utils.fuzzy_index import FuzzyFoodIndex
+
+SIZES = [150, 5000, 50000]
+QUERIES = 100
+EXTRA_WORDS = [
+    'spicy', 'baked', 'roasted', 'fried', 'steamed', 'smoked', 'creamy', 'crispy',
+    'garlic', 'lemon', 'honey', 'pepper', 'herb', 'cajun', 'teriyaki', 'masala',
+    'curry', 'wrap', 'bowl', 'salad', 'soup', 'stew', 'sandwich', 'skewers',
+]
+
+
+def build_names(size, rng):
+    """Real food names padded out with synthetic dish names"""
+    names = list(load_food_database().keys())[:size]
+    vocabulary = sorted({w for name in names for w in name.split()} | set(EXTRA_WORDS))
+    seen = set(names)
+    while len(names) < size:
+        name = ' '.join(rng.sample(vocabulary, rng.choice([2, 3])))
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def misspell(word, rng):
+    """Apply one random typo (drop, swap, replace or insert a character)"""
+    if len(word) < 4:
+        return word + rng.choice('aeiou')
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(['drop', 'swap', 'replace', 'insert'])
+    if kind == 'drop':
+        return word[:i] + word[i + 1:]
+    if kind == 'swap':
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == 'replace':
+        return word[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + word[i + 1:]
+    return word[:i] + rng.choice('aeiou') + word[i:]
+
+
+def run(size):
+    rng = random.Random(size)
+    names = build_names(size, rng)
+    queries = [misspell(rng.choice(names), rng) for _ in range(QUERIES)]
+
+    start = time.perf_counter()
+    index = FuzzyFoodIndex(names)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    expected = [get_close_matches(q, names, n=3, cutoff=0.6) for q in queries]
+    difflib_ms = (time.perf_counter() - start) * 1000 / QUERIES
+
+    start = time.perf_counter()
+    actual = [index.get_close_matches(q, n=3, cutoff=0.6) for q in queries]
+    index_ms = (time.perf_counter() - start) * 1000 / QUERIES
+
+    top1 = sum(1 for e, a in zip(expected, actual) if e[:1] == a[:1]) / QUERIES
+    top3 = sum(1 for e, a in zip(expected, actual) if e == a) / QUERIES
+
+    print(f"{size:>7} names | build {build_ms:8.1f} ms | difflib {difflib_ms:8.3f} ms/query | "
+          f"index {index_ms:7.3f} ms/query | speedup {difflib_ms / index_ms:6.1f}x | "
+          f"top-1 agree {top1:.0%} | top-3 identical {top3:.0%}")
+
+
+if __name__ == '__main__':
+    for size in SIZES:
+        run(size)
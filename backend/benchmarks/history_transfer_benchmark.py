@@ -0,0 +1,97 @@
+"""
+Benchmark: history export/import throughput (NDJSON, gzip NDJSON, Parquet)
+Run from backend/: python benchmarks/history_transfer_benchmark.py [logs]
+
+Uses a persistent ChromaDB in a temporary directory with a constant embedding,
+so the numbers cover storage and serialization only; a real import also pays
+for computing one embedding per row.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import resource
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import chromadb
+from chromadb import EmbeddingFunction
+
+from utils.chromadb_client import FoodLogOperations
+from utils.history_transfer import HistoryExporter, HistoryImporter, read_records
+
+LOGS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+USERS = 100
+BATCH_SIZE = 1000
+FORMATS = ['ndjson', 'ndjson.gz', 'parquet']
+
+
+class ConstantEmbedding(EmbeddingFunction):
+    def __call__(self, input):
+        return [[0.0, 0.0, 0.0] for _ in input]
+
+
+def make_client(path):
+    """Namespace of persistent collections, shaped like ChromaDBClient"""
+    client = chromadb.PersistentClient(path=path)
+    return SimpleNamespace(**{
+        f"{name}_collection": client.get_or_create_collection(name, embedding_function=ConstantEmbedding())
+        for name in ('users', 'food_logs', 'chat_logs', 'daily_totals')
+    })
+
+
+def synthetic_records(count, rng):
+    """Food log records spread over USERS users and one year"""
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        timestamp = start + timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+        log_id, document, metadata = FoodLogOperations.build_log_row(f"user{i % USERS}@example.com", {
+            'meal_type': rng.choice(['breakfast', 'lunch', 'dinner', 'snack']),
+            'foods': [{'name': 'rice', 'calories': 200.0}, {'name': 'chicken', 'calories': 250.0}],
+            'total_nutrition': {'calories': 450.0, 'protein': 35.0, 'carbs': 45.0, 'fat': 12.0, 'fiber': 2.0},
+            'original_text': 'rice and chicken'
+        }, timestamp, log_id=f"log-{i}")
+        yield {'kind': 'food_logs', 'id': log_id, 'document': document, 'metadata': metadata}
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    print(f"{label:<24} {seconds:8.1f} s  {count / seconds:8.0f} rows/s")
+    return result
+
+
+def main():
+    rng = random.Random(7)
+    print(f"{LOGS} food logs, {USERS} users, batch size {BATCH_SIZE}")
+    with tempfile.TemporaryDirectory() as workdir:
+        source = make_client(os.path.join(workdir, 'source'))
+        timed('import (generated)', LOGS,
+              lambda: HistoryImporter(source, BATCH_SIZE).import_records(synthetic_records(LOGS, rng)))
+
+        exporter = HistoryExporter(source, BATCH_SIZE)
+        for fmt in FORMATS:
+            path = os.path.join(workdir, f"history.{fmt}")
+            try:
+                timed(f"export {fmt}", LOGS, lambda: exporter.export(path, kinds=['food_logs']))
+            except ImportError as e:
+                print(f"export {fmt:<17} skipped ({e})")
+                continue
+            print(f"{'':<24} {os.path.getsize(path) / 2**20:8.1f} MiB on disk")
+            timed(f"read {fmt}", LOGS, lambda: sum(1 for _ in read_records(path, BATCH_SIZE)))
+
+        target = make_client(os.path.join(workdir, 'target'))
+        path = os.path.join(workdir, 'history.ndjson.gz')
+        timed('import ndjson.gz', LOGS, lambda: HistoryImporter(target, BATCH_SIZE).import_file(path))
+
+    # Memory stays at about one batch: peak RSS should not grow with LOGS
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
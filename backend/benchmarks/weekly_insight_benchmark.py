@@ -0,0 +1,109 @@
+"""
+Benchmark: /api/weekly-insight summary from the daily rollups vs the per-log loop it replaced
+Run from backend/: python benchmarks/weekly_insight_benchmark.py
+
+Both sides read from an in-memory ChromaDB with a constant embedding, so the
+numbers cover the store read plus the aggregation, as the endpoint runs them.
+"""
+
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import chromadb
+from chromadb import EmbeddingFunction
+
+from utils.chromadb_client import FoodLogOperations
+from utils.pattern_store import PatternStore
+
+YEARS = [1, 5]
+WINDOWS = [7, 30, 365]
+LOGS_PER_DAY = 4
+REPEATS = 5
+USER = 'user@example.com'
+CATEGORIES = ['protein', 'carbs', 'vegetables', 'fruits', 'dairy', 'fast_food', 'treats', 'mixed']
+
+
+class ConstantEmbedding(EmbeddingFunction):
+    def __call__(self, input):
+        return [[0.0, 0.0, 0.0] for _ in input]
+
+
+def make_client():
+    """Namespace of fresh in-memory collections, shaped like ChromaDBClient"""
+    client = chromadb.EphemeralClient()
+    suffix = uuid.uuid4().hex[:8]
+    return SimpleNamespace(**{
+        f"{name}_collection": client.create_collection(f"{name}_{suffix}", embedding_function=ConstantEmbedding())
+        for name in ('food_logs', 'daily_totals')
+    })
+
+
+def load_history(food_log_ops, years, rng):
+    """LOGS_PER_DAY meals a day for `years` years up to today, with their rollups stored"""
+    now = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = []
+    for day in range(365 * years):
+        for meal, meal_type in enumerate(['breakfast', 'lunch', 'dinner', 'snack'][:LOGS_PER_DAY]):
+            rows.append(FoodLogOperations.build_log_row(USER, {
+                'meal_type': meal_type,
+                'foods': [{'name': 'food', 'category': rng.choice(CATEGORIES)} for _ in range(rng.randint(1, 3))],
+                'total_nutrition': {key: rng.uniform(0, 600) for key in FoodLogOperations.NUTRIENT_KEYS},
+                'original_text': 'food'
+            }, now - timedelta(days=day) + timedelta(hours=8 + meal * 4)))
+    for start in range(0, len(rows), 5000):
+        ids, documents, metadatas = zip(*rows[start:start + 5000])
+        food_log_ops.collection.add(ids=list(ids), documents=list(documents), metadatas=list(metadatas))
+    # Writes keep the rollups current; build them all up front
+    food_log_ops.get_daily_buckets(USER, now - timedelta(days=365 * years), now)
+    return len(rows)
+
+
+def loop_summary(food_log_ops, days):
+    """What weekly_insight did before: every log in the range, summed one at a time"""
+    logs = food_log_ops.get_recent_logs(USER, days=days)
+    daily_totals = defaultdict(lambda: {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0})
+    category_counts = defaultdict(int)
+    for log in logs:
+        date = log['timestamp'].split('T')[0]
+        totals = log['total_nutrition']
+        for key in ('calories', 'protein', 'carbs', 'fat'):
+            daily_totals[date][key] += totals.get(key, 0)
+        for food in log.get('foods', []):
+            if food.get('category'):
+                category_counts[food['category']] += 1
+    num_days = len(daily_totals)
+    return num_days, sum(v['calories'] for v in daily_totals.values()) / num_days, dict(category_counts)
+
+
+def best_ms(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def run(years):
+    food_log_ops = FoodLogOperations(make_client())
+    store = PatternStore(food_log_ops)
+    logs = load_history(food_log_ops, years, random.Random(years))
+
+    for days in WINDOWS:
+        old_ms = best_ms(lambda: loop_summary(food_log_ops, days))
+        new_ms = best_ms(lambda: store.get_summary(USER, days=days))
+        print(f"{years}y ({logs:>5} logs) days={days:<4} | logs + loop {old_ms:8.2f} ms | "
+              f"rollups + numpy {new_ms:8.2f} ms | speedup {old_ms / new_ms:5.2f}x")
+
+
+if __name__ == '__main__':
+    for years in YEARS:
+        run(years)
@@ -16,30 +16,61 @@ except ImportError:
     print("⚠️ MongoDB client not available. Skipping migration.")
 
 from utils.chromadb_client import ChromaDBClient, UserOperations, FoodLogOperations
+from utils.history_transfer import HistoryImporter
 
+# Documents fetched from MongoDB per round trip (and rows written to ChromaDB per batch)
+BATCH_SIZE = 1000
 
-def migrate_users(old_user_ops, new_user_ops):
+
+def user_record(doc):
+    """Convert a MongoDB user document into an import record"""
+    created_at = doc.get('created_at')
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    user_id, document, metadata = UserOperations.build_user_row(
+        doc['email'], doc.get('name', ''), doc.get('password', ''), doc.get('goals') or {}, created_at
+    )
+    return {'kind': 'users', 'id': user_id, 'document': document, 'metadata': metadata}
+
+
+def food_log_record(doc):
+    """Convert a MongoDB food log document into an import record (keeps the ObjectId as id)"""
+    timestamp = doc['timestamp']
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    log_id, document, metadata = FoodLogOperations.build_log_row(doc['user_id'], {
+        'meal_type': doc.get('meal_type', 'snack'),
+        'foods': doc.get('foods', []),
+        'total_nutrition': doc.get('total_nutrition', {}),
+        'original_text': doc.get('original_text', '')
+    }, timestamp, log_id=str(doc['_id']))
+    return {'kind': 'food_logs', 'id': log_id, 'document': document, 'metadata': metadata}
+
+
+def migrate_users(old_user_ops, importer, batch_size=BATCH_SIZE):
     """Migrate users from MongoDB to ChromaDB"""
     print("\n📦 Migrating users...")
     
     try:
-        # This would need to be implemented based on your MongoDB structure
-        # For now, we'll skip as users will re-register
-        print("ℹ️ User migration skipped - users will need to re-register")
-        return True
+        # The cursor streams documents in batches; the importer writes one upsert per batch
+        cursor = old_user_ops.users.find({}, batch_size=batch_size)
+        counts = importer.import_records(user_record(doc) for doc in cursor)
+        print(f"✅ Migrated {counts['users']} users ({counts['failed']} failed)")
+        return counts['failed'] == 0
     except Exception as e:
         print(f"❌ Error migrating users: {e}")
         return False
 
 
-def migrate_food_logs(old_food_log_ops, new_food_log_ops):
+def migrate_food_logs(old_food_log_ops, importer, batch_size=BATCH_SIZE):
     """Migrate food logs from MongoDB to ChromaDB"""
     print("\n📦 Migrating food logs...")
     
     try:
-        # This would need to be implemented based on your MongoDB structure
-        print("ℹ️ Food log migration skipped - starting fresh")
-        return True
+        cursor = old_food_log_ops.food_logs.find({}, batch_size=batch_size)
+        counts = importer.import_records(food_log_record(doc) for doc in cursor)
+        print(f"✅ Migrated {counts['food_logs']} food logs ({counts['failed']} failed)")
+        return counts['failed'] == 0
     except Exception as e:
         print(f"❌ Error migrating food logs: {e}")
         return False
@@ -79,13 +110,12 @@ def main():
         # Initialize new ChromaDB client
         print("\n🔌 Connecting to ChromaDB...")
         new_chroma = ChromaDBClient()
-        new_user_ops = UserOperations(new_chroma)
-        new_food_log_ops = FoodLogOperations(new_chroma)
+        importer = HistoryImporter(new_chroma, batch_size=BATCH_SIZE)
         print("✅ Connected to ChromaDB")
         
-        # Migrate data
-        users_success = migrate_users(old_user_ops, new_user_ops)
-        logs_success = migrate_food_logs(old_food_log_ops, new_food_log_ops)
+        # Migrate data (re-running is safe: ids are kept, so rows are overwritten)
+        users_success = migrate_users(old_user_ops, importer)
+        logs_success = migrate_food_logs(old_food_log_ops, importer)
         
         # Summary
         print("\n" + "=" * 60)
@@ -94,7 +124,6 @@ def main():
         print(f"Users:     {'✅ Success' if users_success else '❌ Failed'}")
         print(f"Food Logs: {'✅ Success' if logs_success else '❌ Failed'}")
         print("\n✅ Migration completed!")
-        print("\nNote: Users will need to re-register with the new system.")
         
     except Exception as e:
         print(f"\n❌ Migration failed: {e}")
@@ -3,13 +3,19 @@ document.addEventListener('DOMContentLoaded', function() {
     loadWeeklyInsight();
 });
 
+const CALENDAR_DAYS = 30;
+const CALENDAR_PAGE_SIZE = 50;
+
+// Paging state: the next cursor, and the card of each day already shown
+// (a day's meals can arrive over two pages)
+const calendarState = { cursor: null, loading: false, done: false, cards: new Map(), observer: null };
+
 async function loadCalendarData() {
     const container = document.getElementById('calendarDays');
     if (!container) return;
 
     try {
-        const response = await fetch('/api/calendar-logs?days=30');
-        const data = await response.json();
+        const data = await fetchCalendarPage(null);
 
         if (!data.calendar || data.calendar.length === 0) {
             container.innerHTML = `
@@ -23,63 +29,132 @@ async function loadCalendarData() {
         }
 
         container.innerHTML = '';
-
-        data.calendar.forEach(day => {
-            const summary = day.data || {}; // API returns { date: ..., data: { ... } }
-            
-            // Calculate totals from the 'data' object which contains 'total_calories', etc.
-            // Wait, let's check app.py again.
-            // app.py: logs_by_date[date]['total_calories'] ...
-            // calendar_data = [ { 'date': date, 'data': data } ]
-            // So day.data has the stats.
-            
-            const dateLabel = new Date(day.date).toLocaleDateString('en-US', {
-                weekday: 'short',
-                month: 'short',
-                day: 'numeric'
-            });
-
-            const dayDiv = document.createElement('div');
-            dayDiv.className = 'calendar-day-card';
-            
-            // Create meal list HTML
-            let mealsHtml = '';
-            if (summary.meals && summary.meals.length > 0) {
-                mealsHtml = '<div class="day-meals-list">';
-                summary.meals.forEach(meal => {
-                    const time = new Date(meal.timestamp).toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
-                    mealsHtml += `
-                        <div class="mini-meal-item">
-                            <span class="mini-meal-time">${time}</span>
-                            <span class="mini-meal-name">${meal.meal_type}</span>
-                            <span class="mini-meal-cal">${Math.round(meal.total_nutrition.calories)}</span>
-                        </div>
-                    `;
-                });
-                mealsHtml += '</div>';
-            }
-
-            dayDiv.innerHTML = `
-                <div class="calendar-day-header">
-                    <span class="calendar-day-date">${dateLabel}</span>
-                    <span class="calendar-day-calories">${Math.round(summary.total_calories || 0)} cal</span>
-                </div>
-                <div class="calendar-day-macros">
-                    <div class="macro-pill protein">P: ${Math.round(summary.total_protein || 0)}g</div>
-                    <div class="macro-pill carbs">C: ${Math.round(summary.total_carbs || 0)}g</div>
-                    <div class="macro-pill fat">F: ${Math.round(summary.total_fat || 0)}g</div>
-                </div>
-                ${mealsHtml}
-            `;
-
-            container.appendChild(dayDiv);
-        });
+        renderCalendarPage(container, data);
     } catch (error) {
         console.error('Error loading calendar data:', error);
         container.innerHTML = '<div class="error">Error loading calendar. Please try again.</div>';
     }
 }
 
+async function fetchCalendarPage(cursor) {
+    let url = `/api/calendar-logs?days=${CALENDAR_DAYS}&limit=${CALENDAR_PAGE_SIZE}`;
+    if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+    const response = await fetch(url);
+    if (!response.ok) throw new Error(`Calendar request failed: ${response.status}`);
+    return response.json();
+}
+
+function renderCalendarPage(container, data) {
+    data.calendar.forEach(day => {
+        const summary = day.data || {}; // API returns { date: ..., data: { meals, total_calories, ... } }
+        const existing = calendarState.cards.get(day.date);
+        if (existing) {
+            // Rest of a day started on the previous page
+            appendMeals(existing, summary.meals || []);
+            return;
+        }
+        const dayDiv = renderDayCard(day.date, summary);
+        calendarState.cards.set(day.date, dayDiv);
+        container.appendChild(dayDiv);
+    });
+
+    calendarState.cursor = data.next_cursor || null;
+    calendarState.done = !calendarState.cursor;
+    watchForMore(container);
+}
+
+function renderDayCard(date, summary) {
+    const dateLabel = new Date(date).toLocaleDateString('en-US', {
+        weekday: 'short',
+        month: 'short',
+        day: 'numeric'
+    });
+
+    const dayDiv = document.createElement('div');
+    dayDiv.className = 'calendar-day-card';
+    dayDiv.innerHTML = `
+        <div class="calendar-day-header">
+            <span class="calendar-day-date">${dateLabel}</span>
+            <span class="calendar-day-calories">${Math.round(summary.total_calories || 0)} cal</span>
+        </div>
+        <div class="calendar-day-macros">
+            <div class="macro-pill protein">P: ${Math.round(summary.total_protein || 0)}g</div>
+            <div class="macro-pill carbs">C: ${Math.round(summary.total_carbs || 0)}g</div>
+            <div class="macro-pill fat">F: ${Math.round(summary.total_fat || 0)}g</div>
+        </div>
+    `;
+    appendMeals(dayDiv, summary.meals || []);
+    return dayDiv;
+}
+
+function appendMeals(dayDiv, meals) {
+    if (meals.length === 0) return;
+
+    let list = dayDiv.querySelector('.day-meals-list');
+    if (!list) {
+        list = document.createElement('div');
+        list.className = 'day-meals-list';
+        dayDiv.appendChild(list);
+    }
+
+    meals.forEach(meal => {
+        const time = new Date(meal.timestamp).toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
+        list.insertAdjacentHTML('beforeend', `
+            <div class="mini-meal-item">
+                <span class="mini-meal-time">${time}</span>
+                <span class="mini-meal-name">${meal.meal_type}</span>
+                <span class="mini-meal-cal">${Math.round(meal.total_nutrition.calories)}</span>
+            </div>
+        `);
+    });
+}
+
+// Fetch the next page when the bottom of the list scrolls into view
+function watchForMore(container) {
+    let sentinel = document.getElementById('calendarMore');
+    if (calendarState.done) {
+        if (sentinel) sentinel.remove();
+        if (calendarState.observer) calendarState.observer.disconnect();
+        return;
+    }
+
+    if (!sentinel) {
+        sentinel = document.createElement('div');
+        sentinel.id = 'calendarMore';
+        sentinel.className = 'loading pulse';
+        sentinel.textContent = 'Loading more days...';
+    }
+    container.appendChild(sentinel); // keep it last
+
+    if (!('IntersectionObserver' in window)) {
+        loadMoreCalendar(container);
+        return;
+    }
+    if (!calendarState.observer) {
+        calendarState.observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) loadMoreCalendar(container);
+        }, { rootMargin: '200px' });
+    }
+    // Re-observing reports the current visibility, so a short page keeps loading
+    calendarState.observer.unobserve(sentinel);
+    calendarState.observer.observe(sentinel);
+}
+
+async function loadMoreCalendar(container) {
+    if (calendarState.loading || calendarState.done) return;
+    calendarState.loading = true;
+    try {
+        const data = await fetchCalendarPage(calendarState.cursor);
+        renderCalendarPage(container, data);
+    } catch (error) {
+        console.error('Error loading more calendar data:', error);
+        const sentinel = document.getElementById('calendarMore');
+        if (sentinel) sentinel.textContent = 'Error loading more days. Scroll to retry.';
+    } finally {
+        calendarState.loading = false;
+    }
+}
+
 async function loadWeeklyInsight() {
     const summaryContainer = document.getElementById('weeklySummary');
     const insightContainer = document.getElementById('weeklyInsight');
@@ -49,10 +49,12 @@ async function sendMessage() {
         // Get selected meal type from global variable (set by selectMealType function)
         const mealType = window.selectedMealType || 'breakfast';
         
+        // Ask for server-sent events so each agent step shows up as soon as it finishes
         const response = await fetch('/api/chat', {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
             },
             body: JSON.stringify({
                 message: message,
@@ -61,24 +63,15 @@ async function sendMessage() {
             })
         });
         
-        const data = await response.json();
-        
-        // Remove typing indicator
-        removeTypingIndicator();
+        const contentType = response.headers.get('Content-Type') || '';
+        const data = contentType.startsWith('text/event-stream')
+            ? await readChatStream(response)
+            : renderChatResult(await response.json());
         
-        if (data.error) {
-            addMessage('agent', data.error || 'Sorry, something went wrong.');
+        if (!data) {
             return;
         }
         
-        // Add agent response
-        addMessage('agent', data.agent_response, data.foods, data.total_nutrition);
-        
-        // Add AI insights if available
-        if (data.recommendations && data.recommendations.length > 0) {
-            addInsightsMessage(data.recommendations);
-        }
-        
         // Update conversation history
         conversationHistory.push({
             role: 'user',
@@ -101,10 +94,123 @@ async function sendMessage() {
     }
 }
 
+// Render a complete (non-streamed) chat reply; returns the reply, or null on error
+function renderChatResult(data) {
+    // Remove typing indicator
+    removeTypingIndicator();
+    
+    if (data.error) {
+        addMessage('agent', data.error || 'Sorry, something went wrong.');
+        return null;
+    }
+    
+    // Add agent response
+    addMessage('agent', data.agent_response, data.foods, data.total_nutrition);
+    
+    // Add AI insights if available
+    if (data.recommendations && data.recommendations.length > 0) {
+        addInsightsMessage(data.recommendations);
+    }
+    
+    return data;
+}
+
+// Read server-sent events from /api/chat and render each step as it arrives
+async function readChatStream(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const reply = { messageDiv: null, foodsShown: false, responseShown: false, insightsShown: false };
+    let buffer = '';
+    let result = null;
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            let payload = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) payload += line.slice(5).trim();
+            });
+            if (!payload) continue;
+            
+            const data = JSON.parse(payload);
+            if (event === 'error') {
+                removeTypingIndicator();
+                addMessage('agent', data.error || 'Sorry, something went wrong.');
+                return null;
+            }
+            if (event === 'done') {
+                result = data;
+            }
+            renderChatEvent(reply, event, data);
+        }
+    }
+    
+    return result;
+}
+
+function renderChatEvent(reply, event, data) {
+    if (event === 'foods' && data.foods && data.foods.length > 0) {
+        // Foods are known before the reply text: show them right away
+        removeTypingIndicator();
+        reply.messageDiv = addMessage('agent', '…', data.foods);
+        reply.foodsShown = true;
+        showTypingIndicator();
+    } else if (event === 'nutrition' && reply.messageDiv) {
+        const total = data.total_nutrition || {};
+        setMessageText(reply.messageDiv, `📊 ${Math.round(total.calories || 0)} calories · ${Math.round(total.protein || 0)}g protein`);
+    } else if (event === 'response' && data.agent_response) {
+        removeTypingIndicator();
+        if (reply.messageDiv) {
+            setMessageText(reply.messageDiv, data.agent_response);
+        } else {
+            reply.messageDiv = addMessage('agent', data.agent_response);
+        }
+        reply.responseShown = true;
+        showTypingIndicator();
+    } else if (event === 'recommendations') {
+        removeTypingIndicator();
+        if (data.recommendations && data.recommendations.length > 0) {
+            addInsightsMessage(data.recommendations);
+        }
+        reply.insightsShown = true;
+    } else if (event === 'done') {
+        // Fill in whatever the steps did not already show (greetings, clarifications)
+        removeTypingIndicator();
+        if (!reply.responseShown) {
+            if (reply.messageDiv) {
+                setMessageText(reply.messageDiv, data.agent_response);
+            } else {
+                addMessage('agent', data.agent_response, reply.foodsShown ? null : data.foods, data.total_nutrition);
+            }
+        }
+        if (!reply.insightsShown && data.recommendations && data.recommendations.length > 0) {
+            addInsightsMessage(data.recommendations);
+        }
+    }
+}
+
+function setMessageText(messageDiv, text) {
+    const paragraph = messageDiv.querySelector('.message-bubble p');
+    if (paragraph) {
+        paragraph.innerHTML = formatMessage((text || '').toString().trim());
+    }
+    scrollToBottom();
+}
+
 function addMessage(role, content, foods = null, nutrition = null) {
     const text = content != null ? content.toString().trim() : '';
     if (!text) {
-        return;
+        return null;
     }
 
     const messagesContainer = document.getElementById('chatMessages');
@@ -153,6 +259,7 @@ function addMessage(role, content, foods = null, nutrition = null) {
     
     messagesContainer.appendChild(messageDiv);
     scrollToBottom();
+    return messageDiv;
 }
 
 function addInsightsMessage(recommendations) {
@@ -0,0 +1,174 @@
+"""
+Chat Log Writer
+Write-behind queue that takes chat-log persistence out of the request path
+"""
+
+import gzip
+import json
+import os
+import queue
+import threading
+from typing import Dict, List
+
+
+class ChatLogWriter:
+    """
+    Buffers chat-log entries and persists them in batches from a background thread
+
+    Each batch is appended to a newline-delimited JSON file per day
+    (chat_YYYY-MM-DD.ndjson, or .ndjson.gz when compressed) and then stored in
+    ChromaDB with one bulk add. The buffer is bounded: when it is full, submit()
+    waits up to block_timeout for room (backpressure) and then drops the entry,
+    counting it in get_stats(). A batch that fails with an unexpected error is
+    counted and skipped; the thread keeps running. close() flushes whatever is
+    left.
+    """
+
+    _STOP = object()
+
+    def __init__(self, chat_log_ops, log_dir: str, max_pending: int = 10000,
+                 batch_size: int = 200, flush_interval: float = 1.0,
+                 block_timeout: float = 0.25, compress: bool = False):
+        """
+        Args:
+            chat_log_ops: ChatLogOperations (build_chat_log / add_chat_logs)
+            log_dir: Directory for the daily NDJSON files
+            max_pending: Most entries buffered before submit() applies backpressure
+            batch_size: Most entries written per batch
+            flush_interval: Seconds the writer waits to fill a batch
+            block_timeout: Seconds submit() waits for room before dropping an entry
+            compress: Write gzip members (.ndjson.gz) instead of plain text
+        """
+        self.chat_log_ops = chat_log_ops
+        self.log_dir = log_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.compress = compress
+        os.makedirs(log_dir, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stats_lock = threading.Lock()
+        self._stats = {'submitted': 0, 'dropped': 0, 'written': 0, 'batches': 0,
+                       'file_errors': 0, 'db_errors': 0, 'batch_errors': 0}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='chat-log-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, user_id: str, message: str, result: Dict, status: str = 'success') -> bool:
+        """
+        Queue a chat interaction for persistence
+
+        Returns:
+            True if queued, False if the buffer stayed full (entry dropped) or the writer is closed
+        """
+        if self._closed:
+            return False
+        entry = self.chat_log_ops.build_chat_log(user_id, message, result, status)
+        try:
+            self._queue.put(entry, timeout=self.block_timeout)
+        except queue.Full:
+            self._count('dropped')
+            print("⚠️ Chat log buffer full, dropping entry")
+            return False
+        self._count('submitted')
+        return True
+
+    def flush(self):
+        """Block until every queued entry has been written"""
+        self._queue.join()
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting entries, write what is buffered and stop the thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def get_stats(self) -> Dict:
+        """Counters plus the current buffer depth"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize()
+        return stats
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            if first is self._STOP:
+                stopping = True
+            else:
+                batch.append(first)
+            # Take whatever else is already waiting, up to one batch
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is self._STOP:
+                    stopping = True
+                else:
+                    batch.append(entry)
+
+            if stopping:
+                # Drain the rest so shutdown loses nothing already accepted
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+            try:
+                for start in range(0, len(batch), self.batch_size):
+                    chunk = batch[start:start + self.batch_size]
+                    try:
+                        self._write_batch(chunk)
+                    except Exception as e:
+                        # Lose this batch, not the writer thread
+                        self._count('batch_errors')
+                        print(f"⚠️ Failed to write {len(chunk)} chat logs: {e}")
+            finally:
+                # One task_done per item taken, including the stop marker
+                for _ in range(len(batch) + (1 if stopping else 0)):
+                    self._queue.task_done()
+
+    def _file_path(self, day: str) -> str:
+        suffix = '.ndjson.gz' if self.compress else '.ndjson'
+        return os.path.join(self.log_dir, f"chat_{day}{suffix}")
+
+    def _write_batch(self, batch: List[Dict]):
+        if not batch:
+            return
+
+        by_day: Dict[str, List[str]] = {}
+        for entry in batch:
+            by_day.setdefault(entry['timestamp'][:10], []).append(json.dumps(entry, ensure_ascii=False, default=str))
+
+        for day, lines in by_day.items():
+            data = ('\n'.join(lines) + '\n').encode('utf-8')
+            try:
+                if self.compress:
+                    # Appending a new gzip member keeps the file readable as one stream
+                    data = gzip.compress(data)
+                with open(self._file_path(day), 'ab') as f:
+                    f.write(data)
+            except OSError as e:
+                self._count('file_errors')
+                print(f"⚠️ Failed to append chat logs for {day}: {e}")
+
+        if self.chat_log_ops.add_chat_logs(batch):
+            self._count('written', len(batch))
+        else:
+            self._count('db_errors')
+        self._count('batches')
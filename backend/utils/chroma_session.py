@@ -2,32 +2,72 @@
 Custom Flask-Session interface for ChromaDB
 """
 
-from flask.sessions import SessionInterface, SessionMixin
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
 from werkzeug.datastructures import CallbackDict
 from datetime import datetime, timedelta
-import pickle
+from cachetools import TTLCache
+import threading
 import uuid
-from typing import Optional
+from typing import Dict, NamedTuple, Optional
 
 
 class ChromaSession(CallbackDict, SessionMixin):
     """Session object for ChromaDB storage"""
     
-    def __init__(self, initial=None, sid=None, permanent=None):
+    def __init__(self, initial=None, sid=None, permanent=None, expires=None, created_at=None):
         def on_update(self):
             self.modified = True
         
         CallbackDict.__init__(self, initial, on_update)
         self.sid = sid
-        self.permanent = permanent
+        if permanent is not None:
+            self.permanent = permanent
         self.modified = False
+        # Expiry and creation time as stored; None for a session not yet saved
+        self.expires = expires
+        self.created_at = created_at
+
+
+class _CachedSession(NamedTuple):
+    """What the store holds for a sid, kept in memory between requests"""
+    payload: str
+    expires: datetime
+    created_at: str
 
 
 class ChromaSessionInterface(SessionInterface):
-    """Session interface for storing sessions in ChromaDB"""
+    """
+    Session interface for storing sessions in ChromaDB
+    
+    Hot sessions are served from an in-process LRU, so a request for a known
+    sid does not read the store. A save only writes when the data changed or
+    the stored expiry is close; otherwise the store and the cookie are left
+    alone. New sessions are upserted; sessions that were loaded from the store
+    are only updated, so a worker holding a cached copy cannot write back a
+    session another worker deleted. Session data is stored as compact tagged JSON (Flask's
+    cookie-session serializer) instead of hex-encoded pickle.
+    
+    With several worker processes, a change made by one worker (e.g. logout)
+    reaches the others' caches within cache_ttl seconds.
+    """
+    
+    serializer = session_json_serializer
     
-    def __init__(self, session_ops):
+    def __init__(self, session_ops, cache_size: int = 10000, cache_ttl: float = 60,
+                 refresh_ratio: float = 0.25):
+        """
+        Args:
+            session_ops: SessionOperations for the sessions collection
+            cache_size: Most sessions kept in memory (least recently used go first)
+            cache_ttl: Seconds a cached session is trusted before re-reading the store
+            refresh_ratio: Extend the expiry once less than this share of the lifetime remains
+        """
         self.session_ops = session_ops
+        self.refresh_ratio = refresh_ratio
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cache_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'cache_hits': 0, 'store_reads': 0, 'writes': 0, 'skipped_writes': 0}
     
     def generate_sid(self):
         """Generate a unique session ID"""
@@ -39,43 +79,81 @@ class ChromaSessionInterface(SessionInterface):
             return datetime.now() + app.permanent_session_lifetime
         return datetime.now() + timedelta(days=1)
     
+    def _lifetime(self, app, session) -> timedelta:
+        return app.permanent_session_lifetime if session.permanent else timedelta(days=1)
+    
+    def get_stats(self) -> Dict:
+        """Cache hits, store reads, and written vs skipped saves"""
+        with self._stats_lock:
+            return dict(self._stats)
+    
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+    
+    def _cache_get(self, sid: str) -> Optional[_CachedSession]:
+        with self._cache_lock:
+            return self._cache.get(sid)
+    
+    def _cache_put(self, sid: str, entry: _CachedSession):
+        with self._cache_lock:
+            self._cache[sid] = entry
+    
+    def _cache_drop(self, sid: str):
+        with self._cache_lock:
+            self._cache.pop(sid, None)
+    
+    def _load(self, sid: str) -> Optional[_CachedSession]:
+        """Cached entry for sid, reading the store on a miss"""
+        entry = self._cache_get(sid)
+        if entry is not None:
+            self._count('cache_hits')
+            return entry
+        
+        self._count('store_reads')
+        session_data = self.session_ops.get_session(sid)
+        if not session_data or not session_data.get('data'):
+            return None
+        entry = _CachedSession(
+            payload=session_data['data'],
+            expires=datetime.fromisoformat(session_data['expiration']),
+            created_at=session_data.get('created_at', '')
+        )
+        self._cache_put(sid, entry)
+        return entry
+    
     def open_session(self, app, request):
-        """Open a session from ChromaDB"""
+        """Open a session from the cache or ChromaDB"""
         sid = request.cookies.get(app.config['SESSION_COOKIE_NAME'])
         
         if not sid:
             sid = self.generate_sid()
             return ChromaSession(sid=sid, permanent=False)
         
-        # Try to load session from ChromaDB
         try:
-            session_data = self.session_ops.get_session(sid)
-            
-            if session_data:
-                # Check if expired
-                expiry = datetime.fromisoformat(session_data['expiration'])
-                if expiry > datetime.now():
-                    # Deserialize session data
-                    data_hex = session_data.get('data', '')
-                    if data_hex:
-                        # Convert hex string back to bytes
-                        data_bytes = bytes.fromhex(data_hex)
-                        data = pickle.loads(data_bytes)
-                        return ChromaSession(data, sid=sid, permanent=True)
+            entry = self._load(sid)
+            if entry is not None:
+                if entry.expires > datetime.now():
+                    data = self.serializer.loads(entry.payload)
+                    # permanent comes back from the stored '_permanent' key
+                    return ChromaSession(data, sid=sid, expires=entry.expires,
+                                         created_at=entry.created_at)
+                self._cache_drop(sid)
         except Exception as e:
             print(f"Error loading session: {e}")
         
-        # Create new session if not found or expired
+        # Create new session if not found, expired or unreadable (e.g. the old pickle format)
         return ChromaSession(sid=sid, permanent=False)
     
     def save_session(self, app, session, response):
-        """Save session to ChromaDB"""
+        """Save session to ChromaDB when it changed or its expiry needs extending"""
         domain = self.get_cookie_domain(app)
         path = self.get_cookie_path(app)
         
         if not session:
             # Delete session if empty
             if session.modified:
+                self._cache_drop(session.sid)
                 self.session_ops.delete_session(session.sid)
                 response.delete_cookie(
                     app.config['SESSION_COOKIE_NAME'],
@@ -84,50 +162,47 @@ class ChromaSessionInterface(SessionInterface):
                 )
             return
         
-        # Set cookie
-        httponly = self.get_cookie_httponly(app)
-        secure = self.get_cookie_secure(app)
-        samesite = self.get_cookie_samesite(app)
+        payload = self.serializer.dumps(dict(session))
+        
+        # Nothing to do if the stored copy is current and not close to expiring
+        if session.expires is not None:
+            refresh_at = session.expires - self._lifetime(app, session) * self.refresh_ratio
+            cached = self._cache_get(session.sid)
+            unchanged = not session.modified or (cached is not None and cached.payload == payload)
+            if unchanged and datetime.now() < refresh_at:
+                self._count('skipped_writes')
+                return
+        
         expires = self.get_expiration_time(app, session)
+        created_at = session.created_at or datetime.now().isoformat()
         
-        # Serialize session data
-        data = pickle.dumps(dict(session))
+        # Write through, then the cache
+        user_id = session.get('user_id', '')
+        if session.expires is None:
+            stored = self.session_ops.save_session(session.sid, user_id, expires, payload,
+                                                   created_at=created_at)
+        else:
+            # Update-only: a session deleted since it was loaded (e.g. logged
+            # out on another worker) stays deleted
+            stored = self.session_ops.update_session(session.sid, user_id, expires, payload)
+            if not stored:
+                self._cache_drop(session.sid)
+                return
         
-        # Save to ChromaDB
-        try:
-            # Check if session exists
-            existing = self.session_ops.get_session(session.sid)
-            
-            if existing:
-                # Update existing session
-                self.session_ops.delete_session(session.sid)
-            
-            # Create new session entry
-            session_doc = {
-                'id': session.sid,
-                'user_id': session.get('user_id', ''),
-                'created_at': datetime.now().isoformat(),
-                'expiration': expires.isoformat(),
-                'data': data.hex()  # Store as hex string
-            }
-            
-            self.session_ops.collection.add(
-                ids=[session.sid],
-                documents=[session.get('user_id', 'anonymous')],
-                metadatas=[session_doc]
-            )
-            
-        except Exception as e:
-            print(f"Error saving session: {e}")
+        if stored:
+            self._count('writes')
+            self._cache_put(session.sid, _CachedSession(payload, expires, created_at))
+        else:
+            self._cache_drop(session.sid)
         
         # Set cookie in response
         response.set_cookie(
             app.config['SESSION_COOKIE_NAME'],
             session.sid,
             expires=expires,
-            httponly=httponly,
+            httponly=self.get_cookie_httponly(app),
             domain=domain,
             path=path,
-            secure=secure,
-            samesite=samesite
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
         )
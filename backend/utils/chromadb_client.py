@@ -3,13 +3,15 @@ ChromaDB Client Utility
 Handles all ChromaDB connections and operations for Mindful Eating App
 """
 
-import chromadb
-from chromadb.config import Settings
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import base64
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import json
+import threading
+import time
 import uuid
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -18,12 +20,35 @@ load_dotenv()
 class ChromaDBClient:
     """ChromaDB client for Mindful Eating App"""
     
+    # Collections the app uses, created (or fetched) once per client
+    COLLECTIONS = {
+        'users': "User accounts and profiles",
+        'food_logs': "User food logging history",
+        'sessions': "User session management",
+        'chat_logs': "Chat interaction logs",
+        # Per-user daily nutrition rollups (maintained by FoodLogOperations)
+        'daily_totals': "Per-user per-day nutrition totals",
+        # One marker row per completed data migration (see MigrationOperations)
+        'migrations': "Completed data migrations",
+    }
+    
     def __init__(self):
         """Initialize ChromaDB client with configuration from .env"""
+        # Imported here so modules that only need the operation classes load without it
+        import chromadb
+        
         self.api_key = os.getenv('CHROMA_API_KEY')
         self.tenant = os.getenv('CHROMA_TENANT')
         self.database = os.getenv('CHROMA_DATABASE')
         
+        # HTTP connection pool and retry settings (Chroma Cloud only)
+        self.pool_size = int(os.getenv('CHROMA_POOL_SIZE', '10'))
+        self.max_retries = int(os.getenv('CHROMA_MAX_RETRIES', '3'))
+        self.retry_backoff = float(os.getenv('CHROMA_RETRY_BACKOFF_SECONDS', '0.5'))
+        
+        self._collections: Dict[str, Any] = {}
+        self._collections_lock = threading.Lock()
+        
         # Try cloud first, fallback to local
         use_local = os.getenv('CHROMA_USE_LOCAL', 'false').lower() == 'true'
         
@@ -35,14 +60,15 @@ class ChromaDBClient:
         else:
             # Use cloud ChromaDB
             try:
-                self.client = chromadb.HttpClient(
+                self.client = self._connect_with_retry(lambda: chromadb.HttpClient(
                     host="api.trychroma.com",
                     port=443,
                     ssl=True,
                     headers={"x-chroma-token": self.api_key},
                     tenant=self.tenant,
                     database=self.database
-                )
+                ))
+                self._configure_http_session()
             except Exception as e:
                 print(f"⚠️ Cloud ChromaDB failed: {e}")
                 print("⚠️ Falling back to local storage")
@@ -54,58 +80,177 @@ class ChromaDBClient:
         self.food_logs_collection = None
         self.sessions_collection = None
         self.chat_logs_collection = None
+        self.daily_totals_collection = None
+        self.migrations_collection = None
         
         self._initialize_collections()
         
         print(f"✅ Connected to ChromaDB: {self.database}")
     
+    def _connect_with_retry(self, connect):
+        """Call connect() until it succeeds, backing off exponentially between attempts"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return connect()
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                print(f"⚠️ ChromaDB connect failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def _configure_http_session(self):
+        """
+        Give the HTTP client's requests.Session a keep-alive pool and retries
+        
+        Every request goes through the one session, so connections (and TLS
+        handshakes) are reused across requests and threads. Connection errors
+        and 429/502/503/504 responses are retried with exponential backoff.
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        session = getattr(getattr(self.client, '_server', None), '_session', None)
+        if session is None:
+            print("⚠️ ChromaDB HTTP session not found; using default connection settings")
+            return
+        
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.retry_backoff,
+            status_forcelist=(429, 502, 503, 504),
+            # Chroma reads are POSTs too; writes are keyed by id, so a replay is harmless
+            allowed_methods=None,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+    
+    def collection(self, name: str, description: Optional[str] = None):
+        """
+        Get a collection handle, creating the collection on first use
+        
+        Handles are cached, so only the first call per name costs a round trip.
+        """
+        handle = self._collections.get(name)
+        if handle is None:
+            with self._collections_lock:
+                handle = self._collections.get(name)
+                if handle is None:
+                    description = description or self.COLLECTIONS.get(name, name)
+                    handle = self.client.get_or_create_collection(
+                        name=name,
+                        metadata={"description": description}
+                    )
+                    self._collections[name] = handle
+        return handle
+    
     def _initialize_collections(self):
         """Create or get collections"""
         try:
-            # Users collection
-            self.users_collection = self.client.get_or_create_collection(
-                name="users",
-                metadata={"description": "User accounts and profiles"}
-            )
-            
-            # Food logs collection
-            self.food_logs_collection = self.client.get_or_create_collection(
-                name="food_logs",
-                metadata={"description": "User food logging history"}
-            )
-            
-            # Sessions collection
-            self.sessions_collection = self.client.get_or_create_collection(
-                name="sessions",
-                metadata={"description": "User session management"}
-            )
-            
-            # Chat logs collection
-            self.chat_logs_collection = self.client.get_or_create_collection(
-                name="chat_logs",
-                metadata={"description": "Chat interaction logs"}
-            )
+            self.users_collection = self.collection('users')
+            self.food_logs_collection = self.collection('food_logs')
+            self.sessions_collection = self.collection('sessions')
+            self.chat_logs_collection = self.collection('chat_logs')
+            self.daily_totals_collection = self.collection('daily_totals')
+            self.migrations_collection = self.collection('migrations')
             
         except Exception as e:
             print(f"❌ Error initializing collections: {e}")
             raise
     
     def get_collection(self, collection_name: str):
-        """Get a collection by name"""
-        collections = {
-            'users': self.users_collection,
-            'food_logs': self.food_logs_collection,
-            'sessions': self.sessions_collection,
-            'chat_logs': self.chat_logs_collection
-        }
-        return collections.get(collection_name)
+        """Get a cached collection handle by name (None if it has not been opened)"""
+        return self._collections.get(collection_name)
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+def get_chroma_client() -> ChromaDBClient:
+    """Get the process-wide ChromaDBClient (connects on first call)"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = ChromaDBClient()
+    return _shared_client
 
 
 class UserOperations:
     """Handle all user-related database operations"""
     
-    def __init__(self, chroma_client: ChromaDBClient):
+    # Namespace for user ids derived from the email (uuid5), so a lookup is a get by id
+    USER_ID_NAMESPACE = uuid.UUID('6f1c2b0e-5d3a-4b8e-9a47-3c9e2f1d7a10')
+    
+    def __init__(self, chroma_client: ChromaDBClient, cache_size: int = 10000, cache_ttl: float = 300):
+        """
+        Args:
+            chroma_client: Shared ChromaDBClient
+            cache_size: Most user profiles kept in memory
+            cache_ttl: Seconds a cached profile is served before re-reading
+                       (bounds staleness across worker processes)
+        """
         self.collection = chroma_client.users_collection
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cache_lock = threading.Lock()
+    
+    @classmethod
+    def user_id_for(cls, email: str) -> str:
+        """Deterministic user id for an email"""
+        return str(uuid.uuid5(cls.USER_ID_NAMESPACE, email))
+    
+    @staticmethod
+    def _copy(user: Dict) -> Dict:
+        """Copy handed to callers so they cannot mutate the cached profile"""
+        user = dict(user)
+        if isinstance(user.get('goals'), dict):
+            user['goals'] = dict(user['goals'])
+        return user
+    
+    def _cache_put(self, email: str, user: Dict):
+        with self._cache_lock:
+            self._cache[email] = self._copy(user)
+    
+    def _fetch(self, email: str) -> Optional[Dict]:
+        """Read a user from ChromaDB by id, bypassing the cache"""
+        results = self.collection.get(ids=[self.user_id_for(email)])
+        if not results['ids']:
+            return None
+        user_data = results['metadatas'][0].copy()
+        user_data['_id'] = results['ids'][0]
+        # Parse goals from JSON string
+        if 'goals' in user_data and isinstance(user_data['goals'], str):
+            user_data['goals'] = json.loads(user_data['goals'])
+        return user_data
+    
+    @classmethod
+    def build_user_row(cls, email: str, name: str, password_hash: str, goals: Dict,
+                       created_at: Optional[datetime] = None) -> Tuple[str, str, Dict]:
+        """
+        Build the id, document and metadata stored for one user
+        
+        Args:
+            email: User email (the id is derived from it)
+            name: Display name
+            password_hash: Hashed password
+            goals: Nutrition goals
+            created_at: Account creation time (defaults to now)
+            
+        Returns:
+            (user_id, document, metadata)
+        """
+        metadata = {
+            'email': email,
+            'name': name,
+            'password': password_hash,
+            'created_at': (created_at or datetime.now()).isoformat(),
+            'goals': json.dumps(goals)  # Serialize goals to JSON string
+        }
+        # Use email as document for searchability
+        return cls.user_id_for(email), email, metadata
     
     def create_user(self, email: str, name: str, password_hash: str, custom_goals: Optional[Dict] = None) -> Dict:
         """Create a new user"""
@@ -122,21 +267,15 @@ class UserOperations:
         if self.user_exists(email):
             return {'success': False, 'error': 'User already exists'}
         
-        user_id = str(uuid.uuid4())
-        user_doc = {
-            'email': email,
-            'name': name,
-            'password': password_hash,
-            'created_at': datetime.now().isoformat(),
-            'goals': json.dumps(goals)  # Serialize goals to JSON string
-        }
+        user_id, document, user_doc = self.build_user_row(email, name, password_hash, goals)
         
         try:
             self.collection.add(
                 ids=[user_id],
-                documents=[email],  # Use email as document for searchability
+                documents=[document],
                 metadatas=[user_doc]
             )
+            self._cache_put(email, {**user_doc, 'goals': goals, '_id': user_id})
             return {'success': True, 'user_id': user_id}
         except Exception as e:
             print(f"❌ Error creating user: {e}")
@@ -145,28 +284,25 @@ class UserOperations:
             return {'success': False, 'error': str(e)}
     
     def get_user_by_email(self, email: str) -> Optional[Dict]:
-        """Get user by email"""
+        """Get user by email (served from the profile cache when possible)"""
+        with self._cache_lock:
+            cached = self._cache.get(email)
+        if cached is not None:
+            return self._copy(cached)
+        
         try:
-            results = self.collection.get(
-                where={"email": email}
-            )
-            
-            if results['ids']:
-                user_data = results['metadatas'][0].copy()
-                user_data['_id'] = results['ids'][0]
-                # Parse goals from JSON string
-                if 'goals' in user_data and isinstance(user_data['goals'], str):
-                    user_data['goals'] = json.loads(user_data['goals'])
-                return user_data
-            return None
+            user_data = self._fetch(email)
+            if user_data:
+                self._cache_put(email, user_data)
+            return user_data
         except Exception as e:
             print(f"Error getting user: {e}")
             return None
     
     def update_user_goals(self, email: str, goals: Dict) -> bool:
-        """Update user's nutrition goals"""
+        """Update user's nutrition goals (write-through to the profile cache)"""
         try:
-            user = self.get_user_by_email(email)
+            user = self._fetch(email)
             if not user:
                 return False
             
@@ -178,123 +314,445 @@ class UserOperations:
                 ids=[user['_id']],
                 metadatas=[user_metadata]
             )
+            self._cache_put(email, {**user, 'goals': dict(goals)})
             return True
         except Exception as e:
+            with self._cache_lock:
+                self._cache.pop(email, None)
             print(f"Error updating goals: {e}")
             return False
     
     def user_exists(self, email: str) -> bool:
         """Check if user exists"""
+        with self._cache_lock:
+            if email in self._cache:
+                return True
         try:
-            results = self.collection.get(
-                where={"email": email}
-            )
+            results = self.collection.get(ids=[self.user_id_for(email)], include=[])
             return len(results['ids']) > 0
         except:
             return False
+    
+    def backfill_user_ids(self, batch_size: int = 500) -> Optional[int]:
+        """
+        Move users created with random ids to the id derived from their email
+        
+        Lookups go by id, so rows under any other id would not be found.
+        
+        Args:
+            batch_size: Rows read per page
+            
+        Returns:
+            Number of users moved, or None if the backfill stopped on an error
+        """
+        moved = 0
+        offset = 0
+        try:
+            while True:
+                page = self.collection.get(include=['metadatas', 'documents'], limit=batch_size, offset=offset)
+                if not page['ids']:
+                    break
+                
+                stale = [
+                    (user_id, document, metadata)
+                    for user_id, document, metadata in zip(page['ids'], page['documents'], page['metadatas'])
+                    if user_id != self.user_id_for(metadata['email'])
+                ]
+                if stale:
+                    self.collection.upsert(
+                        ids=[self.user_id_for(metadata['email']) for _, _, metadata in stale],
+                        documents=[document for _, document, _ in stale],
+                        metadatas=[metadata for _, _, metadata in stale]
+                    )
+                    self.collection.delete(ids=[user_id for user_id, _, _ in stale])
+                    moved += len(stale)
+                
+                # Moved rows leave this page, new ids may land anywhere: step past what stayed
+                offset += len(page['ids']) - len(stale)
+            
+            if moved:
+                print(f"✅ Moved {moved} users to email-derived ids")
+            return moved
+        except Exception as e:
+            print(f"Error backfilling user ids after {moved} users: {e}")
+            return None
 
 
 class FoodLogOperations:
     """Handle all food log database operations"""
     
+    NUTRIENT_KEYS = ('calories', 'protein', 'carbs', 'fat', 'fiber')
+    # Most logs get_logs_page returns, whatever limit is asked for
+    MAX_PAGE_SIZE = 200
+    # Days of rollups the first page-sizing read covers (each further read doubles it)
+    PAGE_WINDOW_DAYS = 32
+    # Recomputes a rollup write gets before its days are dropped for the next read to rebuild
+    ROLLUP_WRITE_ATTEMPTS = 3
+    
     def __init__(self, chroma_client: ChromaDBClient):
         self.collection = chroma_client.food_logs_collection
+        self.daily_totals_collection = chroma_client.daily_totals_collection
+        # Serializes read-modify-write of rollup documents within this process
+        self._totals_lock = threading.Lock()
     
     def create_log(self, user_id: str, meal_type: str, foods: List[Dict], 
                    total_nutrition: Dict, original_text: str) -> Dict:
         """Create a new food log entry"""
-        log_id = str(uuid.uuid4())
-        timestamp = datetime.now()
-        
-        log_doc = {
-            'user_id': user_id,
-            'timestamp': timestamp.isoformat(),
+        logs = self.create_logs(user_id, [{
             'meal_type': meal_type,
-            'foods': json.dumps(foods),  # Store as JSON string
-            'total_nutrition': json.dumps(total_nutrition),
+            'foods': foods,
+            'total_nutrition': total_nutrition,
             'original_text': original_text
-        }
+        }])
+        return logs[0] if logs else {}
+    
+    def create_logs(self, user_id: str, entries: List[Dict]) -> List[Dict]:
+        """
+        Create several food log entries with one add
         
-        # Create searchable document from food names
-        food_names = ', '.join([f['name'] for f in foods])
-        document = f"{meal_type}: {food_names} - {original_text}"
+        Args:
+            user_id: User email
+            entries: Dicts with meal_type, foods, total_nutrition, original_text
+                     and optionally timestamp (datetime; defaults to now)
+            
+        Returns:
+            The formatted logs in entry order ([] if the add failed)
+        """
+        if not entries:
+            return []
         
-        try:
-            self.collection.add(
-                ids=[log_id],
-                documents=[document],
-                metadatas=[log_doc]
-            )
+        now = datetime.now()
+        logs, ids, documents, metadatas = [], [], [], []
+        for entry in entries:
+            timestamp = entry.get('timestamp') or now
+            log_id, document, metadata = self.build_log_row(user_id, entry, timestamp)
+            ids.append(log_id)
+            documents.append(document)
+            metadatas.append(metadata)
             
-            # Return formatted log
-            return {
+            logs.append({
                 '_id': log_id,
                 'user_id': user_id,
                 'timestamp': timestamp.isoformat(),
-                'meal_type': meal_type,
-                'foods': foods,
-                'total_nutrition': total_nutrition,
-                'original_text': original_text
-            }
+                'meal_type': entry['meal_type'],
+                'foods': entry['foods'],
+                'total_nutrition': entry['total_nutrition'],
+                'original_text': entry['original_text']
+            })
+        
+        try:
+            self.collection.add(
+                ids=ids,
+                documents=documents,
+                metadatas=metadatas
+            )
         except Exception as e:
             print(f"Error creating log: {e}")
-            return {}
+            return []
+        
+        self._refresh_daily_totals(user_id, sorted({log['timestamp'][:10] for log in logs}))
+        return logs
+    
+    @classmethod
+    def build_log_row(cls, user_id: str, entry: Dict, timestamp: datetime,
+                      log_id: Optional[str] = None) -> Tuple[str, str, Dict]:
+        """
+        Build the id, document and metadata stored for one food log
+        
+        Args:
+            user_id: User email
+            entry: Dict with meal_type, foods, total_nutrition, original_text
+            timestamp: When the meal was eaten
+            log_id: Id to store under (defaults to a new uuid4)
+            
+        Returns:
+            (log_id, document, metadata)
+        """
+        metadata = {
+            'user_id': user_id,
+            'timestamp': timestamp.isoformat(),
+            **cls._time_keys(timestamp),
+            'meal_type': entry['meal_type'],
+            'foods': json.dumps(entry['foods']),  # Store as JSON string
+            'total_nutrition': json.dumps(entry['total_nutrition']),
+            'original_text': entry['original_text']
+        }
+        
+        # Create searchable document from food names
+        food_names = ', '.join([f['name'] for f in entry['foods']])
+        document = f"{entry['meal_type']}: {food_names} - {entry['original_text']}"
+        return log_id or str(uuid.uuid4()), document, metadata
+    
+    @staticmethod
+    def _time_keys(timestamp: datetime) -> Dict:
+        """Numeric metadata used for range filters (epoch seconds and YYYYMMDD day key)"""
+        return {
+            'timestamp_epoch': timestamp.timestamp(),
+            'day_key': int(timestamp.strftime('%Y%m%d'))
+        }
+    
+    @staticmethod
+    def _epoch_of(metadata: Dict) -> float:
+        """Sort key for a log row (parses the ISO timestamp only for un-migrated rows)"""
+        epoch = metadata.get('timestamp_epoch')
+        if epoch is None:
+            epoch = datetime.fromisoformat(metadata['timestamp']).timestamp()
+        return epoch
+    
+    def backfill_timestamps(self, batch_size: int = 500) -> Optional[int]:
+        """
+        Add numeric time keys to logs written before they existed
+        
+        Range queries filter on timestamp_epoch, so rows without it would be skipped.
+        
+        Args:
+            batch_size: Rows read per page
+            
+        Returns:
+            Number of logs updated, or None if the backfill stopped on an error
+        """
+        updated = 0
+        offset = 0
+        try:
+            while True:
+                page = self.collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+                if not page['ids']:
+                    break
+                
+                ids, metadatas = [], []
+                for log_id, metadata in zip(page['ids'], page['metadatas']):
+                    if 'timestamp_epoch' in metadata:
+                        continue
+                    ids.append(log_id)
+                    metadatas.append({
+                        **metadata,
+                        **self._time_keys(datetime.fromisoformat(metadata['timestamp']))
+                    })
+                
+                if ids:
+                    self.collection.update(ids=ids, metadatas=metadatas)
+                    updated += len(ids)
+                
+                offset += len(page['ids'])
+            
+            if updated:
+                print(f"✅ Backfilled time keys on {updated} food logs")
+            return updated
+        except Exception as e:
+            print(f"Error backfilling log timestamps after {updated} logs: {e}")
+            return None
+    
+    def _log_where(self, user_id: str, start_epoch: Optional[float] = None,
+                   end_epoch: Optional[float] = None) -> Dict:
+        """Where clause for a user's logs; time bounds are pushed down as numeric range predicates"""
+        conditions = [{"user_id": user_id}]
+        if start_epoch is not None:
+            conditions.append({"timestamp_epoch": {"$gte": start_epoch}})
+        if end_epoch is not None:
+            conditions.append({"timestamp_epoch": {"$lte": end_epoch}})
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+    
+    @staticmethod
+    def _format_log(log_id: str, metadata: Dict) -> Dict:
+        """Log dict handed to callers (JSON fields parsed)"""
+        return {
+            '_id': log_id,
+            'user_id': metadata['user_id'],
+            'timestamp': metadata['timestamp'],
+            'meal_type': metadata['meal_type'],
+            'foods': json.loads(metadata['foods']),
+            'total_nutrition': json.loads(metadata['total_nutrition']),
+            'original_text': metadata['original_text']
+        }
     
     def get_user_logs(self, user_id: str, limit: Optional[int] = None, 
                      start_date: Optional[datetime] = None, 
                      end_date: Optional[datetime] = None) -> List[Dict]:
         """Get user's food logs with optional filters"""
         try:
-            # Build where clause
-            where_clause = {"user_id": user_id}
-            
-            # Get all logs for user
             results = self.collection.get(
-                where=where_clause
+                where=self._log_where(
+                    user_id,
+                    start_date.timestamp() if start_date else None,
+                    end_date.timestamp() if end_date else None
+                ),
+                include=['metadatas']
             )
             
             if not results['ids']:
                 return []
             
-            # Parse and filter logs
-            logs = []
-            for i, log_id in enumerate(results['ids']):
-                metadata = results['metadatas'][i]
-                
-                # Parse timestamp
-                log_timestamp = datetime.fromisoformat(metadata['timestamp'])
-                
-                # Apply date filters
-                if start_date and log_timestamp < start_date:
-                    continue
-                if end_date and log_timestamp > end_date:
-                    continue
-                
-                # Parse JSON fields
-                log = {
-                    '_id': log_id,
-                    'user_id': metadata['user_id'],
-                    'timestamp': metadata['timestamp'],
-                    'meal_type': metadata['meal_type'],
-                    'foods': json.loads(metadata['foods']),
-                    'total_nutrition': json.loads(metadata['total_nutrition']),
-                    'original_text': metadata['original_text']
-                }
-                logs.append(log)
-            
-            # Sort by timestamp (newest first)
-            logs.sort(key=lambda x: x['timestamp'], reverse=True)
-            
-            # Apply limit
+            # Sort by timestamp (newest first) and apply limit before decoding
+            rows = sorted(
+                zip(results['ids'], results['metadatas']),
+                key=lambda row: self._epoch_of(row[1]),
+                reverse=True
+            )
             if limit:
-                logs = logs[:limit]
+                rows = rows[:limit]
             
-            return logs
+            # Parse JSON fields of the returned rows only
+            return [self._format_log(log_id, metadata) for log_id, metadata in rows]
             
         except Exception as e:
             print(f"Error getting logs: {e}")
             return []
     
+    @staticmethod
+    def encode_cursor(epoch: float, log_id: str) -> str:
+        """Opaque page cursor for the position of one log (its timestamp and id)"""
+        raw = json.dumps([epoch, log_id], separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[float, str]:
+        """
+        Position encoded by encode_cursor
+        
+        Raises:
+            ValueError: The cursor is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            epoch, log_id = json.loads(raw)
+            epoch = float(epoch)
+            # Pages convert the epoch to a datetime, so it has to be one
+            datetime.fromtimestamp(epoch)
+            return epoch, str(log_id)
+        except (ValueError, TypeError, OverflowError, OSError) as e:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    
+    def _nonempty_rollups(self, user_id: str, day_conditions: List[Dict],
+                          limit: Optional[int] = None) -> List[Dict]:
+        """Metadata of a user's rollups that have logs, filtered by operators on day_key"""
+        results = self.daily_totals_collection.get(
+            where={"$and": [
+                {"user_id": user_id},
+                {"log_count": {"$gt": 0}},
+                *({"day_key": condition} for condition in day_conditions)
+            ]},
+            include=['metadatas'],
+            limit=limit
+        )
+        return results['metadatas']
+    
+    def _page_start(self, user_id: str, top_day: date, needed: int, skip_top_day: bool,
+                    start_date: Optional[datetime]) -> Optional[float]:
+        """
+        Earliest epoch a page has to read to find `needed` logs at or before top_day
+        
+        Sizes the page from the user's non-empty daily rollups (one small row
+        per logged day), read in windows walking back from top_day. The first
+        window covers PAGE_WINDOW_DAYS and each further one doubles, so a
+        sparse history takes a few small reads instead of one read of every
+        rollup. Returns the start of the day where their log counts add up (or
+        the start_date bound), or None when no older rollups are left. Days
+        without a stored rollup are not counted, which only makes the page
+        read further back.
+        """
+        day_key = lambda day: int(day.strftime('%Y%m%d'))
+        floor = start_date.date() if start_date else date.min
+        high, span, count = top_day, self.PAGE_WINDOW_DAYS, 0
+        
+        while True:
+            low = high - timedelta(days=min(span - 1, (high - floor).days))
+            metadatas = self._nonempty_rollups(user_id, [{"$gte": day_key(low)}, {"$lte": day_key(high)}])
+            for metadata in sorted(metadatas, key=lambda m: m['day_key'], reverse=True):
+                # Logs on the cursor's day may already have been served, so they
+                # are read but not counted towards the page
+                if skip_top_day and metadata['day'] == top_day.isoformat():
+                    continue
+                count += metadata['log_count']
+                if count >= needed:
+                    return datetime.fromisoformat(metadata['day']).timestamp()
+            
+            if low <= floor:
+                return start_date.timestamp() if start_date else None
+            # An empty window may just be a gap; stop only when nothing older exists
+            if not metadatas and not self._nonempty_rollups(user_id, [{"$lt": day_key(low)}], limit=1):
+                return None
+            high, span = low - timedelta(days=1), span * 2
+    
+    def _page_rows(self, user_id: str, start_epoch: Optional[float], end_epoch: Optional[float],
+                   after: Optional[Tuple[float, str]]) -> List[Tuple[float, str, Dict]]:
+        """Logs in an epoch range as (epoch, id, metadata), in keyset order strictly after the cursor"""
+        results = self.collection.get(
+            where=self._log_where(user_id, start_epoch, end_epoch),
+            include=['metadatas']
+        )
+        # Keyset order: (timestamp, id) descending
+        rows = [(self._epoch_of(metadata), log_id, metadata)
+                for log_id, metadata in zip(results['ids'], results['metadatas'])]
+        if after:
+            rows = [row for row in rows if (row[0], row[1]) < after]
+        rows.sort(key=lambda row: (row[0], row[1]), reverse=True)
+        return rows
+    
+    def _has_logs_before(self, user_id: str, epoch: float, floor_epoch: Optional[float]) -> bool:
+        """Whether the user has a log older than epoch (and not older than floor_epoch), with a limit=1 read"""
+        conditions = [{"user_id": user_id}, {"timestamp_epoch": {"$lt": epoch}}]
+        if floor_epoch is not None:
+            conditions.append({"timestamp_epoch": {"$gte": floor_epoch}})
+        return bool(self.collection.get(where={"$and": conditions}, include=[], limit=1)['ids'])
+    
+    def get_logs_page(self, user_id: str, limit: int = 50, cursor: Optional[str] = None,
+                      start_date: Optional[datetime] = None,
+                      end_date: Optional[datetime] = None) -> Dict:
+        """
+        Get one page of a user's logs, newest first
+        
+        The read is sized from the daily rollups: a few small reads of the
+        rollups find how far back the page reaches, then one ranged read covers
+        the cursor's day plus just enough older days to fill it. A page that
+        comes up short checks for older logs with a limit=1 read before ending
+        the history, and reads the rest of the range if the rollups over-counted
+        (e.g. a stale log_count). Reads never write.
+        
+        Args:
+            user_id: User email
+            limit: Logs per page (capped at MAX_PAGE_SIZE)
+            cursor: next_cursor of the previous page (None for the first page)
+            start_date: Oldest log time to include
+            end_date: Newest log time to include
+            
+        Returns:
+            Dict with 'logs' and 'next_cursor' (None on the last page)
+            
+        Raises:
+            ValueError: The cursor is malformed
+        """
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+        after = self.decode_cursor(cursor) if cursor else None
+        
+        if after:
+            top = datetime.fromtimestamp(after[0])
+            end_epoch = after[0]
+        else:
+            top = end_date or datetime.now()
+            end_epoch = end_date.timestamp() if end_date else None
+        
+        try:
+            floor_epoch = start_date.timestamp() if start_date else None
+            start_epoch = self._page_start(user_id, top.date(), limit + 1, after is not None, start_date)
+            if start_date:
+                start_epoch = max(start_epoch or 0, floor_epoch)
+            
+            rows = self._page_rows(user_id, start_epoch, end_epoch, after)
+            if len(rows) <= limit and start_epoch is not None and start_epoch != floor_epoch \
+                    and self._has_logs_before(user_id, start_epoch, floor_epoch):
+                print(f"⚠️ Daily rollups for {user_id} over-count logs; reading the rest of the page range")
+                rows = self._page_rows(user_id, floor_epoch, end_epoch, after)
+            
+            page = rows[:limit]
+            next_cursor = self.encode_cursor(page[-1][0], page[-1][1]) if len(rows) > limit else None
+            return {
+                'logs': [self._format_log(log_id, metadata) for _, log_id, metadata in page],
+                'next_cursor': next_cursor
+            }
+        except Exception as e:
+            print(f"Error getting log page: {e}")
+            return {'logs': [], 'next_cursor': None}
+    
     def get_today_logs(self, user_id: str) -> List[Dict]:
         """Get today's logs for a user"""
         today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -307,6 +765,220 @@ class FoodLogOperations:
         start_date = datetime.now() - timedelta(days=days)
         return self.get_user_logs(user_id, start_date=start_date)
     
+    @staticmethod
+    def _daily_total_id(user_id: str, day: str) -> str:
+        """Deterministic rollup document id for a user and ISO day"""
+        return f"daily_{user_id}_{day}"
+    
+    def _empty_bucket(self) -> Dict:
+        bucket = {key: 0.0 for key in self.NUTRIENT_KEYS}
+        bucket.update({'log_count': 0, 'food_counts': {}, 'meal_counts': {}, 'category_counts': {}})
+        return bucket
+    
+    def _add_to_bucket(self, bucket: Dict, total_nutrition: Dict, foods: List[Dict], meal_type: str):
+        """Add one log to a day bucket"""
+        for key in self.NUTRIENT_KEYS:
+            bucket[key] += total_nutrition.get(key, 0)
+        bucket['log_count'] += 1
+        
+        names = [('food_counts', food.get('name', '')) for food in foods]
+        names.extend(('category_counts', food['category']) for food in foods if food.get('category'))
+        names.append(('meal_counts', meal_type))
+        for field, name in names:
+            counts = bucket[field]
+            counts[name] = counts.get(name, 0) + 1
+    
+    @staticmethod
+    def _decode_bucket(metadata: Dict) -> Dict:
+        bucket = dict(metadata)
+        bucket['food_counts'] = json.loads(metadata.get('food_counts', '{}'))
+        bucket['meal_counts'] = json.loads(metadata.get('meal_counts', '{}'))
+        bucket['category_counts'] = json.loads(metadata.get('category_counts', '{}'))
+        return bucket
+    
+    def _store_daily_totals(self, user_id: str, buckets: Dict[str, Dict]):
+        """Upsert day buckets in one call (count maps are stored as JSON strings)"""
+        days = list(buckets)
+        self.daily_totals_collection.upsert(
+            ids=[self._daily_total_id(user_id, day) for day in days],
+            documents=[f"{user_id} {day}" for day in days],
+            metadatas=[{
+                **{key: buckets[day][key] for key in self.NUTRIENT_KEYS},
+                'user_id': user_id,
+                'day': day,
+                'day_key': int(day.replace('-', '')),
+                'log_count': buckets[day]['log_count'],
+                'food_counts': json.dumps(buckets[day]['food_counts']),
+                'meal_counts': json.dumps(buckets[day]['meal_counts']),
+                'category_counts': json.dumps(buckets[day]['category_counts'])
+            } for day in days]
+        )
+    
+    def _compute_daily_totals(self, user_id: str, days: List[str]) -> Dict[str, Dict]:
+        """Sum the given days' logs into buckets with one query on their day keys"""
+        day_keys = [int(day.replace('-', '')) for day in days]
+        results = self.collection.get(
+            where={"$and": [{"user_id": user_id}, {"day_key": {"$in": day_keys}}]},
+            include=['metadatas']
+        )
+        
+        buckets = {day: self._empty_bucket() for day in days}
+        for metadata in results['metadatas']:
+            bucket = buckets.get(metadata['timestamp'][:10])
+            if bucket is not None:
+                self._add_to_bucket(bucket, json.loads(metadata['total_nutrition']),
+                                    json.loads(metadata['foods']), metadata['meal_type'])
+        return buckets
+    
+    def _rebuild_daily_totals(self, user_id: str, days: List[str]) -> Dict[str, Dict]:
+        """Rebuild the given day buckets from the logs and store them"""
+        buckets = self._compute_daily_totals(user_id, days)
+        # Empty days are stored too, so a day that lost its last log reads as empty
+        self._store_daily_totals(user_id, buckets)
+        return buckets
+    
+    def _stale_daily_totals(self, user_id: str, days: List[str]) -> List[str]:
+        """Days whose stored rollup log_count differs from the number of logs now on that day"""
+        stored = self.daily_totals_collection.get(
+            ids=[self._daily_total_id(user_id, day) for day in days],
+            include=['metadatas']
+        )
+        logs = self.collection.get(
+            where={"$and": [{"user_id": user_id},
+                            {"day_key": {"$in": [int(day.replace('-', '')) for day in days]}}]},
+            include=['metadatas']
+        )
+        counts = {}
+        for metadata in logs['metadatas']:
+            day = metadata['timestamp'][:10]
+            counts[day] = counts.get(day, 0) + 1
+        return sorted(metadata['day'] for metadata in stored['metadatas']
+                      if metadata.get('log_count') != counts.get(metadata['day'], 0))
+    
+    def _refresh_daily_totals(self, user_id: str, days: List[str]):
+        """
+        Recompute the rollups of days whose logs just changed
+        
+        Each write recomputes its days from the logs instead of adjusting the
+        stored totals (so repeating a refresh is harmless). The lock only
+        covers this process, so after the upsert the stored log_count is
+        checked against the day's logs: a worker that computed its rollup
+        before another worker's log landed may have written last. Mismatched
+        days are recomputed, and dropped for the next read to rebuild if they
+        still disagree after ROLLUP_WRITE_ATTEMPTS.
+        
+        Args:
+            user_id: User email
+            days: ISO days that gained or lost logs
+        """
+        with self._totals_lock:
+            try:
+                for _ in range(self.ROLLUP_WRITE_ATTEMPTS):
+                    self._rebuild_daily_totals(user_id, days)
+                    days = self._stale_daily_totals(user_id, days)
+                    if not days:
+                        break
+                else:
+                    raise RuntimeError('rollup still disagrees with the logs')
+            except Exception as e:
+                # Drop the rollups so the next read rebuilds them from the logs
+                print(f"⚠️ Error updating daily totals for {user_id} {', '.join(days)}: {e}")
+                try:
+                    self.daily_totals_collection.delete(
+                        ids=[self._daily_total_id(user_id, day) for day in days]
+                    )
+                except Exception:
+                    pass
+    
+    def invalidate_daily_totals(self, days_by_user: Dict[str, List[str]]) -> bool:
+        """
+        Drop the rollups of days whose logs were written directly (e.g. a bulk import)
+        
+        The next read of those days rebuilds them from the logs.
+        
+        Args:
+            days_by_user: ISO days per user email
+            
+        Returns:
+            True if the rollups were dropped
+        """
+        ids = [self._daily_total_id(user_id, day)
+               for user_id, days in days_by_user.items() for day in days]
+        if not ids:
+            return True
+        try:
+            with self._totals_lock:
+                # Delete only rollups that exist (one read, one delete)
+                existing = self.daily_totals_collection.get(ids=ids, include=[])['ids']
+                if existing:
+                    self.daily_totals_collection.delete(ids=existing)
+            return True
+        except Exception as e:
+            print(f"⚠️ Error dropping daily totals: {e}")
+            return False
+    
+    def get_daily_buckets(self, user_id: str, start_day: datetime, end_day: datetime) -> Dict[str, Dict]:
+        """
+        Get a user's per-day rollups for a range of days in one read
+        
+        Args:
+            user_id: User email
+            start_day: Any datetime on the first day
+            end_day: Any datetime on the last day
+            
+        Returns:
+            Dict mapping ISO day to its bucket (nutrient sums, log_count,
+            food_counts, meal_counts and category_counts); every day in the
+            range is present
+        """
+        first = start_day.date()
+        days = [(first + timedelta(days=i)).isoformat()
+                for i in range((end_day.date() - first).days + 1)]
+        
+        try:
+            results = self.daily_totals_collection.get(
+                ids=[self._daily_total_id(user_id, day) for day in days]
+            )
+            # Rollups stored before category_counts existed are rebuilt like missing ones
+            buckets = {
+                metadata['day']: self._decode_bucket(metadata)
+                for metadata in results['metadatas']
+                if 'category_counts' in metadata
+            }
+            
+            missing = [day for day in days if day not in buckets]
+            if missing:
+                rebuilt = self._compute_daily_totals(user_id, missing)
+                buckets.update(rebuilt)
+                # Keep days that have logs; empty days are not written on reads
+                logged = {day: bucket for day, bucket in rebuilt.items() if bucket['log_count']}
+                if logged:
+                    with self._totals_lock:
+                        self._store_daily_totals(user_id, logged)
+            
+            return {day: buckets[day] for day in days}
+        except Exception as e:
+            print(f"Error getting daily buckets: {e}")
+            return {day: self._empty_bucket() for day in days}
+    
+    def get_daily_total(self, user_id: str, day: Optional[datetime] = None) -> Dict:
+        """
+        Get a user's nutrition totals for one day from the materialized rollup
+        
+        Args:
+            user_id: User email
+            day: Any datetime on the wanted day (defaults to today)
+            
+        Returns:
+            Dict with calories, protein, carbs, fat, fiber and log_count
+        """
+        day = day or datetime.now()
+        bucket = self.get_daily_buckets(user_id, day, day)[day.date().isoformat()]
+        
+        totals = {key: round(float(bucket[key]), 1) for key in self.NUTRIENT_KEYS}
+        totals['log_count'] = int(bucket['log_count'])
+        return totals
+    
     def delete_log(self, log_id: str, user_id: str) -> bool:
         """Delete a food log entry"""
         try:
@@ -320,6 +992,8 @@ class FoodLogOperations:
                 return False
             
             self.collection.delete(ids=[log_id])
+            
+            self._refresh_daily_totals(user_id, [metadata['timestamp'][:10]])
             return True
         except Exception as e:
             print(f"Error deleting log: {e}")
@@ -338,7 +1012,8 @@ class SessionOperations:
             'id': session_id,
             'user_id': user_id,
             'created_at': datetime.now().isoformat(),
-            'expiration': expiry.isoformat()
+            'expiration': expiry.isoformat(),
+            'expires_at': expiry.timestamp()
         }
         
         try:
@@ -359,6 +1034,74 @@ class SessionOperations:
             return None
         except:
             return None
+
+    def save_session(self, session_id: str, user_id: str, expiry: datetime, data: str,
+                     created_at: Optional[str] = None) -> bool:
+        """
+        Insert or replace a session with one upsert
+        
+        Args:
+            session_id: Session ID
+            user_id: User email ('' for anonymous sessions)
+            expiry: Expiration time
+            data: Serialized session data
+            created_at: ISO creation time to keep (defaults to now)
+        
+        Returns:
+            True if stored
+        """
+        session_doc = {
+            'id': session_id,
+            'user_id': user_id,
+            'created_at': created_at or datetime.now().isoformat(),
+            'expiration': expiry.isoformat(),
+            'expires_at': expiry.timestamp(),
+            'data': data
+        }
+        
+        try:
+            self.collection.upsert(
+                ids=[session_id],
+                documents=[user_id or 'anonymous'],
+                metadatas=[session_doc]
+            )
+            return True
+        except Exception as e:
+            print(f"Error saving session: {e}")
+            return False
+    
+    def update_session(self, session_id: str, user_id: str, expiry: datetime, data: str) -> bool:
+        """
+        Rewrite an existing session's data and expiry without creating it
+        
+        Unlike save_session this never inserts, so a session deleted by
+        another worker (e.g. on logout) is not written back. One write, no read:
+        ChromaDB skips ids that are not stored.
+        
+        Args:
+            session_id: Session ID
+            user_id: User email ('' for anonymous sessions)
+            expiry: Expiration time
+            data: Serialized session data
+        
+        Returns:
+            True if the write went through (including the no-op for a deleted session)
+        """
+        try:
+            self.collection.update(
+                ids=[session_id],
+                documents=[user_id or 'anonymous'],
+                metadatas=[{
+                    'user_id': user_id,
+                    'expiration': expiry.isoformat(),
+                    'expires_at': expiry.timestamp(),
+                    'data': data
+                }]
+            )
+            return True
+        except Exception as e:
+            print(f"Error updating session: {e}")
+            return False
     
     def delete_session(self, session_id: str):
         """Delete a session"""
@@ -367,32 +1110,128 @@ class SessionOperations:
         except Exception as e:
             print(f"Error deleting session: {e}")
     
-    def cleanup_expired_sessions(self) -> int:
-        """Remove expired sessions"""
-        try:
-            # Get all sessions
-            results = self.collection.get()
+    def cleanup_expired_sessions(self, batch_size: int = 500, max_batches: Optional[int] = None) -> int:
+        """
+        Remove expired sessions in bounded batches
+        
+        The expiry filter runs inside ChromaDB on the numeric expires_at key, so
+        each batch reads only ids of expired sessions, never the whole collection.
+        
+        Args:
+            batch_size: Sessions deleted per round trip
+            max_batches: Stop after this many batches (None: until none are left)
             
-            if not results['ids']:
-                return 0
+        Returns:
+            Number of sessions deleted
+        """
+        now = datetime.now().timestamp()
+        deleted = 0
+        batches = 0
+        try:
+            while max_batches is None or batches < max_batches:
+                expired = self.collection.get(
+                    where={'expires_at': {'$lt': now}},
+                    limit=batch_size,
+                    include=[]
+                )
+                if not expired['ids']:
+                    break
+                
+                self.collection.delete(ids=expired['ids'])
+                deleted += len(expired['ids'])
+                batches += 1
+                
+                if len(expired['ids']) < batch_size:
+                    break
             
-            now = datetime.now()
-            expired_ids = []
+            return deleted
+        except Exception as e:
+            print(f"Error cleaning up sessions: {e}")
+            return deleted
+    
+    def backfill_expiry(self, batch_size: int = 500) -> Optional[int]:
+        """
+        Add the numeric expires_at key to sessions written before it existed
+        
+        The sweeper filters on expires_at, so rows without it would never be removed.
+        
+        Args:
+            batch_size: Rows read per page
             
-            for i, session_id in enumerate(results['ids']):
-                metadata = results['metadatas'][i]
-                expiry = datetime.fromisoformat(metadata['expiration'])
+        Returns:
+            Number of sessions updated, or None if the backfill stopped on an error
+        """
+        updated = 0
+        offset = 0
+        try:
+            while True:
+                page = self.collection.get(include=['metadatas'], limit=batch_size, offset=offset)
+                if not page['ids']:
+                    break
+                
+                ids, metadatas = [], []
+                for session_id, metadata in zip(page['ids'], page['metadatas']):
+                    if 'expires_at' in metadata:
+                        continue
+                    ids.append(session_id)
+                    metadatas.append({
+                        **metadata,
+                        'expires_at': datetime.fromisoformat(metadata['expiration']).timestamp()
+                    })
                 
-                if expiry < now:
-                    expired_ids.append(session_id)
+                if ids:
+                    self.collection.update(ids=ids, metadatas=metadatas)
+                    updated += len(ids)
+                
+                offset += len(page['ids'])
             
-            if expired_ids:
-                self.collection.delete(ids=expired_ids)
+            if updated:
+                print(f"✅ Backfilled expiry keys on {updated} sessions")
+            return updated
+        except Exception as e:
+            print(f"Error backfilling session expiry after {updated} sessions: {e}")
+            return None
+
+
+class MigrationOperations:
+    """Run one-off data migrations once per database"""
+    
+    def __init__(self, chroma_client: ChromaDBClient):
+        self.collection = chroma_client.migrations_collection
+    
+    def is_done(self, name: str) -> bool:
+        """Whether the named migration has completed (one lookup by id)"""
+        return bool(self.collection.get(ids=[name], include=[])['ids'])
+    
+    def run_once(self, name: str, migration: Callable[[], Optional[int]]) -> Optional[int]:
+        """
+        Run a migration unless a marker says it already completed
+        
+        The marker is stored only when the migration returns a result (not
+        None), so a run that fails is retried on the next start. Workers that
+        start together may both run it; the migrations are idempotent.
+        
+        Args:
+            name: Marker id for the migration
+            migration: Callable returning a row count, or None on failure
             
-            return len(expired_ids)
+        Returns:
+            The migration's result, or None if it was skipped or failed
+        """
+        try:
+            if self.is_done(name):
+                return None
+            result = migration()
+            if result is not None:
+                self.collection.upsert(
+                    ids=[name],
+                    documents=[name],
+                    metadatas=[{'name': name, 'completed_at': datetime.now().isoformat(), 'rows': result}]
+                )
+            return result
         except Exception as e:
-            print(f"Error cleaning up sessions: {e}")
-            return 0
+            print(f"Error running migration {name}: {e}")
+            return None
 
 
 class ChatLogOperations:
@@ -401,29 +1240,68 @@ class ChatLogOperations:
     def __init__(self, chroma_client: ChromaDBClient):
         self.collection = chroma_client.chat_logs_collection
     
-    def create_chat_log(self, user_id: str, message: str, result: Dict, status: str = 'success'):
-        """Create a chat log entry"""
-        log_id = str(uuid.uuid4())
-        timestamp = datetime.now()
+    @staticmethod
+    def build_chat_log(user_id: str, message: str, result: Dict, status: str = 'success') -> Dict:
+        """
+        Build a chat log entry (plain JSON values, stamped now)
+        
+        Args:
+            user_id: User email
+            message: The user's chat message
+            result: Agent result dict
+            status: 'success' or an error status
         
-        log_doc = {
+        Returns:
+            Entry dict with its ChromaDB id under '_id'
+        """
+        return {
+            '_id': str(uuid.uuid4()),
             'user_id': user_id,
-            'timestamp': timestamp.isoformat(),
+            'timestamp': datetime.now().isoformat(),
             'status': status,
             'message': message,
-            'agent_response': result.get('agent_response', ''),
-            'foods': json.dumps(result.get('foods', [])),
-            'total_nutrition': json.dumps(result.get('total_nutrition', {})),
-            'recommendations': json.dumps(result.get('recommendations', [])),
-            'intent': result.get('intent', ''),
-            'needs_clarification': str(result.get('needs_clarification', False))
+            'agent_response': result.get('agent_response') or '',
+            'foods': result.get('foods', []),
+            'total_nutrition': result.get('total_nutrition', {}),
+            'recommendations': result.get('recommendations', []),
+            'intent': result.get('intent') or '',
+            'needs_clarification': result.get('needs_clarification', False)
         }
+    
+    def add_chat_logs(self, entries: List[Dict]) -> bool:
+        """
+        Store chat log entries with one bulk add
         
+        Args:
+            entries: Entries from build_chat_log
+        
+        Returns:
+            True if stored
+        """
+        if not entries:
+            return True
         try:
             self.collection.add(
-                ids=[log_id],
-                documents=[f"{user_id}: {message}"],
-                metadatas=[log_doc]
+                ids=[entry['_id'] for entry in entries],
+                documents=[f"{entry['user_id']}: {entry['message']}" for entry in entries],
+                metadatas=[{
+                    'user_id': entry['user_id'],
+                    'timestamp': entry['timestamp'],
+                    'status': entry['status'],
+                    'message': entry['message'],
+                    'agent_response': entry['agent_response'],
+                    'foods': json.dumps(entry['foods']),
+                    'total_nutrition': json.dumps(entry['total_nutrition']),
+                    'recommendations': json.dumps(entry['recommendations']),
+                    'intent': entry['intent'],
+                    'needs_clarification': str(entry['needs_clarification'])
+                } for entry in entries]
             )
+            return True
         except Exception as e:
-            print(f"Error creating chat log: {e}")
+            print(f"Error creating chat logs: {e}")
+            return False
+    
+    def create_chat_log(self, user_id: str, message: str, result: Dict, status: str = 'success'):
+        """Create a chat log entry"""
+        self.add_chat_logs([self.build_chat_log(user_id, message, result, status)])
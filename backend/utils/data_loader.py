@@ -5,7 +5,13 @@ Loads and parses JSON configuration files
 
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Mapping
+
+# JSON sources of the food database (later files override earlier ones) and the compiled table
+FOOD_DATABASE_SOURCES = ('food_database.json', 'food_database_extended.json')
+FOOD_TABLE_FILE = 'food_database.bin'
+
+_food_database = None
 
 def load_json(file_path: str) -> Dict[str, Any]:
     """Load JSON file and return parsed data"""
@@ -32,9 +38,51 @@ def get_config_path(filename: str) -> str:
     return os.path.join(backend_dir, 'config', filename)
 
 # Load all data files
-def load_food_database() -> Dict[str, Any]:
-    """Load complete food database"""
-    return load_json(get_data_path('food_database.json'))
+def load_food_database(reload: bool = False) -> Mapping[str, Dict[str, Any]]:
+    """
+    Load complete food database
+
+    Uses the memory-mapped table in data/food_database.bin, compiling it first
+    if it is missing or older than the JSON sources. The table is opened once
+    per process and shared by every caller. Falls back to the merged JSON if
+    the table cannot be built or opened (e.g. read-only data directory).
+
+    Args:
+        reload: Check the sources again and open a fresh table. The previous
+                table stays valid for anyone still holding it.
+    """
+    global _food_database
+    if _food_database is not None and not reload:
+        return _food_database
+
+    sources = [get_data_path(name) for name in FOOD_DATABASE_SOURCES]
+    sources = [path for path in sources if os.path.exists(path)]
+    table_path = get_data_path(FOOD_TABLE_FILE)
+
+    try:
+        from utils.food_table import FoodTable, compile_food_table
+
+        newest_source = max((os.path.getmtime(path) for path in sources), default=0)
+        if sources and (not os.path.exists(table_path) or os.path.getmtime(table_path) < newest_source):
+            count = compile_food_table(sources, table_path)
+            print(f"✅ Compiled food table with {count} foods")
+        try:
+            _food_database = FoodTable(table_path)
+        except ValueError:
+            if not sources:
+                raise
+            # Written in an older table format: compile it again
+            count = compile_food_table(sources, table_path)
+            print(f"✅ Recompiled food table with {count} foods")
+            _food_database = FoodTable(table_path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Food table unavailable ({e}), loading JSON food database")
+        foods = {}
+        for path in sources:
+            foods.update(load_json(path))
+        _food_database = foods
+
+    return _food_database
 
 def load_user_prompts() -> Dict[str, str]:
     """Load user-friendly prompts"""
@@ -0,0 +1,205 @@
+"""
+Food Catalog
+One shared, read-only food catalogue per process: the food table plus every
+index derived from it, swapped as a whole on reload.
+"""
+
+import threading
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from utils.food_matcher import FoodNameMatcher
+from utils.fuzzy_index import FuzzyFoodIndex
+
+
+class FoodCatalog:
+    """
+    Immutable snapshot of the food database and its lookup indexes
+
+    Built once and shared: parsers and agents read from the same instance, so
+    a reload (a new FoodCatalog) never leaves indexes and data out of step.
+    """
+
+    def __init__(self, foods: Mapping[str, Dict], version: int = 0):
+        """
+        Args:
+            foods: Food name -> nutrition dict (a FoodTable in production)
+            version: Increases by one on every registry reload
+        """
+        self.foods = foods
+        self.version = version
+        self.names = tuple(foods.keys())
+
+        # Token and phrase indexes used by FoodParser.fuzzy_match_food
+        self.food_order: Dict[str, int] = {}
+        self.word_counts: Dict[str, int] = {}
+        token_index = defaultdict(list)
+        self.phrase_index: Dict[str, str] = {}
+        self.max_phrase_words = 1
+        for position, food_name in enumerate(self.names):
+            words = food_name.split()
+            self.food_order[food_name] = position
+            self.word_counts[food_name] = len(set(words))
+            for word in set(words):
+                token_index[word].append(food_name)
+            if words:
+                self.phrase_index.setdefault(' '.join(words), food_name)
+                self.max_phrase_words = max(self.max_phrase_words, len(words))
+        self.token_index: Dict[str, List[str]] = dict(token_index)
+
+        # In-text detection and typo-tolerant lookup
+        self.name_matcher = FoodNameMatcher(self.names)
+        self.fuzzy_index = FuzzyFoodIndex(self.names)
+
+        # Category code per food, aligned with self.names
+        if hasattr(foods, 'category_codes'):
+            self.category_names = foods.category_names
+            self.category_codes = foods.category_codes
+        else:
+            self.category_names = sorted({food.get('category', 'mixed') for food in foods.values()})
+            codes = {name: code for code, name in enumerate(self.category_names)}
+            self.category_codes = np.array(
+                [codes[foods[name].get('category', 'mixed')] for name in self.names], dtype=np.uint8
+            )
+            self.category_codes.setflags(write=False)
+
+    @property
+    def current(self) -> 'FoodCatalog':
+        """A snapshot is its own current version (same interface as CatalogRegistry)"""
+        return self
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class CatalogRegistry:
+    """
+    Holds the process-wide FoodCatalog and swaps it atomically on reload
+
+    A reload builds the complete new catalogue first and then replaces the
+    reference in one assignment. Readers holding the old catalogue finish on
+    it undisturbed, and readers arriving later see only the new one.
+    """
+
+    def __init__(self, loader: Optional[Callable[..., Mapping[str, Dict]]] = None):
+        """
+        Args:
+            loader: Returns the food mapping; called with reload=True on reload
+                    (defaults to data_loader.load_food_database)
+        """
+        if loader is None:
+            from utils.data_loader import load_food_database
+            loader = load_food_database
+        self._loader = loader
+        self._catalog: Optional[FoodCatalog] = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[FoodCatalog], None]] = []
+
+    @staticmethod
+    def _read_only(foods: Mapping[str, Dict]) -> Mapping[str, Dict]:
+        return MappingProxyType(foods) if isinstance(foods, dict) else foods
+
+    @property
+    def current(self) -> FoodCatalog:
+        """The catalogue in use (loaded on first access)"""
+        catalog = self._catalog
+        if catalog is None:
+            with self._lock:
+                if self._catalog is None:
+                    self._catalog = FoodCatalog(self._read_only(self._loader()))
+                catalog = self._catalog
+        return catalog
+
+    def reload(self, foods: Optional[Mapping[str, Dict]] = None) -> FoodCatalog:
+        """
+        Build a new catalogue and swap it in
+
+        Args:
+            foods: Food mapping to use instead of calling the loader
+
+        Returns:
+            The new catalogue
+        """
+        with self._lock:
+            if foods is None:
+                foods = self._loader(reload=True)
+            version = self._catalog.version + 1 if self._catalog else 0
+            catalog = FoodCatalog(self._read_only(foods), version)
+            self._catalog = catalog
+            listeners = list(self._listeners)
+
+        print(f"✅ Food catalog v{catalog.version} loaded with {len(catalog)} foods")
+        for listener in listeners:
+            try:
+                listener(catalog)
+            except Exception as e:
+                print(f"⚠️ Catalog reload listener failed: {e}")
+        return catalog
+
+    def subscribe(self, listener: Callable[[FoodCatalog], None]):
+        """Call listener(new_catalog) after every reload (for state outside the catalogue)"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+
+_registry: Optional[CatalogRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_catalog_registry() -> CatalogRegistry:
+    """Get the process-wide catalogue registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = CatalogRegistry()
+    return _registry
+
+
+def get_food_catalog() -> FoodCatalog:
+    """Get the catalogue currently in use"""
+    return get_catalog_registry().current
+
+
+def reload_food_catalog() -> FoodCatalog:
+    """Hot reload: recompile the food table if the JSON changed and swap in a new catalogue"""
+    return get_catalog_registry().reload()
+
+
+def reload_on_signal(signum: Optional[int] = None) -> bool:
+    """
+    Reload the catalogue whenever the process receives signum (SIGHUP by default)
+
+    `kill -HUP <pid>` then picks up edited food JSON without a restart. The
+    reload runs on a background thread, so the handler returns immediately.
+
+    Returns:
+        True if the handler was installed; False where the signal does not
+        exist (Windows) or when called outside the main thread
+    """
+    import signal
+
+    if signum is None:
+        signum = getattr(signal, 'SIGHUP', None)
+        if signum is None:
+            return False
+
+    def reload_in_background():
+        try:
+            reload_food_catalog()
+        except Exception as e:
+            print(f"⚠️ Food catalog reload failed: {e}")
+
+    def handle(received, frame):
+        threading.Thread(target=reload_in_background, name='food-catalog-reload', daemon=True).start()
+
+    try:
+        signal.signal(signum, handle)
+    except ValueError:
+        # Handlers can only be installed from the main thread
+        return False
+    return True
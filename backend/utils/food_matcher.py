@@ -0,0 +1,131 @@
+"""
+Food Name Matcher
+Aho-Corasick automaton that finds every known food name in a message in one pass
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple
+
+
+class FoodMatch(NamedTuple):
+    """A food name found in text; start/end index into the lowercased text"""
+    name: str
+    start: int
+    end: int
+
+
+class FoodNameMatcher:
+    """Multi-pattern matcher over food names (cost per message is independent of database size)"""
+
+    def __init__(self, food_names: Iterable[str]):
+        """
+        Build the automaton
+
+        Args:
+            food_names: Food names to detect (dict keys work too)
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[str]] = [[]]
+        self.size = 0
+
+        for name in food_names:
+            self._add_pattern(name.lower())
+
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str):
+        """Insert a pattern into the trie"""
+        if not pattern:
+            return
+
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+
+        if pattern not in self._outputs[node]:
+            self._outputs[node].append(pattern)
+            self.size += 1
+
+    def _build_failure_links(self):
+        """Breadth-first pass computing failure links and merged outputs"""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+
+                # Longer patterns first so each node lists its outputs longest-first
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def find_all(self, text: str) -> List[FoodMatch]:
+        """
+        Find every occurrence of every food name, including overlapping ones
+
+        A match must start at a word boundary, so 'rice' is not found inside
+        'price', while 'banana' is still found inside 'bananas'.
+
+        Args:
+            text: Message to scan
+
+        Returns:
+            Matches ordered by end position
+        """
+        text = text.lower()
+        matches = []
+        node = 0
+
+        for index, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            for name in self._outputs[node]:
+                start = index + 1 - len(name)
+                if start == 0 or not text[start - 1].isalnum():
+                    matches.append(FoodMatch(name, start, index + 1))
+
+        return matches
+
+    def find_longest(self, text: str) -> List[FoodMatch]:
+        """
+        Find non-overlapping food names, preferring the longest match
+
+        'chicken breast' wins over 'chicken' when both are present at the
+        same place in the text.
+
+        Args:
+            text: Message to scan
+
+        Returns:
+            Matches ordered by start position
+        """
+        candidates = sorted(self.find_all(text), key=lambda m: (m.start, -(m.end - m.start)))
+
+        selected = []
+        covered_until = 0
+        for match in candidates:
+            if match.start < covered_until:
+                continue
+            selected.append(match)
+            covered_until = match.end
+
+        return selected
+
+    def find_names(self, text: str) -> List[str]:
+        """Distinct food names from find_longest, in order of first appearance"""
+        return list(dict.fromkeys(match.name for match in self.find_longest(text)))
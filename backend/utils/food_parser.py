@@ -4,12 +4,24 @@ Handles natural language, asks clarifying questions, and uses AI for unknown foo
 """
 
 import re
+from collections import defaultdict
 from typing import Dict, List, Tuple, Any, Optional
 
+from utils.food_catalog import FoodCatalog
+
 class FoodParser:
-    def __init__(self, food_database: Dict, portion_patterns: Dict, portion_sizes: Dict, 
+    def __init__(self, food_database, portion_patterns: Dict, portion_sizes: Dict, 
                  nutrition_cache=None, gemini_lookup=None):
-        self.food_database = food_database
+        """
+        Args:
+            food_database: Food mapping, a FoodCatalog, or a CatalogRegistry to follow its reloads
+            portion_patterns: Regexes per portion unit
+            portion_sizes: Multiplier per size word
+            nutrition_cache: Optional NutritionCache for non-static foods
+            gemini_lookup: Optional GeminiNutritionLookup for unknown foods
+        """
+        # Anything with .current: a fixed catalogue, or the registry whose catalogue can be swapped
+        self._catalog_source = food_database if hasattr(food_database, 'current') else FoodCatalog(food_database)
         self.portion_patterns = portion_patterns
         self.portion_sizes = portion_sizes
         self.nutrition_cache = nutrition_cache
@@ -30,6 +42,47 @@ class FoodParser:
             'fish': ['salmon', 'tuna', 'cod', 'tilapia']
         }
     
+    @property
+    def catalog(self) -> FoodCatalog:
+        """Catalogue in use; read it once per operation so data and indexes match"""
+        return self._catalog_source.current
+    
+    @property
+    def food_database(self):
+        return self.catalog.foods
+    
+    @food_database.setter
+    def food_database(self, food_database):
+        self._catalog_source = FoodCatalog(food_database)
+    
+    def build_name_index(self):
+        """Rebuild the token and phrase indexes over food names (call again if food_database changes)"""
+        self._catalog_source = FoodCatalog(self.food_database)
+    
+    @property
+    def name_matcher(self):
+        """Shared automaton for in-text food detection (also used by the chat agent)"""
+        return self.catalog.name_matcher
+    
+    @property
+    def fuzzy_index(self):
+        """Typo-tolerant lookup used in place of difflib.get_close_matches"""
+        return self.catalog.fuzzy_index
+    
+    @property
+    def _token_index(self):
+        return self.catalog.token_index
+    
+    @staticmethod
+    def _word_variants(word: str) -> List[str]:
+        """Return a word plus its singular forms ('bananas' -> 'banana', 'peaches' -> 'peach')"""
+        variants = [word]
+        if len(word) > 3 and word.endswith('s'):
+            variants.append(word[:-1])
+            if word.endswith('es'):
+                variants.append(word[:-2])
+        return variants
+    
     def normalize_text(self, text: str) -> str:
         """Normalize text by removing filler words and applying synonyms"""
         text = text.lower().strip()
@@ -117,98 +170,164 @@ class FoodParser:
         
         return portion, portion_text or "1 serving"
     
-    def fuzzy_match_food(self, text: str) -> List[str]:
+    def fuzzy_match_food(self, text: str, catalog: Optional[FoodCatalog] = None) -> List[str]:
         """Find foods using fuzzy matching - handles variations and word order"""
         text_normalized = self.normalize_text(text)
         text_words = set(text_normalized.split())
         
-        matched_foods = []
+        matched_foods = set()
+        catalog = catalog or self.catalog
         
-        for food_name in self.food_database.keys():
-            food_words = set(food_name.split())
-            
-            # Direct substring match
-            if food_name in text.lower():
-                matched_foods.append(food_name)
-                continue
-            
-            # Word overlap match (at least 50% of food name words present)
-            if food_words and len(food_words & text_words) >= len(food_words) * 0.5:
-                matched_foods.append(food_name)
+        # Phrase match: every word n-gram of the message against the phrase table
+        tokens = re.findall(r'\w+', text.lower())
+        for start in range(len(tokens)):
+            max_size = min(catalog.max_phrase_words, len(tokens) - start)
+            for size in range(1, max_size + 1):
+                head = tokens[start:start + size - 1]
+                for last_word in self._word_variants(tokens[start + size - 1]):
+                    food_name = catalog.phrase_index.get(' '.join(head + [last_word]))
+                    if food_name:
+                        matched_foods.add(food_name)
         
-        return matched_foods
+        # Word overlap match (at least 50% of food name words present)
+        overlap = defaultdict(int)
+        for word in text_words:
+            for food_name in catalog.token_index.get(word, ()):
+                overlap[food_name] += 1
+        for food_name, shared_words in overlap.items():
+            if shared_words >= catalog.word_counts[food_name] * 0.5:
+                matched_foods.add(food_name)
+        
+        # Keep database order so results are stable across calls
+        return sorted(matched_foods, key=catalog.food_order.__getitem__)
+    
+    def split_food_names(self, text: str) -> List[str]:
+        """Split a meal description into food names with portion words removed"""
+        food_names = []
+        for fragment in re.split(r'[,;]|\band\b|\bwith\b', text.lower()):
+            food_name = re.sub(r'\d+\.?\d*\s*(oz|ounce|cup|g|gram|serving|piece|slice)?s?', '', fragment).strip()
+            if food_name and food_name not in food_names:
+                food_names.append(food_name)
+        return food_names
     
     def parse_food_text(self, text: str) -> List[Dict[str, Any]]:
         """Parse food text and return list of recognized foods"""
-        text = text.lower().strip()
-        
-        # First check for generic terms that need clarification
-        clarification_check = self.check_for_generic_terms(text)
-        if clarification_check:
-            return [{
-                'needs_clarification': True,
-                'question': clarification_check['question']
-            }]
+        return self.parse_food_texts([text])[0]
+    
+    def parse_food_texts(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Parse several food texts in one pass
         
-        foods_found = []
+        Every text is matched against the same catalogue snapshot, and foods
+        that need Gemini are looked up together: one batch request per distinct
+        portion size instead of one per text.
         
-        # Try fuzzy matching in static database first
-        matched_food_names = self.fuzzy_match_food(text)
+        Args:
+            texts: Meal descriptions
+            
+        Returns:
+            One list of recognized foods per text, as parse_food_text returns
+        """
+        catalog = self.catalog
+        results = []
+        # (foods list to extend, portion, portion_text, names for Gemini)
+        pending_gemini = []
         
-        for food_name in matched_food_names:
-            nutrition = self.food_database[food_name]
-            portion, portion_text = self.parse_portion(text)
+        for text in texts:
+            text = text.lower().strip()
             
-            portioned_nutrition = {
-                k: round(v * portion, 1) 
-                for k, v in nutrition.items() 
-                if k != 'category'
-            }
+            # First check for generic terms that need clarification
+            clarification_check = self.check_for_generic_terms(text)
+            if clarification_check:
+                results.append([{
+                    'needs_clarification': True,
+                    'question': clarification_check['question']
+                }])
+                continue
             
-            foods_found.append({
-                'name': food_name.title(),
-                'portion': portion,
-                'portion_text': portion_text,
-                'nutrition': portioned_nutrition,
-                'category': nutrition['category'],
-                'source': 'static'
-            })
-        
-        # If no matches in static DB, try cache
-        if not foods_found and self.nutrition_cache:
-            cached_nutrition = self.nutrition_cache.get(text)
-            if cached_nutrition:
+            foods_found = []
+            results.append(foods_found)
+            
+            # Try fuzzy matching in static database first
+            matched_food_names = self.fuzzy_match_food(text, catalog)
+            
+            for food_name in matched_food_names:
+                nutrition = catalog.foods[food_name]
                 portion, portion_text = self.parse_portion(text)
                 
                 portioned_nutrition = {
                     k: round(v * portion, 1) 
-                    for k, v in cached_nutrition.items() 
-                    if k not in ['category', 'source', 'cached_at', 'name']
+                    for k, v in nutrition.items() 
+                    if k != 'category'
                 }
                 
                 foods_found.append({
-                    'name': cached_nutrition['name'],
+                    'name': food_name.title(),
                     'portion': portion,
                     'portion_text': portion_text,
                     'nutrition': portioned_nutrition,
-                    'category': cached_nutrition['category'],
-                    'source': 'cache'
+                    'category': nutrition['category'],
+                    'source': 'static'
                 })
-        
-        # If still no matches, try Gemini AI
-        if not foods_found and self.gemini_lookup:
-            print(f"🤖 Using Gemini AI to lookup: {text}")
-            portion, portion_text = self.parse_portion(text)
-            
-            # Extract just the food name (remove portion words)
-            food_name = re.sub(r'\d+\.?\d*\s*(oz|ounce|cup|g|gram|serving|piece|slice)?s?', '', text).strip()
             
-            gemini_nutrition = self.gemini_lookup.get_nutrition_data(food_name, portion_text)
+            # If no matches in static DB, try cache, then Gemini AI for what is left
+            if not foods_found and (self.nutrition_cache or self.gemini_lookup):
+                portion, portion_text = self.parse_portion(text)
+                unknown_names = []
+                
+                for food_name in self.split_food_names(text):
+                    cached_nutrition = self.nutrition_cache.get(food_name) if self.nutrition_cache else None
+                    if not cached_nutrition:
+                        unknown_names.append(food_name)
+                        continue
+                    
+                    portioned_nutrition = {
+                        k: round(v * portion, 1) 
+                        for k, v in cached_nutrition.items() 
+                        if k not in ['category', 'source', 'cached_at', 'name']
+                    }
+                    
+                    foods_found.append({
+                        'name': cached_nutrition['name'],
+                        'portion': portion,
+                        'portion_text': portion_text,
+                        'nutrition': portioned_nutrition,
+                        'category': cached_nutrition['category'],
+                        'source': 'cache'
+                    })
+                
+                if unknown_names and self.gemini_lookup:
+                    pending_gemini.append((foods_found, portion, portion_text, unknown_names))
+        
+        if pending_gemini:
+            self._add_gemini_foods(pending_gemini)
+        
+        return results
+    
+    def _add_gemini_foods(self, pending_gemini: List[Tuple[List[Dict[str, Any]], float, str, List[str]]]):
+        """Look up unknown foods with one Gemini batch per portion size and add them to their texts"""
+        names_by_portion: Dict[str, List[str]] = {}
+        for _, _, portion_text, unknown_names in pending_gemini:
+            names_by_portion.setdefault(portion_text, []).extend(unknown_names)
+        
+        found_by_portion = {}
+        for portion_text, unknown_names in names_by_portion.items():
+            unknown_names = list(dict.fromkeys(unknown_names))
+            print(f"🤖 Using Gemini AI to lookup: {', '.join(unknown_names)}")
+            gemini_results = self.gemini_lookup.get_nutrition_batch(unknown_names, portion_text)
             
-            if gemini_nutrition:
-                # Cache the result for future use
-                if self.nutrition_cache:
-                    self.nutrition_cache.set(food_name, gemini_nutrition)
+            # Cache the results for future use
+            found = {name: data for name, data in gemini_results.items() if data}
+            if found and self.nutrition_cache:
+                self.nutrition_cache.set_many(found)
+            found_by_portion[portion_text] = found
+        
+        for foods_found, portion, portion_text, unknown_names in pending_gemini:
+            found = found_by_portion[portion_text]
+            for food_name in unknown_names:
+                gemini_nutrition = found.get(food_name)
+                if not gemini_nutrition:
+                    continue
                 
                 # Apply portion
                 portioned_nutrition = {
@@ -226,24 +345,21 @@ class FoodParser:
                     'source': 'gemini',
                     'confidence': gemini_nutrition.get('confidence', 0.85)
                 })
-        
-        return foods_found
     
     def estimate_from_ingredients(self, ingredients_text: str) -> Dict[str, Any]:
         """Estimate nutrition when exact food not found"""
         estimated = {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0, 'fiber': 0}
         ingredients_found = []
         
-        text = ingredients_text.lower()
-        
-        for food_name, nutrition in self.food_database.items():
-            if food_name in text:
-                # Use smaller portions for ingredients (0.5 serving default)
-                portion = 0.5
-                for key in estimated:
-                    if key in nutrition:
-                        estimated[key] += nutrition[key] * portion
-                ingredients_found.append(food_name.title())
+        catalog = self.catalog
+        for food_name in catalog.name_matcher.find_names(ingredients_text):
+            nutrition = catalog.foods[food_name]
+            # Use smaller portions for ingredients (0.5 serving default)
+            portion = 0.5
+            for key in estimated:
+                if key in nutrition:
+                    estimated[key] += nutrition[key] * portion
+            ingredients_found.append(food_name.title())
         
         if ingredients_found:
             return {
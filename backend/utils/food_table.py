@@ -0,0 +1,228 @@
+"""
+Food Table
+Compiled, memory-mapped food database: a name table with a sorted lookup
+index plus contiguous float32 nutrient columns and a category code column.
+
+Rows keep the order of the JSON sources, so iterating the table matches
+iterating the merged JSON dicts.
+
+Layout (little-endian):
+    header      magic, version, food count, category count, section offsets
+    categories  uint32 offsets (count + 1) + UTF-8 names
+    names       uint32 offsets (count + 1) + UTF-8 names, in source order
+    index       uint32 [count], row numbers sorted by name bytes
+    nutrients   float32 [len(NUTRIENTS)][count], one column after another
+    category    uint8 [count], index into the category names
+
+The file is opened read-only with mmap, so every worker process shares one
+copy through the page cache and opening it does not depend on its size.
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+
+MAGIC = b'MEFT'
+VERSION = 2
+NUTRIENTS = ('calories', 'protein', 'carbs', 'fat', 'fiber')
+# Category codes are stored as uint8
+MAX_CATEGORIES = 255
+
+# magic, version, foods, categories, then offsets of the six sections
+_HEADER = struct.Struct('<4sHxxII6Q')
+
+
+def _align(offset: int, size: int = 8) -> int:
+    return (offset + size - 1) // size * size
+
+
+def _string_table(strings: List[str]) -> bytes:
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return offsets.tobytes() + b''.join(encoded)
+
+
+def _from_float32(value: float):
+    """Undo float32 noise (3.6 -> 3.5999999) and keep whole numbers as ints like the JSON"""
+    value = round(float(value), 4)
+    return int(value) if value.is_integer() else value
+
+
+def compile_food_table(sources: List[str], output_path: str) -> int:
+    """
+    Compile JSON food databases into the binary table
+
+    Later sources override earlier ones for the same food name. The file is
+    written next to output_path and renamed into place, so readers never
+    see a partial table.
+
+    Args:
+        sources: JSON files mapping food name -> nutrients + category
+        output_path: Where to write the table
+
+    Returns:
+        Number of foods written
+        
+    Raises:
+        ValueError: More than MAX_CATEGORIES categories
+    """
+    foods: Dict[str, Dict] = {}
+    for path in sources:
+        with open(path, 'r', encoding='utf-8') as f:
+            foods.update(json.load(f))
+
+    names = list(foods)
+    categories = sorted({foods[name].get('category', 'mixed') for name in names})
+    if len(categories) > MAX_CATEGORIES:
+        raise ValueError(f"{len(categories)} food categories, the table holds at most {MAX_CATEGORIES}")
+    category_codes = {name: code for code, name in enumerate(categories)}
+
+    # Row numbers sorted by encoded name bytes, so lookups can binary-search the raw names
+    index = np.array(sorted(range(len(names)), key=lambda row: names[row].encode('utf-8')),
+                     dtype='<u4')
+
+    columns = np.array(
+        [[foods[name].get(key, 0) for name in names] for key in NUTRIENTS], dtype='<f4'
+    ).reshape(len(NUTRIENTS), len(names))
+    codes = np.array([category_codes[foods[name].get('category', 'mixed')] for name in names], dtype='u1')
+
+    category_table = _string_table(categories)
+    name_table = _string_table(names)
+
+    categories_at = _HEADER.size
+    names_at = categories_at + len(category_table)
+    index_at = _align(names_at + len(name_table), 4)
+    columns_at = _align(index_at + index.nbytes)
+    codes_at = columns_at + columns.nbytes
+    end = codes_at + codes.nbytes
+
+    header = _HEADER.pack(MAGIC, VERSION, len(names), len(categories),
+                          categories_at, names_at, index_at, columns_at, codes_at, end)
+
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(category_table)
+        f.write(name_table)
+        f.write(b'\0' * (index_at - names_at - len(name_table)))
+        f.write(index.tobytes())
+        f.write(b'\0' * (columns_at - index_at - index.nbytes))
+        f.write(columns.tobytes())
+        f.write(codes.tobytes())
+    os.replace(temp_path, output_path)
+    return len(names)
+
+
+class FoodTable(Mapping):
+    """
+    Read-only mapping of food name -> nutrition dict over a compiled table
+
+    Lookups binary-search the mapped name index; each access builds a small
+    fresh dict, so callers may modify what they get back. The raw columns
+    are available through column() and category_codes for vectorized use.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Compiled table written by compile_food_table
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, count, category_count, categories_at, names_at,
+         index_at, columns_at, codes_at, end) = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or len(self._mmap) != end:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} food table")
+
+        self._count = count
+        self._category_names = self._read_strings(categories_at, category_count)
+        self._name_offsets = np.frombuffer(self._mmap, dtype='<u4', count=count + 1, offset=names_at)
+        self._names_at = names_at + (count + 1) * 4
+        self._index = np.frombuffer(self._mmap, dtype='<u4', count=count, offset=index_at)
+        self._columns = np.frombuffer(self._mmap, dtype='<f4', count=len(NUTRIENTS) * count,
+                                      offset=columns_at).reshape(len(NUTRIENTS), count)
+        self.category_codes = np.frombuffer(self._mmap, dtype='u1', count=count, offset=codes_at)
+
+    def _read_strings(self, at: int, count: int) -> List[str]:
+        offsets = np.frombuffer(self._mmap, dtype='<u4', count=count + 1, offset=at).tolist()
+        base = at + (count + 1) * 4
+        return [self._mmap[base + offsets[i]:base + offsets[i + 1]].decode('utf-8') for i in range(count)]
+
+    def _name_bytes(self, index: int) -> bytes:
+        start = self._names_at + int(self._name_offsets[index])
+        return self._mmap[start:self._names_at + int(self._name_offsets[index + 1])]
+
+    def _find(self, name) -> int:
+        """Row of name in the table, or -1"""
+        if not isinstance(name, str):
+            return -1
+        key = name.encode('utf-8')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_bytes(int(self._index[middle])) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count:
+            row = int(self._index[low])
+            if self._name_bytes(row) == key:
+                return row
+        return -1
+
+    def _row(self, index: int) -> Dict:
+        row = {key: _from_float32(value) for key, value in zip(NUTRIENTS, self._columns[:, index].tolist())}
+        row['category'] = self._category_names[self.category_codes[index]]
+        return row
+
+    def __getitem__(self, name: str) -> Dict:
+        index = self._find(name)
+        if index < 0:
+            raise KeyError(name)
+        return self._row(index)
+
+    def __contains__(self, name) -> bool:
+        return self._find(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._name_bytes(index).decode('utf-8')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def column(self, nutrient: str) -> np.ndarray:
+        """Read-only float32 view of one nutrient for every food, in iteration order"""
+        return self._columns[NUTRIENTS.index(nutrient)]
+
+    @property
+    def category_names(self) -> List[str]:
+        return list(self._category_names)
+
+    def close(self):
+        """Release the mapping (views returned by column() must not be used afterwards)"""
+        self._columns = self.category_codes = self._name_offsets = self._index = None
+        self._mmap.close()
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Usage: python -m utils.food_table [output.bin] [source.json ...]
+    from utils.data_loader import get_data_path, FOOD_DATABASE_SOURCES, FOOD_TABLE_FILE
+
+    output = sys.argv[1] if len(sys.argv) > 1 else get_data_path(FOOD_TABLE_FILE)
+    sources = sys.argv[2:] or [get_data_path(name) for name in FOOD_DATABASE_SOURCES]
+    written = compile_food_table(sources, output)
+    print(f"✅ Compiled {written} foods from {len(sources)} files")
+    print(f"📁 Location: {output}")
@@ -0,0 +1,98 @@
+"""
+Fuzzy Food Index
+Typo-tolerant lookup over food names using a character n-gram index with candidate pruning
+"""
+
+import heapq
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from itertools import chain
+from typing import Dict, Iterable, List, Set
+
+
+class FuzzyFoodIndex:
+    """Drop-in replacement for difflib.get_close_matches over a fixed list of food names"""
+
+    def __init__(self, food_names: Iterable[str], gram_size: int = 2, max_candidates: int = 200):
+        """
+        Build the n-gram index
+
+        Args:
+            food_names: Food names to search (dict keys work too)
+            gram_size: Characters per gram; 2 keeps short misspellings like 'klae' reachable
+            max_candidates: Most candidates scored per lookup after pruning
+        """
+        self.gram_size = gram_size
+        self.max_candidates = max_candidates
+        self._names: List[str] = []
+        self._gram_counts: List[int] = []
+        self._gram_index: Dict[str, List[int]] = defaultdict(list)
+
+        seen: Set[str] = set()
+        for name in food_names:
+            if name in seen:
+                continue
+            seen.add(name)
+            name_id = len(self._names)
+            self._names.append(name)
+            grams = self._grams(name)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._gram_index[gram].append(name_id)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _grams(self, text: str) -> Set[str]:
+        """Distinct character n-grams of a space-padded string"""
+        padded = f" {text} "
+        size = self.gram_size
+        return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+    def _candidates(self, word: str, cutoff: float) -> List[str]:
+        """Names sharing n-grams with word and whose length allows ratio >= cutoff"""
+        # SequenceMatcher.ratio() <= 2*min(a, b)/(a + b), which bounds the usable lengths
+        length = len(word)
+        min_length = length * cutoff / (2 - cutoff)
+        max_length = length * (2 - cutoff) / cutoff if cutoff > 0 else float('inf')
+
+        word_grams = self._grams(word)
+        shared = Counter(chain.from_iterable(self._gram_index.get(gram, ()) for gram in word_grams))
+
+        # Rank by Dice overlap so long names sharing many grams do not crowd out close ones
+        in_range = [
+            (count / (len(word_grams) + self._gram_counts[name_id]), name_id)
+            for name_id, count in shared.items()
+            if min_length <= len(self._names[name_id]) <= max_length
+        ]
+        best = heapq.nlargest(self.max_candidates, in_range)
+        return [self._names[name_id] for _, name_id in best]
+
+    def get_close_matches(self, word: str, n: int = 3, cutoff: float = 0.6) -> List[str]:
+        """
+        Same contract and scoring as difflib.get_close_matches, on pruned candidates only
+
+        Args:
+            word: Text to look up (usually a misspelled food)
+            n: Maximum number of matches to return
+            cutoff: Minimum SequenceMatcher ratio in [0, 1]
+
+        Returns:
+            Best matches, most similar first
+        """
+        if not n > 0:
+            raise ValueError("n must be > 0: %r" % (n,))
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError("cutoff must be in [0.0, 1.0]: %r" % (cutoff,))
+
+        scored = []
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        for name in self._candidates(word, cutoff):
+            matcher.set_seq1(name)
+            if (matcher.real_quick_ratio() >= cutoff and
+                    matcher.quick_ratio() >= cutoff and
+                    matcher.ratio() >= cutoff):
+                scored.append((matcher.ratio(), name))
+
+        return [name for _, name in heapq.nlargest(n, scored)]
@@ -5,9 +5,13 @@ Uses Google Gemini to fetch nutrition data for unknown foods
 
 import os
 import json
+import threading
+import time
 from typing import Dict, Optional, List
 from dotenv import load_dotenv
-import google.generativeai as genai
+
+from utils.lookup_guard import CircuitBreaker, LookupGuard, LookupTimeoutError, LookupUnavailableError
+from utils.single_flight import SingleFlight
 
 # Load environment variables
 load_dotenv()
@@ -15,29 +19,144 @@ load_dotenv()
 class GeminiNutritionLookup:
     """Use Gemini to get nutrition information for foods"""
     
-    def __init__(self):
-        """Initialize Gemini API"""
+    REQUIRED_FIELDS = ['calories', 'protein', 'carbs', 'fat', 'fiber', 'category']
+    
+    def __init__(self, model=None, guard: Optional[LookupGuard] = None):
+        """
+        Initialize Gemini API
+        
+        Args:
+            model: Object with generate_content(prompt) -> response.text; when given,
+                   no API key is needed (used for tests and local fakes)
+            guard: Deadline/concurrency/circuit-breaker wrapper for model calls;
+                   configured from GEMINI_* environment variables if omitted
+        """
         self.api_key = os.getenv('GEMINI_API_KEY')
+        self.guard = guard or LookupGuard(
+            timeout=float(os.getenv('GEMINI_TIMEOUT_SECONDS', '8')),
+            max_concurrency=int(os.getenv('GEMINI_MAX_CONCURRENCY', '4')),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv('GEMINI_BREAKER_THRESHOLD', '5')),
+                reset_timeout=float(os.getenv('GEMINI_BREAKER_RESET_SECONDS', '30'))
+            )
+        )
+        self.batch_timeout = float(os.getenv('GEMINI_BATCH_TIMEOUT_SECONDS', str(self.guard.timeout * 2)))
+        
+        # Identical concurrent lookups share one upstream call, in batches too
+        self._single_flight = SingleFlight()
+        self._stats_lock = threading.Lock()
+        self._batch_stats = {'batch_lookups': 0, 'batch_coalesced': 0}
+        
+        self._model = model
+        self._model_lock = threading.Lock()
+        if model is not None:
+            return
         
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not found in .env file")
         
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        print("✅ Gemini AI configured for nutrition lookup (client loads on first lookup)")
+    
+    @property
+    def model(self):
+        """The Gemini model, created on first use (importing the SDK takes about a second)"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel('gemini-pro')
+                    print("✅ Gemini AI initialized for nutrition lookup")
+        return self._model
+    
+    def _generate(self, prompt: str, timeout: Optional[float] = None):
+        """Call the model through the guard (raises LookupTimeoutError/LookupUnavailableError)"""
+        return self.guard.call(self.model.generate_content, prompt, timeout=timeout)
+    
+    @property
+    def available(self) -> bool:
+        """False while the circuit breaker is open and calls are being short-circuited"""
+        return self.guard.breaker.state != CircuitBreaker.OPEN
+    
+    @staticmethod
+    def _strip_markdown(response_text: str) -> str:
+        """Remove a ```json fence around a model response"""
+        response_text = response_text.strip()
+        if response_text.startswith('```'):
+            response_text = response_text.split('```')[1]
+            if response_text.startswith('json'):
+                response_text = response_text[4:]
+            response_text = response_text.strip()
+        return response_text
+    
+    def _validate_nutrition(self, nutrition_data, food_name: str) -> Optional[Dict]:
+        """Check required fields and fill in name/source/confidence; None if invalid"""
+        if not isinstance(nutrition_data, dict):
+            return None
+        
+        if not all(field in nutrition_data for field in self.REQUIRED_FIELDS):
+            return None
+        
+        # Ensure name is set
+        if 'name' not in nutrition_data:
+            nutrition_data['name'] = food_name.title()
+        
+        # Add metadata
+        nutrition_data['source'] = 'gemini'
+        nutrition_data['confidence'] = nutrition_data.get('confidence', 0.85)
         
-        print("✅ Gemini AI initialized for nutrition lookup")
+        return nutrition_data
     
-    def get_nutrition_data(self, food_name: str, portion_text: str = "1 serving") -> Optional[Dict]:
+    def get_nutrition_data(self, food_name: str, portion_text: str = "1 serving",
+                           timeout: Optional[float] = None) -> Optional[Dict]:
         """
         Get nutrition data for a food item using Gemini
         
+        Concurrent calls for the same normalized name and portion wait on a
+        single upstream request and share its result.
+        
         Args:
             food_name: Name of the food
             portion_text: Portion size description
+            timeout: Deadline in seconds (defaults to the guard's timeout)
             
         Returns:
             Dict with nutrition data or None if failed
         """
+        key = self._lookup_key(food_name, portion_text)
+        nutrition_data, shared = self._single_flight.do(
+            key, lambda: self._fetch_nutrition_data(food_name, portion_text, timeout)
+        )
+        
+        if shared:
+            print(f"🔗 Shared in-flight Gemini lookup for: {food_name}")
+        
+        # Each caller gets its own copy of a shared result
+        return dict(nutrition_data) if nutrition_data else None
+    
+    @staticmethod
+    def _lookup_key(food_name: str, portion_text: str):
+        """Single-flight key: normalized name and portion"""
+        return (food_name.lower().strip(), portion_text.lower().strip())
+    
+    def get_lookup_stats(self) -> Dict:
+        """
+        Get upstream call metrics
+        
+        Returns:
+            Dict with issued/coalesced lookup counts (single and batch), batch
+            counters (names looked up through batches, and how many of those
+            were served by another in-flight lookup) and guard call counters
+        """
+        stats = self._single_flight.get_stats()
+        with self._stats_lock:
+            stats.update(self._batch_stats)
+        stats['guard'] = self.guard.get_stats()
+        return stats
+    
+    def _fetch_nutrition_data(self, food_name: str, portion_text: str,
+                              timeout: Optional[float]) -> Optional[Dict]:
+        """Ask Gemini for one food (called by get_nutrition_data once per in-flight key)"""
         
         prompt = f"""You are a nutrition expert. Provide accurate nutrition information for the following food.
 
@@ -65,34 +184,19 @@ Rules:
 - Return realistic, accurate values based on USDA standards
 """
         
+        response_text = ''
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
+            response = self._generate(prompt, timeout=timeout)
             
             # Remove markdown code blocks if present
-            if response_text.startswith('```'):
-                response_text = response_text.split('```')[1]
-                if response_text.startswith('json'):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
+            response_text = self._strip_markdown(response.text)
             
-            # Parse JSON
-            nutrition_data = json.loads(response_text)
-            
-            # Validate required fields
-            required_fields = ['calories', 'protein', 'carbs', 'fat', 'fiber', 'category']
-            if not all(field in nutrition_data for field in required_fields):
+            # Parse JSON and validate required fields
+            nutrition_data = self._validate_nutrition(json.loads(response_text), food_name)
+            if nutrition_data is None:
                 print(f"⚠️ Gemini response missing required fields for {food_name}")
                 return None
             
-            # Ensure name is set
-            if 'name' not in nutrition_data:
-                nutrition_data['name'] = food_name.title()
-            
-            # Add metadata
-            nutrition_data['source'] = 'gemini'
-            nutrition_data['confidence'] = nutrition_data.get('confidence', 0.85)
-            
             print(f"✅ Gemini found nutrition for: {food_name}")
             return nutrition_data
             
@@ -100,10 +204,140 @@ Rules:
             print(f"❌ Failed to parse Gemini response for {food_name}: {e}")
             print(f"Response was: {response_text[:200]}")
             return None
+        except (LookupTimeoutError, LookupUnavailableError) as e:
+            print(f"⚠️ Gemini skipped for {food_name}: {e}")
+            return None
         except Exception as e:
             print(f"❌ Gemini API error for {food_name}: {e}")
             return None
     
+    def get_nutrition_batch(self, food_names: List[str], portion_text: str = "1 serving") -> Dict[str, Optional[Dict]]:
+        """
+        Get nutrition data for several foods with a single Gemini request
+        
+        Each name goes through the same single-flight group as
+        get_nutrition_data: names another lookup is already fetching wait for
+        it, and only the rest are sent upstream.
+        
+        Args:
+            food_names: Names of the foods
+            portion_text: Portion size description applied to every food
+            
+        Returns:
+            Dict mapping each requested name to its nutrition data (or None)
+        """
+        names = list(dict.fromkeys(name for name in food_names if name))
+        if not names:
+            return {}
+        if len(names) == 1:
+            return {names[0]: self.get_nutrition_data(names[0], portion_text)}
+        
+        keys = {name: self._lookup_key(name, portion_text) for name in names}
+        # The first spelling of each key is the one sent upstream
+        names_by_key = {}
+        for name, key in keys.items():
+            names_by_key.setdefault(key, name)
+        
+        def fetch(led_keys):
+            fetched = self._fetch_nutrition_batch([names_by_key[key] for key in led_keys], portion_text)
+            return {key: fetched[names_by_key[key]] for key in led_keys}
+        
+        by_key, shared = self._single_flight.do_many(list(names_by_key), fetch)
+        
+        with self._stats_lock:
+            self._batch_stats['batch_lookups'] += len(names_by_key)
+            self._batch_stats['batch_coalesced'] += len(shared)
+        if shared:
+            print(f"🔗 Shared in-flight Gemini lookups for: {', '.join(names_by_key[key] for key in shared)}")
+        
+        # Each caller gets its own copy of a shared result
+        return {name: dict(by_key[keys[name]]) if by_key[keys[name]] else None for name in names}
+    
+    def _fetch_nutrition_batch(self, names: List[str], portion_text: str) -> Dict[str, Optional[Dict]]:
+        """
+        Ask Gemini for several foods in one request (called by get_nutrition_batch
+        with the names not already in flight)
+        
+        Entries that are missing or fail validation are retried one by one,
+        within the same overall batch deadline. If the upstream timed out or
+        the circuit is open, nothing is retried.
+        """
+        if len(names) == 1:
+            return {names[0]: self._fetch_nutrition_data(names[0], portion_text, None)}
+        
+        food_list = "\n".join(f"{i + 1}. {name}" for i, name in enumerate(names))
+        
+        prompt = f"""You are a nutrition expert. Provide accurate nutrition information for each of the following foods.
+
+Foods:
+{food_list}
+Portion (for each food): {portion_text}
+
+Return ONLY a valid JSON array with one object per food, in the same order (no markdown, no explanation):
+[
+    {{
+        "query": "food exactly as listed above",
+        "name": "Food Name",
+        "calories": 0,
+        "protein": 0,
+        "carbs": 0,
+        "fat": 0,
+        "fiber": 0,
+        "category": "protein|carbs|vegetables|fruits|dairy|fast_food|treats|mixed",
+        "confidence": 0.95,
+        "source": "gemini"
+    }}
+]
+
+Rules:
+- All numeric values should be for the specified portion
+- Use standard serving sizes if portion is unclear
+- Category must be one of: protein, carbs, vegetables, fruits, dairy, fast_food, treats, mixed
+- Confidence should be 0.8-1.0 based on how common/well-known the food is
+- Return realistic, accurate values based on USDA standards
+"""
+        
+        results = {name: None for name in names}
+        deadline = time.monotonic() + self.batch_timeout
+        
+        try:
+            response = self._generate(prompt, timeout=self.batch_timeout)
+            items = json.loads(self._strip_markdown(response.text))
+            if not isinstance(items, list):
+                items = []
+        except (LookupTimeoutError, LookupUnavailableError) as e:
+            print(f"⚠️ Gemini batch skipped: {e}")
+            return results
+        except Exception as e:
+            print(f"❌ Gemini batch lookup failed, falling back to single lookups: {e}")
+            items = []
+        
+        # Match by echoed query first, then by position
+        by_query = {
+            str(item.get('query', '')).lower().strip(): item
+            for item in items if isinstance(item, dict)
+        }
+        for i, name in enumerate(names):
+            item = by_query.get(name.lower().strip())
+            if item is None and i < len(items):
+                item = items[i]
+            if isinstance(item, dict):
+                item = {k: v for k, v in item.items() if k != 'query'}
+            results[name] = self._validate_nutrition(item, name)
+        
+        failed = [name for name, data in results.items() if data is None]
+        if failed:
+            print(f"⚠️ Gemini batch incomplete, retrying individually: {', '.join(failed)}")
+        for name in failed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.available:
+                break
+            # This batch holds these names' single-flight keys, so call upstream directly
+            results[name] = self._fetch_nutrition_data(name, portion_text, remaining)
+        
+        print(f"✅ Gemini batch resolved {sum(1 for d in results.values() if d)}/{len(names)} foods")
+        return results
+    
     def get_nutrition_for_recipe(self, recipe_name: str, ingredients: List[str]) -> Optional[Dict]:
         """
         Get nutrition data for a recipe with multiple ingredients
@@ -141,7 +375,7 @@ Consider typical serving sizes and cooking methods. Be realistic and accurate.
 """
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             response_text = response.text.strip()
             
             # Remove markdown code blocks
@@ -193,7 +427,7 @@ Make suggestions practical, delicious, and nutritionally balanced.
 """
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             response_text = response.text.strip()
             
             # Remove markdown
@@ -226,3 +460,10 @@ def get_gemini_nutrition_lookup() -> GeminiNutritionLookup:
         _gemini_instance = GeminiNutritionLookup()
     
     return _gemini_instance
+
+
+def get_gemini_lookup_stats() -> Optional[Dict]:
+    """Lookup metrics of the shared instance, or None if Gemini was never initialized"""
+    if _gemini_instance is None:
+        return None
+    return _gemini_instance.get_lookup_stats()
@@ -0,0 +1,276 @@
+"""
+History Transfer
+Streams users, food logs and chat logs out of ChromaDB as NDJSON or Parquet and back in
+"""
+
+import gzip
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from utils.chromadb_client import FoodLogOperations
+
+# Collections that make up a user's history, in the order they are exported
+KINDS = ('users', 'food_logs', 'chat_logs')
+
+# Metadata key holding the owner's email in each collection
+_OWNER_KEYS = {'users': 'email', 'food_logs': 'user_id', 'chat_logs': 'user_id'}
+
+# Metadata key promoted to the Parquet timestamp column
+_TIME_KEYS = {'users': 'created_at', 'food_logs': 'timestamp', 'chat_logs': 'timestamp'}
+
+
+def file_format(path: str) -> str:
+    """'parquet' for .parquet files, otherwise 'ndjson' (gzip when the name ends in .gz)"""
+    return 'parquet' if path.endswith('.parquet') else 'ndjson'
+
+
+def _pyarrow():
+    """Import pyarrow for the Parquet format (optional dependency)"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet files need pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ('kind', pa.string()),
+        ('id', pa.string()),
+        ('user_id', pa.string()),
+        ('timestamp', pa.string()),
+        ('document', pa.string()),
+        ('metadata', pa.string()),
+    ])
+
+
+def write_records(path: str, pages: Iterable[List[Dict]]) -> int:
+    """
+    Write pages of records to an NDJSON (optionally .gz) or Parquet file
+
+    Pages are written as they arrive (one Parquet row group each), so memory
+    stays at one page however long the history is.
+
+    Args:
+        path: Output file; the format follows the extension
+        pages: Lists of records ({kind, id, document, metadata})
+
+    Returns:
+        Number of records written
+    """
+    written = 0
+    if file_format(path) == 'parquet':
+        pa = _pyarrow()
+        schema = _parquet_schema(pa)
+        with pa.parquet.ParquetWriter(path, schema, compression='zstd') as writer:
+            for page in pages:
+                if not page:
+                    continue
+                writer.write_table(pa.Table.from_pylist([{
+                    'kind': record['kind'],
+                    'id': record['id'],
+                    'user_id': record['metadata'].get(_OWNER_KEYS[record['kind']]),
+                    'timestamp': record['metadata'].get(_TIME_KEYS[record['kind']]),
+                    'document': record['document'],
+                    'metadata': json.dumps(record['metadata'], ensure_ascii=False),
+                } for record in page], schema=schema))
+                written += len(page)
+        return written
+
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        for page in pages:
+            f.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in page)
+            written += len(page)
+    return written
+
+
+def read_records(path: str, batch_size: int = 1000) -> Iterator[Dict]:
+    """
+    Stream records back from a file written by write_records
+
+    Args:
+        path: NDJSON (optionally .gz) or Parquet file
+        batch_size: Parquet rows decoded at a time
+
+    Yields:
+        Records ({kind, id, document, metadata})
+    """
+    if file_format(path) == 'parquet':
+        pa = _pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size,
+                                               columns=['kind', 'id', 'document', 'metadata']):
+            for row in batch.to_pylist():
+                row['metadata'] = json.loads(row['metadata'])
+                yield row
+        return
+
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class HistoryExporter:
+    """
+    Reads a user's (or every user's) history out of ChromaDB page by page
+
+    Records carry the stored id, document and metadata unchanged, so an
+    export imported with HistoryImporter reproduces the same rows.
+    """
+
+    def __init__(self, chroma_client, batch_size: int = 1000):
+        """
+        Args:
+            chroma_client: ChromaDBClient (or anything with <kind>_collection attributes)
+            batch_size: Rows read per round trip
+        """
+        self.chroma_client = chroma_client
+        self.batch_size = batch_size
+
+    def iter_pages(self, user_id: Optional[str] = None,
+                   kinds: Sequence[str] = KINDS) -> Iterator[List[Dict]]:
+        """
+        Yield the history as pages of records
+
+        Args:
+            user_id: Only this user's rows (email); None exports everyone
+            kinds: Collections to read, from KINDS
+
+        Yields:
+            Lists of at most batch_size records
+        """
+        for kind in kinds:
+            collection = getattr(self.chroma_client, f"{kind}_collection")
+            where = {_OWNER_KEYS[kind]: user_id} if user_id else None
+            offset = 0
+            while True:
+                page = collection.get(where=where, include=['documents', 'metadatas'],
+                                      limit=self.batch_size, offset=offset)
+                if not page['ids']:
+                    break
+                yield [
+                    {'kind': kind, 'id': row_id, 'document': document, 'metadata': metadata}
+                    for row_id, document, metadata in zip(page['ids'], page['documents'], page['metadatas'])
+                ]
+                if len(page['ids']) < self.batch_size:
+                    break
+                offset += len(page['ids'])
+
+    def export(self, path: str, user_id: Optional[str] = None,
+               kinds: Sequence[str] = KINDS) -> int:
+        """
+        Export the history to a file
+
+        Args:
+            path: Output file (.ndjson, .ndjson.gz or .parquet)
+            user_id: Only this user's rows (email); None exports everyone
+            kinds: Collections to export, from KINDS
+
+        Returns:
+            Number of records written
+        """
+        written = write_records(path, self.iter_pages(user_id, kinds))
+        print(f"✅ Exported {written} records to {path}")
+        return written
+
+
+class HistoryImporter:
+    """
+    Writes records into ChromaDB in batches of one upsert per collection
+
+    Upserts keep the stored ids, so importing the same file twice leaves one
+    copy. Daily rollups of the days that received food logs are dropped and
+    rebuilt from the logs on their next read.
+    """
+
+    def __init__(self, chroma_client, batch_size: int = 1000):
+        """
+        Args:
+            chroma_client: ChromaDBClient (or anything with <kind>_collection attributes)
+            batch_size: Rows written per round trip
+        """
+        self.chroma_client = chroma_client
+        self.batch_size = batch_size
+        self.food_log_ops = FoodLogOperations(chroma_client)
+
+    def import_file(self, path: str) -> Dict[str, int]:
+        """
+        Import a file written by HistoryExporter
+
+        Returns:
+            Counts per kind plus 'skipped' and 'failed'
+        """
+        counts = self.import_records(read_records(path, self.batch_size))
+        print(f"✅ Imported {sum(counts[kind] for kind in KINDS)} records from {path}")
+        return counts
+
+    def import_records(self, records: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Import records ({kind, id, document, metadata}) from any iterable
+
+        Only one batch per kind is held in memory at a time.
+
+        Returns:
+            Counts per kind plus 'skipped' (unknown kind) and 'failed' (rows in failed batches)
+        """
+        counts = {kind: 0 for kind in KINDS}
+        counts.update(skipped=0, failed=0)
+        pending: Dict[str, List[Dict]] = {kind: [] for kind in KINDS}
+
+        for record in records:
+            batch = pending.get(record.get('kind'))
+            if batch is None:
+                counts['skipped'] += 1
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                self._write_batch(record['kind'], batch, counts)
+                batch.clear()
+
+        for kind, batch in pending.items():
+            if batch:
+                self._write_batch(kind, batch, counts)
+        return counts
+
+    def _write_batch(self, kind: str, batch: List[Dict], counts: Dict[str, int]):
+        collection = getattr(self.chroma_client, f"{kind}_collection")
+        try:
+            collection.upsert(
+                ids=[record['id'] for record in batch],
+                documents=[record['document'] for record in batch],
+                metadatas=[record['metadata'] for record in batch]
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to import {len(batch)} {kind}: {e}")
+            counts['failed'] += len(batch)
+            return
+        counts[kind] += len(batch)
+
+        if kind == 'food_logs':
+            days_by_user: Dict[str, set] = {}
+            for record in batch:
+                metadata = record['metadata']
+                days_by_user.setdefault(metadata['user_id'], set()).add(metadata['timestamp'][:10])
+            self.food_log_ops.invalidate_daily_totals(days_by_user)
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Usage: python -m utils.history_transfer export <file> [user_email]
+    #        python -m utils.history_transfer import <file>
+    from utils.chromadb_client import get_chroma_client
+
+    if len(sys.argv) < 3 or sys.argv[1] not in ('export', 'import'):
+        print("Usage: python -m utils.history_transfer export|import <file.ndjson[.gz]|file.parquet> [user_email]")
+        sys.exit(1)
+
+    command, path = sys.argv[1], sys.argv[2]
+    if command == 'export':
+        HistoryExporter(get_chroma_client()).export(path, sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        print(HistoryImporter(get_chroma_client()).import_file(path))
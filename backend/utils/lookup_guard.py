@@ -0,0 +1,177 @@
+"""
+Lookup Guard
+Runs blocking upstream calls (Gemini) on a bounded thread pool with per-call deadlines
+and a circuit breaker, so a slow or failing upstream cannot tie up request workers
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+
+class LookupUnavailableError(RuntimeError):
+    """Raised when a guarded call is skipped because the upstream is degraded"""
+
+
+class LookupTimeoutError(TimeoutError):
+    """Raised when a guarded call misses its deadline"""
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures, half-open after a cool-down, closed on success"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to stay open before letting one trial call through
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, without consuming the half-open trial"""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """True if a call may go upstream now (half-open admits a single trial)"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release_trial(self):
+        """Give back a half-open trial that never reached the upstream"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            reopen = self._trial_in_flight
+            self._trial_in_flight = False
+            if reopen or self._failures >= self.failure_threshold:
+                if self._opened_at is None or reopen:
+                    self.times_opened += 1
+                self._opened_at = time.monotonic()
+
+
+class LookupGuard:
+    """Deadline, concurrency limit and circuit breaker around blocking calls"""
+
+    def __init__(self, timeout: float = 8.0, max_concurrency: int = 4,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            timeout: Default per-call deadline in seconds
+            max_concurrency: Most upstream calls running at once across all callers
+            breaker: Circuit breaker to consult (a default one is created if omitted)
+        """
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix='lookup-guard')
+        # Held until the worker thread actually finishes, so abandoned calls still count
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats = {'calls': 0, 'succeeded': 0, 'failed': 0, 'timed_out': 0,
+                       'short_circuited': 0, 'saturated': 0}
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def call(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on the pool and wait at most `timeout` seconds
+
+        Args:
+            fn: Blocking callable (e.g. model.generate_content)
+            timeout: Deadline for this call; defaults to the guard's timeout
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            LookupUnavailableError: Circuit is open or every slot is busy past the deadline
+            LookupTimeoutError: fn did not finish before the deadline
+        """
+        limit = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + limit
+        self._count('calls')
+
+        if not self.breaker.allow_request():
+            self._count('short_circuited')
+            raise LookupUnavailableError("upstream circuit is open")
+
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            # Not the upstream's fault, so do not count it against the breaker
+            self._count('saturated')
+            self.breaker.release_trial()
+            raise LookupUnavailableError("all upstream slots are busy")
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self._slots.release()
+            raise LookupUnavailableError("lookup guard is shut down")
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            # Drop the call if it has not started; a running thread is left to finish and discarded
+            future.cancel()
+            self._count('timed_out')
+            self.breaker.record_failure()
+            raise LookupTimeoutError(f"upstream call exceeded {limit:.1f}s deadline")
+        except Exception:
+            self._count('failed')
+            self.breaker.record_failure()
+            raise
+
+        self._count('succeeded')
+        self.breaker.record_success()
+        return result
+
+    def get_stats(self) -> Dict:
+        """Call counters plus current breaker state"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['circuit_state'] = self.breaker.state
+        stats['circuit_opened'] = self.breaker.times_opened
+        return stats
+
+    def shutdown(self, wait: bool = False):
+        """Cancel queued calls and stop accepting new ones"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
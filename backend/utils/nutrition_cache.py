@@ -1,78 +1,139 @@
 """
 Nutrition Cache System
-Caches nutrition data in ChromaDB for fast lookups
+Caches nutrition data in ChromaDB for fast lookups, fronted by an in-process LRU
 """
 
+import hashlib
 import json
-import uuid
+import threading
 from typing import Dict, Optional
 from datetime import datetime
 
+from cachetools import Cache, TTLCache
+
+
+# Marks a name that ChromaDB is known not to have ("negative" cache entry)
+_KNOWN_MISS = object()
+
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache that counts capacity evictions and TTL expirations"""
+    
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize, ttl)
+        self.evictions = 0
+        self.expirations = 0
+    
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+    
+    def expire(self, time=None):
+        # Cache.currsize reads the raw size (TTLCache.currsize would expire again)
+        before = Cache.currsize.fget(self)
+        result = super().expire(time)
+        self.expirations += before - Cache.currsize.fget(self)
+        return result
+
 
 class NutritionCache:
     """Cache nutrition data in ChromaDB"""
     
-    def __init__(self, chroma_client):
-        """Initialize nutrition cache"""
+    def __init__(self, chroma_client, max_entries: int = 2048, ttl_seconds: int = 3600):
+        """
+        Initialize nutrition cache
+        
+        Args:
+            chroma_client: ChromaDBClient instance
+            max_entries: Size of the in-memory LRU in front of ChromaDB
+            ttl_seconds: How long an in-memory entry (hit or known miss) stays valid
+        """
         self.client = chroma_client.client
         
-        # Create or get nutrition cache collection
-        self.collection = self.client.get_or_create_collection(
-            name="nutrition_cache",
-            metadata={"description": "Cached nutrition data from Gemini and static database"}
+        # In-memory front cache so repeated lookups skip the ChromaDB round trip
+        self._memory = _CountingTTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._memory_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._negative_hits = 0
+        
+        # Create or get nutrition cache collection (handle cached on the shared client)
+        self.collection = chroma_client.collection(
+            "nutrition_cache",
+            "Cached nutrition data from Gemini and static database"
         )
         
         print("✅ Nutrition cache initialized")
     
+    @staticmethod
+    def cache_id(food_name: str) -> str:
+        """Deterministic document id for a food name (same name -> same row)"""
+        normalized_name = food_name.lower().strip()
+        return 'food_' + hashlib.sha1(normalized_name.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _build_cache_doc(food_name: str, nutrition_data: Dict) -> Dict:
+        """Flatten nutrition data into ChromaDB metadata"""
+        return {
+            'normalized_name': food_name.lower().strip(),
+            'name': nutrition_data.get('name', food_name.title()),
+            'calories': str(nutrition_data.get('calories', 0)),
+            'protein': str(nutrition_data.get('protein', 0)),
+            'carbs': str(nutrition_data.get('carbs', 0)),
+            'fat': str(nutrition_data.get('fat', 0)),
+            'fiber': str(nutrition_data.get('fiber', 0)),
+            'category': nutrition_data.get('category', 'mixed'),
+            'source': nutrition_data.get('source', 'manual'),
+            'cached_at': datetime.now().isoformat()
+        }
+    
     def set(self, food_name: str, nutrition_data: Dict):
         """
-        Store nutrition data in cache
+        Store nutrition data in cache (single upsert keyed by normalized name)
         
         Args:
             food_name: Name of the food
             nutrition_data: Nutrition information dict
         """
-        try:
-            # Normalize food name
-            normalized_name = food_name.lower().strip()
-            
-            # Check if already exists
-            existing = self.get(food_name)
-            if existing:
-                # Update existing entry
-                results = self.collection.get(
-                    where={"normalized_name": normalized_name}
-                )
-                if results['ids']:
-                    self.collection.delete(ids=results['ids'])
-            
-            # Create cache entry
-            cache_id = str(uuid.uuid4())
-            
-            cache_doc = {
-                'normalized_name': normalized_name,
-                'name': nutrition_data.get('name', food_name.title()),
-                'calories': str(nutrition_data.get('calories', 0)),
-                'protein': str(nutrition_data.get('protein', 0)),
-                'carbs': str(nutrition_data.get('carbs', 0)),
-                'fat': str(nutrition_data.get('fat', 0)),
-                'fiber': str(nutrition_data.get('fiber', 0)),
-                'category': nutrition_data.get('category', 'mixed'),
-                'source': nutrition_data.get('source', 'manual'),
-                'cached_at': datetime.now().isoformat()
-            }
-            
-            # Store in ChromaDB
-            self.collection.add(
-                ids=[cache_id],
-                documents=[normalized_name],
-                metadatas=[cache_doc]
-            )
-            
+        if self.set_many({food_name: nutrition_data}):
             print(f"✅ Cached nutrition data for: {food_name}")
+    
+    def set_many(self, items: Dict[str, Dict]) -> int:
+        """
+        Store many foods with one upsert (e.g. to warm the cache)
+        
+        Args:
+            items: Mapping of food name -> nutrition information dict
             
+        Returns:
+            Number of foods written
+        """
+        # Last write wins when two names normalize the same way
+        docs = {}
+        for food_name, nutrition_data in items.items():
+            cache_doc = self._build_cache_doc(food_name, nutrition_data)
+            docs[cache_doc['normalized_name']] = cache_doc
+        
+        if not docs:
+            return 0
+        
+        try:
+            self.collection.upsert(
+                ids=[self.cache_id(name) for name in docs],
+                documents=list(docs.keys()),
+                metadatas=list(docs.values())
+            )
         except Exception as e:
             print(f"⚠️ Error caching nutrition data: {e}")
+            return 0
+        
+        # Write through to the in-memory cache (replaces any known-miss entry)
+        with self._memory_lock:
+            for normalized_name, cache_doc in docs.items():
+                self._memory[normalized_name] = self._metadata_to_nutrition(cache_doc)
+        
+        return len(docs)
     
     def search_similar(self, food_name: str, limit: int = 5) -> list:
         """
@@ -136,31 +197,76 @@ class NutritionCache:
                 nutrition['source'] = 'static'
                 return nutrition
             
+            # Then the in-memory cache (hits and known misses)
+            with self._memory_lock:
+                cached = self._memory.get(normalized_name)
+                if cached is _KNOWN_MISS:
+                    self._hits += 1
+                    self._negative_hits += 1
+                    return None
+                if cached is not None:
+                    self._hits += 1
+                    return cached.copy()
+                self._misses += 1
+            
             # Then check ChromaDB cache for previously looked up items
-            results = self.collection.get(
-                where={"normalized_name": normalized_name}
-            )
+            results = self.collection.get(ids=[self.cache_id(normalized_name)])
+            if not results['ids']:
+                # Rows written before ids were derived from the name
+                results = self.collection.get(
+                    where={"normalized_name": normalized_name}
+                )
             
+            nutrition = None
             if results['ids']:
-                metadata = results['metadatas'][0]
-                
-                # Parse nutrition data
-                nutrition = {
-                    'name': metadata['name'],
-                    'calories': float(metadata['calories']),
-                    'protein': float(metadata['protein']),
-                    'carbs': float(metadata['carbs']),
-                    'fat': float(metadata['fat']),
-                    'fiber': float(metadata['fiber']),
-                    'category': metadata['category'],
-                    'source': metadata.get('source', 'cache'),
-                    'cached_at': metadata.get('cached_at', '')
-                }
-                
-                return nutrition
+                nutrition = self._metadata_to_nutrition(results['metadatas'][0])
             
-            return None
+            with self._memory_lock:
+                self._memory[normalized_name] = nutrition if nutrition else _KNOWN_MISS
+            
+            return nutrition.copy() if nutrition else None
             
         except Exception as e:
             print(f"⚠️ Error reading from nutrition cache: {e}")
             return None
+    
+    @staticmethod
+    def _metadata_to_nutrition(metadata: Dict) -> Dict:
+        """Parse a stored cache document back into a nutrition dict"""
+        return {
+            'name': metadata['name'],
+            'calories': float(metadata['calories']),
+            'protein': float(metadata['protein']),
+            'carbs': float(metadata['carbs']),
+            'fat': float(metadata['fat']),
+            'fiber': float(metadata['fiber']),
+            'category': metadata['category'],
+            'source': metadata.get('source', 'cache'),
+            'cached_at': metadata.get('cached_at', '')
+        }
+    
+    def invalidate(self, food_name: Optional[str] = None):
+        """
+        Drop in-memory entries so the next get() goes back to ChromaDB
+        
+        Args:
+            food_name: Name to drop, or None to clear everything
+        """
+        with self._memory_lock:
+            if food_name is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(food_name.lower().strip(), None)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """In-memory cache counters (hits include known-miss hits)"""
+        with self._memory_lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'negative_hits': self._negative_hits,
+                'evictions': self._memory.evictions,
+                'expirations': self._memory.expirations,
+                'size': len(self._memory),
+                'max_size': int(self._memory.maxsize)
+            }
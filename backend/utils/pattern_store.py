@@ -0,0 +1,120 @@
+"""
+Pattern Store
+Rolling per-user eating patterns read from the day-bucketed rollups kept by FoodLogOperations
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class PatternStore:
+    """
+    O(window) pattern analysis, independent of how much history a user has
+
+    FoodLogOperations updates one bucket per user per day on every create/delete,
+    holding nutrient sums, the meal count and food/meal-type counters. A pattern
+    query reads only the buckets inside the window, so older days drop out by
+    simply not being read.
+    """
+
+    def __init__(self, food_log_ops, window_days: int = 14):
+        """
+        Args:
+            food_log_ops: FoodLogOperations instance that maintains the day buckets
+            window_days: Number of days (including today) the patterns cover
+        """
+        self.food_log_ops = food_log_ops
+        self.window_days = window_days
+
+    def get_patterns(self, user_id: str, thresholds: Optional[Dict] = None,
+                     now: Optional[datetime] = None) -> Dict:
+        """
+        Get rolling patterns for a user
+
+        Args:
+            user_id: User email
+            thresholds: 'low_protein' and 'high_calories' limits for the day counts
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Dict with total_meals, food_frequency, meal_times, avg_calories,
+            avg_protein, low_protein_days, high_calorie_days and days_logged
+        """
+        thresholds = thresholds or {}
+        now = now or datetime.now()
+        buckets = self.food_log_ops.get_daily_buckets(
+            user_id, now - timedelta(days=self.window_days - 1), now
+        )
+
+        patterns = {
+            'total_meals': 0,
+            'food_frequency': {},
+            'meal_times': {},
+            'avg_calories': 0,
+            'avg_protein': 0,
+            'low_protein_days': 0,
+            'high_calorie_days': 0,
+            'days_logged': 0,
+        }
+
+        calories_sum = protein_sum = 0.0
+        for bucket in buckets.values():
+            if not bucket['log_count']:
+                continue
+
+            patterns['total_meals'] += bucket['log_count']
+            patterns['days_logged'] += 1
+            calories_sum += bucket['calories']
+            protein_sum += bucket['protein']
+
+            for name, count in bucket['food_counts'].items():
+                patterns['food_frequency'][name] = patterns['food_frequency'].get(name, 0) + count
+            for meal_type, count in bucket['meal_counts'].items():
+                patterns['meal_times'][meal_type] = patterns['meal_times'].get(meal_type, 0) + count
+
+            if 'low_protein' in thresholds and bucket['protein'] < thresholds['low_protein']:
+                patterns['low_protein_days'] += 1
+            if 'high_calories' in thresholds and bucket['calories'] > thresholds['high_calories']:
+                patterns['high_calorie_days'] += 1
+
+        if patterns['days_logged']:
+            patterns['avg_calories'] = calories_sum / patterns['days_logged']
+            patterns['avg_protein'] = protein_sum / patterns['days_logged']
+
+        return patterns
+
+    def get_summary(self, user_id: str, days: int = 7, now: Optional[datetime] = None) -> Dict:
+        """
+        Per-day averages and food category counts over the last `days` days
+
+        Reads one rollup per day instead of every log in the range, and
+        averages the logged days' nutrient sums as one array.
+
+        Args:
+            user_id: User email
+            days: Number of days (including today) to cover
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Dict with days_logged, avg_calories, avg_protein, avg_carbs and
+            category_counts (days_logged is 0 when nothing was logged)
+        """
+        now = now or datetime.now()
+        buckets = self.food_log_ops.get_daily_buckets(user_id, now - timedelta(days=max(days, 1) - 1), now)
+        logged = [bucket for bucket in buckets.values() if bucket['log_count']]
+
+        summary = {'days_logged': len(logged), 'avg_calories': 0.0, 'avg_protein': 0.0,
+                   'avg_carbs': 0.0, 'category_counts': {}}
+        if not logged:
+            return summary
+
+        sums = np.array([[bucket['calories'], bucket['protein'], bucket['carbs']] for bucket in logged],
+                        dtype=np.float64)
+        summary['avg_calories'], summary['avg_protein'], summary['avg_carbs'] = sums.mean(axis=0).tolist()
+
+        for bucket in logged:
+            for category, count in bucket['category_counts'].items():
+                summary['category_counts'][category] = summary['category_counts'].get(category, 0) + count
+        return summary
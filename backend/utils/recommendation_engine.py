@@ -8,6 +8,8 @@ from typing import List, Dict, Any
 from datetime import datetime
 from collections import defaultdict
 
+from utils.user_history import UserHistoryView
+
 class RecommendationEngine:
     def __init__(self, thresholds: Dict, prompts: Dict):
         self.thresholds = thresholds
@@ -18,7 +20,10 @@ class RecommendationEngine:
         if not user_history:
             return {'status': 'insufficient_data'}
         
-        recent_logs = user_history[-14:]  # Last 2 weeks
+        if isinstance(user_history, UserHistoryView):
+            recent_logs = user_history.last_days(14)  # Last 2 weeks
+        else:
+            recent_logs = user_history[-14:]  # Last 2 weeks
         
         patterns = {
             'total_meals': len(recent_logs),
@@ -58,8 +63,11 @@ class RecommendationEngine:
         recommendations = []
         
         # Get today's totals
-        today = datetime.now().date().isoformat()
-        today_logs = [log for log in user_history if log['timestamp'].startswith(today)]
+        if isinstance(user_history, UserHistoryView):
+            today_logs = user_history.today()
+        else:
+            today = datetime.now().date().isoformat()
+            today_logs = [log for log in user_history if log['timestamp'].startswith(today)]
         
         today_protein = sum(log['total_nutrition']['protein'] for log in today_logs)
         today_calories = sum(log['total_nutrition']['calories'] for log in today_logs)
@@ -0,0 +1,107 @@
+"""
+Session Sweeper
+Deletes expired sessions on a background schedule
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class SessionSweeper:
+    """
+    Runs SessionOperations.cleanup_expired_sessions every `interval` seconds
+
+    Each sweep deletes in batches of batch_size and stops after max_batches, so
+    one run does a bounded amount of work however many sessions have piled up;
+    anything left is picked up by the next run.
+    """
+
+    def __init__(self, session_ops, interval: float = 3600, batch_size: int = 500,
+                 max_batches: Optional[int] = 100):
+        """
+        Args:
+            session_ops: SessionOperations for the sessions collection
+            interval: Seconds between sweeps
+            batch_size: Sessions deleted per round trip
+            max_batches: Most batches per sweep (None: no limit)
+        """
+        self.session_ops = session_ops
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {'sweeps': 0, 'deleted_total': 0, 'last_deleted': 0,
+                       'last_duration_ms': 0.0, 'last_run': None}
+
+    def sweep(self) -> int:
+        """
+        Delete expired sessions once and record the result
+
+        Returns:
+            Number of sessions deleted
+        """
+        start = time.perf_counter()
+        deleted = self.session_ops.cleanup_expired_sessions(
+            batch_size=self.batch_size, max_batches=self.max_batches
+        )
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._stats['sweeps'] += 1
+            self._stats['deleted_total'] += deleted
+            self._stats['last_deleted'] = deleted
+            self._stats['last_duration_ms'] = round(duration_ms, 1)
+            self._stats['last_run'] = datetime.now().isoformat()
+
+        print(f"🧹 Session sweep deleted {deleted} expired sessions in {duration_ms:.0f} ms")
+        return deleted
+
+    def start(self):
+        """Start sweeping in a daemon thread (first sweep after one interval)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='session-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get_stats(self) -> Dict:
+        """Counters from the sweeps run so far, and whether this process is sweeping"""
+        with self._lock:
+            return dict(self._stats, interval_seconds=self.interval, running=self._thread is not None)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️ Session sweep failed: {e}")
+
+
+if __name__ == '__main__':
+    import os
+
+    # Usage: python -m utils.session_sweeper
+    # Sweeps in the foreground, for deployments where the web workers run with
+    # SESSION_SWEEPER_ENABLED=false
+    from utils.chromadb_client import SessionOperations, get_chroma_client
+
+    sweeper = SessionSweeper(
+        SessionOperations(get_chroma_client()),
+        interval=float(os.getenv('SESSION_SWEEP_INTERVAL_SECONDS', '3600')),
+        batch_size=int(os.getenv('SESSION_SWEEP_BATCH_SIZE', '500'))
+    )
+    while True:
+        try:
+            sweeper.sweep()
+        except Exception as e:
+            print(f"⚠️ Session sweep failed: {e}")
+        time.sleep(sweeper.interval)
@@ -0,0 +1,135 @@
+"""
+Single Flight
+Coalesces identical concurrent calls so only one reaches the upstream and the rest share its result
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Set, Tuple
+
+
+class _Call:
+    """One in-flight call that followers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Per-key call deduplication (like Go's singleflight.Group)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._issued = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key at a time; concurrent callers with the same key wait for it
+
+        Args:
+            key: Identity of the call (e.g. normalized food name)
+            fn: Zero-argument callable doing the real work
+
+        Returns:
+            (result, shared) where shared is True if this caller reused another's call
+            (always False for the caller that ran fn)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._issued += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the key before waking followers so later callers start a fresh call
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def do_many(self, keys: Sequence[Hashable],
+                fn: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Tuple[Dict[Hashable, Any], Set[Hashable]]:
+        """
+        do() for several keys with one call: fn runs once for the keys not already in flight
+
+        Keys another caller is already working on (through do() or do_many())
+        wait for that call instead, and callers arriving while fn runs wait on it
+        for the keys it covers.
+
+        Args:
+            keys: Identities of the calls
+            fn: Takes the list of keys this caller leads and returns a result per key
+                (missing keys get None)
+
+        Returns:
+            (results, shared) where results maps every key to its result and shared
+            holds the keys whose result came from another caller's call
+        """
+        led: Dict[Hashable, _Call] = {}
+        joined: Dict[Hashable, _Call] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                call = self._calls.get(key)
+                if call is not None:
+                    joined[key] = call
+                    self._coalesced += 1
+                else:
+                    call = _Call()
+                    self._calls[key] = call
+                    led[key] = call
+            if led:
+                self._issued += 1
+
+        results: Dict[Hashable, Any] = {}
+        if led:
+            try:
+                output = fn(list(led))
+                for key, call in led.items():
+                    call.result = results[key] = output.get(key)
+            except BaseException as e:
+                for call in led.values():
+                    call.error = e
+                raise
+            finally:
+                with self._lock:
+                    for key in led:
+                        del self._calls[key]
+                for call in led.values():
+                    call.done.set()
+
+        for key, call in joined.items():
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            results[key] = call.result
+
+        return results, set(joined)
+
+    def get_stats(self) -> Dict:
+        """Issued calls (one per do_many batch), coalesced keys and keys currently in flight"""
+        with self._lock:
+            return {
+                'issued': self._issued,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls)
+            }
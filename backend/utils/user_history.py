@@ -0,0 +1,135 @@
+"""
+User History View
+Request-scoped food-log history: loaded once, then sliced into today/7d/14d/30d windows without copying
+"""
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+
+class UserHistoryView(Sequence):
+    """
+    Newest-first list of a user's logs, shared by every window taken from it
+
+    Because logs are ordered newest first, every "since <time>" window is a prefix
+    of the same list, so a window is just the shared list plus a length.
+    It behaves like the list returned by FoodLogOperations.get_recent_logs.
+    """
+
+    def __init__(self, logs: List[Dict], now: Optional[datetime] = None,
+                 _neg_epochs: Optional[List[float]] = None, _stop: Optional[int] = None):
+        """
+        Args:
+            logs: Food logs sorted newest first (as returned by get_user_logs)
+            now: Reference time for relative windows (defaults to the current time)
+        """
+        self._logs = logs
+        self.now = now or datetime.now()
+        if _neg_epochs is None:
+            # Negated so the newest-first order is ascending for bisect
+            _neg_epochs = [-self._epoch(log) for log in logs]
+        self._neg_epochs = _neg_epochs
+        self._stop = len(logs) if _stop is None else _stop
+
+    @staticmethod
+    def _epoch(log: Dict) -> float:
+        timestamp = log['timestamp']
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        return timestamp.timestamp()
+
+    @classmethod
+    def load(cls, food_log_ops, user_id: str, days: int = 30,
+             now: Optional[datetime] = None) -> 'UserHistoryView':
+        """
+        Fetch the widest window the request needs with a single store query
+
+        Args:
+            food_log_ops: FoodLogOperations instance
+            user_id: User email
+            days: Widest window in days
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            UserHistoryView over the loaded logs
+        """
+        now = now or datetime.now()
+        logs = food_log_ops.get_user_logs(user_id, start_date=now - timedelta(days=days))
+        return cls(logs, now=now)
+
+    @classmethod
+    def load_in_background(cls, food_log_ops, user_id: str, executor, days: int = 30,
+                           now: Optional[datetime] = None) -> 'UserHistoryView':
+        """
+        Like load(), but the query runs on executor and the view waits for it on first use
+
+        Lets a streaming request start its pipeline while history is still loading.
+
+        Args:
+            food_log_ops: FoodLogOperations instance
+            user_id: User email
+            executor: concurrent.futures executor to run the query on
+            days: Widest window in days
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            UserHistoryView that fills itself from the query result
+        """
+        now = now or datetime.now()
+        future = executor.submit(cls.load, food_log_ops, user_id, days, now)
+        return _DeferredUserHistoryView(future, now)
+
+    @classmethod
+    def from_logs(cls, logs: List[Dict], now: Optional[datetime] = None) -> 'UserHistoryView':
+        """Wrap logs in any order (e.g. supplied by an API client)"""
+        return cls(sorted(logs, key=cls._epoch, reverse=True), now=now)
+
+    def __len__(self) -> int:
+        return self._stop
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._logs[:self._stop][index]
+        if index < 0:
+            index += self._stop
+        if not 0 <= index < self._stop:
+            raise IndexError('history index out of range')
+        return self._logs[index]
+
+    def __iter__(self):
+        for i in range(self._stop):
+            yield self._logs[i]
+
+    def __bool__(self) -> bool:
+        return self._stop > 0
+
+    def since(self, start: datetime) -> 'UserHistoryView':
+        """Logs at or after start (a prefix view sharing this view's storage)"""
+        stop = min(self._stop, bisect_right(self._neg_epochs, -start.timestamp()))
+        return UserHistoryView(self._logs, self.now, self._neg_epochs, stop)
+
+    def last_days(self, days: int) -> 'UserHistoryView':
+        """Logs from the last `days` days"""
+        return self.since(self.now - timedelta(days=days))
+
+    def today(self) -> 'UserHistoryView':
+        """Logs since midnight"""
+        return self.since(self.now.replace(hour=0, minute=0, second=0, microsecond=0))
+
+
+class _DeferredUserHistoryView(UserHistoryView):
+    """UserHistoryView whose storage arrives from a future (see load_in_background)"""
+
+    def __init__(self, future, now: datetime):
+        self._future = future
+        self.now = now
+
+    def __getattr__(self, name):
+        # Only reached while the storage attributes are still unset
+        if name in ('_logs', '_neg_epochs', '_stop'):
+            view = self._future.result()
+            self._logs, self._neg_epochs, self._stop = view._logs, view._neg_epochs, view._stop
+            return getattr(self, name)
+        raise AttributeError(name)
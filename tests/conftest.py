@@ -0,0 +1,43 @@
+"""
+Shared Test Fixtures
+In-memory ChromaDB collections shaped like ChromaDBClient, for tests of the operation classes
+"""
+
+import pytest
+import uuid
+from types import SimpleNamespace
+
+import chromadb
+from chromadb import EmbeddingFunction
+
+
+# Collections a ChromaDBClient exposes as <name>_collection
+COLLECTIONS = ('users', 'food_logs', 'sessions', 'chat_logs', 'daily_totals', 'migrations')
+
+
+class ConstantEmbedding(EmbeddingFunction):
+    """Skips the ONNX model; these tests never run similarity queries"""
+
+    def __call__(self, input):
+        return [[0.0, 0.0, 0.0] for _ in input]
+
+
+def _make_chroma_client():
+    """Namespace with fresh in-memory collections, shaped like ChromaDBClient"""
+    client = chromadb.EphemeralClient()
+    suffix = uuid.uuid4().hex[:8]
+    return SimpleNamespace(**{
+        f"{name}_collection": client.create_collection(f"{name}_{suffix}", embedding_function=ConstantEmbedding())
+        for name in COLLECTIONS
+    })
+
+
+@pytest.fixture
+def make_chroma_client():
+    """Factory for tests that need more than one client (e.g. export source and import target)"""
+    return _make_chroma_client
+
+
+@pytest.fixture
+def chroma_client():
+    return _make_chroma_client()
@@ -303,6 +303,36 @@ class TestProcessFoodLog:
                 pass
 
 
+class TestProcessFoodLogs:
+    """Tests for parsing a batch of meals without the graph"""
+    
+    def test_per_entry_results(self):
+        """Test that each entry gets its own result from one parser pass"""
+        from agent import process_food_logs
+        from utils.food_parser import FoodParser
+        from utils.food_catalog import FoodCatalog
+        
+        catalog = FoodCatalog({
+            'banana': {'calories': 105, 'protein': 1.3, 'carbs': 27, 'fat': 0.4, 'fiber': 3.1, 'category': 'fruits'},
+            'rice': {'calories': 205, 'protein': 4.3, 'carbs': 45, 'fat': 0.4, 'fiber': 0.6, 'category': 'carbs'},
+        })
+        parser = FoodParser(catalog, {}, {})
+        entries = [
+            {'food_text': 'banana and rice', 'meal_type': 'lunch'},
+            {'food_text': 'a soda', 'meal_type': 'snack'},
+            {'food_text': 'zzzz', 'meal_type': 'snack'},
+        ]
+        
+        with patch('agent._food_parser', parser), patch.object(parser, 'parse_food_texts',
+                                                               wraps=parser.parse_food_texts) as parse:
+            results = process_food_logs('test_user', entries)
+        
+        parse.assert_called_once()
+        assert results[0]['success'] and results[0]['total_nutrition']['calories'] == 310
+        assert not results[1]['success'] and results[1]['needs_clarification']
+        assert not results[2]['success'] and results[2]['error'] == 'not_recognized'
+
+
 class TestMindfulEatingAgent:
     """Tests for the compiled agent graph"""
     
@@ -350,6 +380,30 @@ class TestConversationalAgent:
         """Test main conversational function exists"""
         from agent_chat import process_conversational_message
         assert callable(process_conversational_message)
+    
+    def test_stream_yields_steps_then_result(self):
+        """Test that streaming reports each step in order and ends with the full result"""
+        from agent_chat import stream_conversational_message, process_conversational_message
+        
+        message = 'I had chicken breast and brown rice'
+        events = list(stream_conversational_message('test', message, [], []))
+        names = [event for event, _ in events]
+        
+        assert names == ['intent', 'foods', 'nutrition', 'response', 'recommendations', 'result']
+        assert events[0][1] == {'intent': 'log_food'}
+        result = events[-1][1]
+        assert result['success'] and result['foods']
+        assert events[2][1]['total_nutrition'] == result['total_nutrition']
+        expected = process_conversational_message('test', message, [], [])
+        assert result['total_nutrition'] == expected['total_nutrition']
+    
+    def test_stream_stops_after_greeting(self):
+        """Test that a greeting streams only the intent before the result"""
+        from agent_chat import stream_conversational_message
+        
+        events = list(stream_conversational_message('test', 'hello there', [], []))
+        assert [event for event, _ in events] == ['intent', 'result']
+        assert events[-1][1]['intent'] == 'greeting'
 
 
 class TestAgentInitialization:
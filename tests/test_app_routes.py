@@ -0,0 +1,327 @@
+"""
+Route Tests for the Flask App
+Drives the app through app.test_client() on in-memory ChromaDB, with the parser and agent patched out
+"""
+
+import pytest
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from flask.sessions import SecureCookieSessionInterface
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.chromadb_client import FoodLogOperations
+from utils.pattern_store import PatternStore
+
+
+USER = 'user@example.com'
+
+
+@pytest.fixture(scope='module')
+def app_module(tmp_path_factory):
+    """Import the app once, with its start-up ChromaDB in a temp directory and no sweeper"""
+    cwd = os.getcwd()
+    env = {'CHROMA_USE_LOCAL': 'true', 'SESSION_SWEEPER_ENABLED': 'false', 'GEMINI_API_KEY': ''}
+    with patch.dict(os.environ, env):
+        os.chdir(tmp_path_factory.mktemp('app'))
+        try:
+            import app
+        finally:
+            os.chdir(cwd)
+    return app
+
+
+@pytest.fixture
+def food_log_ops(chroma_client):
+    return FoodLogOperations(chroma_client)
+
+
+@pytest.fixture
+def client(app_module, food_log_ops, monkeypatch):
+    """Logged-in test client whose routes read and write the chroma_client fixture"""
+    monkeypatch.setattr(app_module, 'food_log_ops', food_log_ops)
+    monkeypatch.setattr(app_module, 'pattern_store', PatternStore(food_log_ops))
+    # Cookie sessions, so logging in does not need the sessions collection
+    monkeypatch.setattr(app_module.app, 'session_interface', SecureCookieSessionInterface())
+    # Chat logs would otherwise be appended under backend/chat_logs
+    monkeypatch.setattr(app_module, 'log_chat_interaction', Mock())
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = USER
+    return client
+
+
+def parsed(food_text, calories=200):
+    """process_food_logs result for one recognized entry"""
+    return {
+        'success': True,
+        'foods': [{'name': food_text.title(), 'category': 'mixed'}],
+        'total_nutrition': {'calories': calories, 'protein': 10, 'carbs': 20, 'fat': 5, 'fiber': 2}
+    }
+
+
+def sse_events(response):
+    """(event, data) pairs of a text/event-stream body"""
+    events = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        if block:
+            event_line, data_line = block.split('\n')
+            events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+    return events
+
+
+class TestChatStream:
+    """Tests for the server-sent events branch of POST /api/chat"""
+
+    RESULT = {'success': True, 'message': 'Logged your dal!', **parsed('dal')}
+
+    def post_chat(self, client, accept='text/event-stream'):
+        return client.post('/api/chat', json={'message': 'I had dal'}, headers={'Accept': accept})
+
+    def test_events_in_order(self, app_module, client, food_log_ops, monkeypatch):
+        """Test that step events stream in graph order and the result ends the stream as done"""
+        seen_history = []
+
+        def stream(user_id, message, conversation_history, user_history):
+            seen_history.append(user_history)
+            yield 'intent', {'intent': 'food_logging'}
+            yield 'foods', {'foods': self.RESULT['foods']}
+            yield 'nutrition', {'total_nutrition': self.RESULT['total_nutrition']}
+            yield 'result', self.RESULT
+
+        monkeypatch.setattr(app_module, 'stream_conversational_message', stream)
+        earlier = parsed('oats')
+        food_log_ops.create_log(USER, 'breakfast', earlier['foods'], earlier['total_nutrition'], 'oats')
+        response = self.post_chat(client)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        events = sse_events(response)
+        assert [event for event, _ in events] == ['intent', 'foods', 'nutrition', 'done']
+        assert events[-1][1] == self.RESULT
+        # The streamed turn is stored like a plain one
+        assert [log['original_text'] for log in food_log_ops.get_user_logs(USER)] == ['I had dal', 'oats']
+        app_module.log_chat_interaction.assert_called_once_with(USER, 'I had dal', self.RESULT, status='success')
+        # History is loaded from the app's store before the turn is saved
+        assert [log['original_text'] for log in seen_history[0]] == ['oats']
+
+    def test_error_event(self, app_module, client, food_log_ops, monkeypatch):
+        """Test that a failing step ends the stream with an error event and stores nothing"""
+        def stream(user_id, message, conversation_history, user_history):
+            yield 'intent', {'intent': 'food_logging'}
+            raise RuntimeError('agent failed')
+
+        monkeypatch.setattr(app_module, 'stream_conversational_message', stream)
+        events = sse_events(self.post_chat(client))
+
+        assert events == [('intent', {'intent': 'food_logging'}),
+                          ('error', {'error': 'Sorry, something went wrong.'})]
+        assert food_log_ops.get_user_logs(USER) == []
+        app_module.log_chat_interaction.assert_not_called()
+
+    def test_plain_json_without_accept(self, app_module, client, monkeypatch):
+        """Test that clients not asking for a stream get one JSON reply"""
+        process = Mock(return_value=self.RESULT)
+        monkeypatch.setattr(app_module, 'process_conversational_message', process)
+        monkeypatch.setattr(app_module, 'stream_conversational_message', Mock())
+
+        response = self.post_chat(client, accept='application/json')
+
+        assert response.get_json() == self.RESULT
+        process.assert_called_once()
+        app_module.stream_conversational_message.assert_not_called()
+
+
+class TestLogFoodBatch:
+    """Tests for POST /api/log-food/batch"""
+
+    @pytest.fixture
+    def agent(self, app_module, food_log_ops, monkeypatch):
+        """Patched parser and recommendations; records how many logs were stored when recommending"""
+        def process_food_logs(user_id, entries):
+            return [parsed(entry['food_text']) if entry['food_text'] != 'gibberish' else
+                    {'success': False, 'needs_clarification': True, 'clarification_question': 'What is gibberish?'}
+                    for entry in entries]
+
+        stored_when_recommending = []
+
+        def recommend_after_logging(user_id, total_nutrition, user_history):
+            stored_when_recommending.append(len(food_log_ops.get_user_logs(user_id)))
+            return {'recommendations': [{'type': 'tip', 'message': 'Drink water'}], 'patterns': {}}
+
+        agent = Mock(process_food_logs=Mock(side_effect=process_food_logs),
+                     recommend_after_logging=Mock(side_effect=recommend_after_logging),
+                     stored_when_recommending=stored_when_recommending)
+        monkeypatch.setattr(app_module, 'process_food_logs', agent.process_food_logs)
+        monkeypatch.setattr(app_module, 'recommend_after_logging', agent.recommend_after_logging)
+        return agent
+
+    def test_per_entry_results(self, client, agent, food_log_ops, chroma_client):
+        """Test that bad entries get their own errors and good ones are stored with one add"""
+        food_log_ops.collection = Mock(wraps=chroma_client.food_logs_collection)
+        aware = '2026-01-02T09:00:00+05:00'
+        response = client.post('/api/log-food/batch', json={'entries': [
+            {'food_text': 'oats', 'timestamp': '2026-01-02T08:30:00'},
+            {'food_text': 'dal', 'timestamp': aware, 'meal_type': 'lunch'},
+            {'food_text': ''},
+            {'food_text': 'rice', 'timestamp': 'yesterday'},
+            {'food_text': 'rice', 'meal_type': 'brunch'},
+            {'food_text': 'gibberish'},
+            {'food_text': 'rice', 'meal_type': 'dinner'},
+        ]})
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert (body['success'], body['logged'], body['failed']) == (True, 3, 4)
+        results = body['results']
+        assert [result['success'] for result in results] == [True, True, False, False, False, False, True]
+        assert results[2]['error'] == 'Missing food_text'
+        assert results[3]['error'] == 'Invalid timestamp (use ISO 8601)'
+        assert results[4]['error'].startswith('Invalid meal_type')
+        assert results[5]['error'] == 'What is gibberish?'
+
+        # Naive times are kept, aware ones become naive local time, and a
+        # missing meal_type follows the hour
+        assert (results[0]['timestamp'], results[0]['meal_type']) == ('2026-01-02T08:30:00', 'breakfast')
+        local = datetime.fromisoformat(aware).astimezone().replace(tzinfo=None)
+        assert results[1]['timestamp'] == local.isoformat()
+        assert results[6]['timestamp'][:10] == datetime.now().date().isoformat()
+
+        food_log_ops.collection.add.assert_called_once()
+        assert len(food_log_ops.collection.add.call_args.kwargs['ids']) == 3
+        assert len(food_log_ops.get_user_logs(USER)) == 3
+
+    def test_recommendations_once_before_add(self, client, agent):
+        """Test that recommendations run once, over today's entries, before the batch is stored"""
+        response = client.post('/api/log-food/batch', json={'entries': [
+            {'food_text': 'oats', 'timestamp': '2026-01-02T08:30:00'},
+            {'food_text': 'rice'},
+            {'food_text': 'dal'},
+        ]})
+
+        assert response.get_json()['recommendations'] == [{'type': 'tip', 'message': 'Drink water'}]
+        agent.recommend_after_logging.assert_called_once()
+        assert agent.recommend_after_logging.call_args.args[1]['calories'] == 400
+        # Stored patterns and the history view both predate the batch
+        assert agent.stored_when_recommending == [0]
+        assert len(agent.recommend_after_logging.call_args.args[2]) == 0
+
+    def test_nothing_recognized(self, client, agent):
+        """Test that a batch with no storable entry stores nothing and skips recommendations"""
+        response = client.post('/api/log-food/batch', json={'entries': [{'food_text': 'gibberish'}]})
+
+        body = response.get_json()
+        assert (body['success'], body['logged'], body['recommendations']) == (False, 0, [])
+        agent.recommend_after_logging.assert_not_called()
+
+    @pytest.mark.parametrize('payload', [{}, {'entries': []}, {'entries': 'rice'}])
+    def test_entries_required(self, client, payload):
+        """Test that a missing or empty entries list is a 400"""
+        assert client.post('/api/log-food/batch', json=payload).status_code == 400
+
+    def test_requires_login(self, client):
+        """Test that the endpoint needs a session"""
+        with client.session_transaction() as sess:
+            sess.clear()
+        assert client.post('/api/log-food/batch', json={'entries': [{'food_text': 'rice'}]}).status_code == 401
+
+
+
+class TestLogPages:
+    """Tests for the paginated GET /api/logs and /api/calendar-logs"""
+
+    @pytest.fixture
+    def history(self, food_log_ops):
+        """Five logs over three recent days, newest first by calories (500 down to 100)"""
+        noon = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        times = [noon - timedelta(days=2), noon - timedelta(days=1, hours=2), noon - timedelta(days=1),
+                 noon - timedelta(hours=1), noon]
+        food_log_ops.create_logs(USER, [
+            {'meal_type': 'lunch', 'total_nutrition': parsed('rice', calories)['total_nutrition'],
+             'foods': [{'name': 'Rice'}], 'original_text': 'rice', 'timestamp': timestamp}
+            for calories, timestamp in zip((100, 200, 300, 400, 500), times)
+        ])
+        return noon
+
+    def read_all(self, client, url):
+        pages, cursor = [], None
+        while True:
+            body = client.get(url + (f'&cursor={cursor}' if cursor else '')).get_json()
+            pages.append(body)
+            cursor = body['next_cursor']
+            if cursor is None:
+                return pages
+
+    def test_logs_cursor_round_trip(self, client, history):
+        """Test that following next_cursor returns every log once, newest first"""
+        pages = self.read_all(client, '/api/logs?limit=2')
+
+        assert [len(page['logs']) for page in pages] == [2, 2, 1]
+        calories = [log['total_nutrition']['calories'] for page in pages for log in page['logs']]
+        assert calories == [500, 400, 300, 200, 100]
+
+    def test_calendar_cursor_round_trip(self, client, history):
+        """Test that calendar pages group by day and report whole-day totals from the rollups"""
+        pages = self.read_all(client, '/api/calendar-logs?limit=3&days=30')
+        days = [day for page in pages for day in page['calendar']]
+
+        assert [len(page['calendar']) for page in pages] == [2, 2]
+        # Yesterday spans both pages; each page reports the day's full total
+        yesterday = (history - timedelta(days=1)).date().isoformat()
+        assert [day['date'] for day in days].count(yesterday) == 2
+        for day in days:
+            if day['date'] == yesterday:
+                assert (day['data']['total_calories'], day['data']['meal_count']) == (500, 2)
+        assert sum(len(day['data']['meals']) for day in days) == 5
+
+    @pytest.mark.parametrize('url', ['/api/logs', '/api/calendar-logs'])
+    def test_invalid_cursor(self, client, history, url):
+        """Test that a malformed cursor is a 400"""
+        response = client.get(url + '?cursor=not-a-cursor')
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+
+class TestWeeklyInsight:
+    """Tests for GET /api/weekly-insight"""
+
+    def test_no_logs(self, client):
+        """Test the prompt shown before anything is logged"""
+        body = client.get('/api/weekly-insight').get_json()
+        assert body['summary'] is None
+        assert body['suggestions'] == []
+
+    def test_summary_from_rollups(self, client, food_log_ops, monkeypatch):
+        """Test that the summary comes from the day rollups without reading the logs"""
+        now = datetime.now()
+        food_log_ops.create_logs(USER, [
+            {'meal_type': 'lunch', 'original_text': 'fries',
+             'foods': [{'name': 'Fries', 'category': 'fast_food'}, {'name': 'Cola', 'category': 'treats'}],
+             'total_nutrition': {'calories': 2400, 'protein': 20, 'carbs': 300, 'fat': 90, 'fiber': 2},
+             'timestamp': now},
+            {'meal_type': 'dinner', 'original_text': 'salad',
+             'foods': [{'name': 'Salad', 'category': 'vegetables'}],
+             'total_nutrition': {'calories': 200, 'protein': 40, 'carbs': 0, 'fat': 5, 'fiber': 6},
+             'timestamp': now - timedelta(days=1)},
+        ])
+        monkeypatch.setattr(food_log_ops, 'get_user_logs', Mock(side_effect=AssertionError('read the logs')))
+
+        body = client.get('/api/weekly-insight?days=7').get_json()
+
+        assert body['summary'] == {'days_considered': 2, 'avg_calories': 1300, 'avg_protein': 30,
+                                   'avg_carbs': 150, 'fast_food_meals': 2, 'vegetable_meals': 1,
+                                   'fruit_meals': 0}
+        assert body['insight'].startswith('In the last 2 days, you averaged about 1300 calories')
+        assert any('fast food' in suggestion for suggestion in body['suggestions'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,140 @@
+"""
+Unit Tests for Chat Log Writer
+Tests batching, daily NDJSON files, backpressure and flush on shutdown
+"""
+
+import pytest
+import sys
+import os
+import gzip
+import json
+import threading
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.chromadb_client import ChatLogOperations
+from utils.chat_log_writer import ChatLogWriter
+
+
+RESULT = {'agent_response': 'Logged!', 'foods': [{'name': 'apple'}], 'intent': 'log_food'}
+
+
+class FakeChatLogOps:
+    """Records bulk adds; can be held to simulate a slow database"""
+
+    build_chat_log = staticmethod(ChatLogOperations.build_chat_log)
+
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def add_chat_logs(self, entries):
+        if self.gate is not None:
+            self.gate.wait()
+        self.batches.append(list(entries))
+        return True
+
+
+def read_lines(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestChatLogWriter:
+    """Tests for the write-behind queue"""
+
+    def test_batches_to_file_and_database(self, tmp_path):
+        """Test that queued entries reach the daily file and a bulk add"""
+        ops = FakeChatLogOps()
+        writer = ChatLogWriter(ops, str(tmp_path), batch_size=50)
+        for i in range(120):
+            assert writer.submit('user@example.com', f"message {i}", RESULT)
+        writer.close()
+
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1 and files[0].name.endswith('.ndjson')
+        lines = read_lines(str(files[0]))
+        assert [line['message'] for line in lines] == [f"message {i}" for i in range(120)]
+        assert lines[0]['foods'] == [{'name': 'apple'}]
+        assert sum(len(batch) for batch in ops.batches) == 120
+        assert max(len(batch) for batch in ops.batches) <= 50
+        assert writer.get_stats()['written'] == 120
+
+    def test_rotates_by_day(self, tmp_path):
+        """Test that entries land in the file for their own day"""
+        ops = FakeChatLogOps()
+        writer = ChatLogWriter(ops, str(tmp_path))
+        first = ops.build_chat_log('u', 'late night', RESULT)
+        second = ops.build_chat_log('u', 'breakfast', RESULT)
+        first['timestamp'] = '2025-01-01T23:59:59'
+        second['timestamp'] = '2025-01-02T08:00:00'
+        writer._write_batch([first, second])
+        writer.close()
+
+        assert read_lines(str(tmp_path / 'chat_2025-01-01.ndjson'))[0]['message'] == 'late night'
+        assert read_lines(str(tmp_path / 'chat_2025-01-02.ndjson'))[0]['message'] == 'breakfast'
+
+    def test_compressed_appends(self, tmp_path):
+        """Test that gzip batches append into one readable file"""
+        writer = ChatLogWriter(FakeChatLogOps(), str(tmp_path), compress=True)
+        writer.submit('u', 'first', RESULT)
+        writer.flush()
+        writer.submit('u', 'second', RESULT)
+        writer.close()
+
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1 and files[0].name.endswith('.ndjson.gz')
+        assert [line['message'] for line in read_lines(str(files[0]))] == ['first', 'second']
+
+    def test_backpressure_drops_when_full(self, tmp_path):
+        """Test that a full buffer drops entries instead of blocking forever"""
+        gate = threading.Event()
+        writer = ChatLogWriter(FakeChatLogOps(gate), str(tmp_path), max_pending=2,
+                               batch_size=1, block_timeout=0.01)
+        results = [writer.submit('u', f"message {i}", RESULT) for i in range(10)]
+        gate.set()
+        writer.close()
+
+        stats = writer.get_stats()
+        assert results.count(False) == stats['dropped'] > 0
+        assert stats['written'] == stats['submitted'] == results.count(True)
+
+    def test_close_flushes_and_rejects(self, tmp_path):
+        """Test that close writes everything buffered and refuses new entries"""
+        ops = FakeChatLogOps()
+        writer = ChatLogWriter(ops, str(tmp_path), flush_interval=60)
+        for i in range(5):
+            writer.submit('u', f"message {i}", RESULT)
+        writer.close()
+
+        assert sum(len(batch) for batch in ops.batches) == 5
+        assert writer.submit('u', 'too late', RESULT) is False
+
+    def test_failed_batch_keeps_writer_running(self, tmp_path):
+        """Test that an unexpected error in one batch is counted and later batches still land"""
+        ops = FakeChatLogOps()
+        calls = []
+
+        def add_chat_logs(entries):
+            calls.append(len(entries))
+            if len(calls) == 1:
+                raise RuntimeError('database gone')
+            return FakeChatLogOps.add_chat_logs(ops, entries)
+
+        ops.add_chat_logs = add_chat_logs
+        writer = ChatLogWriter(ops, str(tmp_path), flush_interval=0.05)
+        writer.submit('u', 'lost', RESULT)
+        writer.flush()
+        writer.submit('u', 'kept', RESULT)
+        writer.flush()
+
+        stats = writer.get_stats()
+        assert stats['batch_errors'] == 1
+        assert [entry['message'] for batch in ops.batches for entry in batch] == ['kept']
+        writer.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
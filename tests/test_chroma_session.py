@@ -0,0 +1,160 @@
+"""
+Unit Tests for ChromaDB Session Interface
+Tests the in-memory session cache, skipped writes and compact encoding
+"""
+
+import pytest
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from flask import Flask, session
+from utils.chroma_session import ChromaSessionInterface
+
+
+class FakeSessionOps:
+    """In-memory SessionOperations that counts store calls"""
+
+    def __init__(self):
+        self.sessions = {}
+        self.calls = {'get': 0, 'save': 0, 'update': 0, 'delete': 0}
+
+    def get_session(self, session_id):
+        self.calls['get'] += 1
+        return self.sessions.get(session_id)
+
+    def save_session(self, session_id, user_id, expiry, data, created_at=None):
+        self.calls['save'] += 1
+        self.sessions[session_id] = {
+            'id': session_id, 'user_id': user_id, 'created_at': created_at,
+            'expiration': expiry.isoformat(), 'data': data
+        }
+        return True
+
+    def update_session(self, session_id, user_id, expiry, data):
+        self.calls['update'] += 1
+        # Like ChromaDB's update(), a missing id is skipped without error
+        if session_id in self.sessions:
+            self.sessions[session_id].update(user_id=user_id, expiration=expiry.isoformat(), data=data)
+        return True
+
+    def delete_session(self, session_id):
+        self.calls['delete'] += 1
+        self.sessions.pop(session_id, None)
+
+
+@pytest.fixture
+def ops():
+    return FakeSessionOps()
+
+
+@pytest.fixture
+def client(ops):
+    app = Flask(__name__)
+    app.config['SESSION_COOKIE_NAME'] = 'test_session'
+    app.permanent_session_lifetime = timedelta(days=7)
+    app.session_interface = ChromaSessionInterface(ops)
+
+    @app.route('/login/<user>')
+    def login(user):
+        session['user_id'] = user
+        session.permanent = True
+        return 'ok'
+
+    @app.route('/whoami')
+    def whoami():
+        return session.get('user_id', '')
+
+    @app.route('/logout')
+    def logout():
+        session.clear()
+        return 'ok'
+
+    return app.test_client()
+
+
+class TestChromaSessionInterface:
+    """Tests for the cached session backend"""
+
+    def test_login_writes_compact_json(self, client, ops):
+        """Test that a new session is stored once as JSON"""
+        client.get('/login/a@example.com')
+        assert ops.calls['save'] == 1
+        stored = next(iter(ops.sessions.values()))
+        assert json.loads(stored['data']) == {'user_id': 'a@example.com', '_permanent': True}
+        assert stored['user_id'] == 'a@example.com'
+
+    def test_reads_served_from_cache(self, client, ops):
+        """Test that unchanged requests neither read nor write the store"""
+        client.get('/login/a@example.com')
+        for _ in range(5):
+            assert client.get('/whoami').get_data(as_text=True) == 'a@example.com'
+        assert ops.calls == {'get': 0, 'save': 1, 'update': 0, 'delete': 0}
+        stats = client.application.session_interface.get_stats()
+        assert stats['cache_hits'] == 5 and stats['writes'] == 1
+
+    def test_cache_miss_reads_store(self, client, ops):
+        """Test that a session written elsewhere is loaded from the store once"""
+        client.get('/login/a@example.com')
+        client.application.session_interface._cache.clear()
+        client.get('/whoami')
+        client.get('/whoami')
+        assert ops.calls['get'] == 1
+
+    def test_same_value_skips_write(self, client, ops):
+        """Test that re-setting identical data does not write"""
+        client.get('/login/a@example.com')
+        client.get('/whoami')
+        client.get('/login/a@example.com')
+        assert ops.calls['save'] == 1 and ops.calls['update'] == 0
+        client.get('/login/b@example.com')
+        assert ops.calls['update'] == 1
+
+    def test_refreshes_expiry_when_near(self, client, ops):
+        """Test that the expiry is extended only once it is close"""
+        client.get('/login/a@example.com')
+        interface = client.application.session_interface
+        sid = next(iter(ops.sessions))
+        entry = interface._cache[sid]
+        interface._cache[sid] = entry._replace(expires=datetime.now() + timedelta(hours=1))
+
+        response = client.get('/whoami')
+        assert ops.calls['update'] == 1
+        assert 'test_session=' in response.headers.get('Set-Cookie', '')
+        assert datetime.fromisoformat(ops.sessions[sid]['expiration']) > datetime.now() + timedelta(days=6)
+
+    def test_logout_deletes(self, client, ops):
+        """Test that clearing the session removes it from store and cache"""
+        client.get('/login/a@example.com')
+        client.get('/logout')
+        assert ops.calls['delete'] == 1 and not ops.sessions
+        assert client.get('/whoami').get_data(as_text=True) == ''
+
+    def test_refresh_does_not_restore_deleted_session(self, client, ops):
+        """Test that a cached copy near expiry is not written back after another worker deleted it"""
+        client.get('/login/a@example.com')
+        interface = client.application.session_interface
+        sid = next(iter(ops.sessions))
+        interface._cache[sid] = interface._cache[sid]._replace(expires=datetime.now() + timedelta(hours=1))
+        ops.sessions.clear()
+
+        client.get('/whoami')
+        assert ops.calls == {'get': 0, 'save': 1, 'update': 1, 'delete': 0}
+        assert not ops.sessions
+
+    def test_unreadable_session_starts_fresh(self, client, ops):
+        """Test that an old hex-pickle payload yields a new empty session"""
+        ops.sessions['old'] = {
+            'id': 'old', 'user_id': 'a@example.com', 'created_at': '',
+            'expiration': (datetime.now() + timedelta(days=1)).isoformat(), 'data': '80049500'
+        }
+        client.set_cookie('test_session', 'old')
+        assert client.get('/whoami').get_data(as_text=True) == ''
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -7,6 +7,7 @@ import pytest
 import sys
 import os
 from datetime import datetime
+from collections.abc import Mapping
 from unittest.mock import Mock, patch, MagicMock
 
 # Add backend to path
@@ -141,6 +142,22 @@ class TestSessionOperationsLogic:
         
         assert 'user_id' in session_data
         assert 'created_at' in session_data
+    
+    def test_save_session_single_upsert(self):
+        """Test that saving a session is one upsert with no read or delete"""
+        from utils.chromadb_client import SessionOperations
+        
+        mock_client = Mock()
+        session_ops = SessionOperations(mock_client)
+        expiry = datetime(2030, 1, 1)
+        
+        assert session_ops.save_session('sid-1', 'user@example.com', expiry, '{"user_id":"user@example.com"}')
+        session_ops.collection.upsert.assert_called_once()
+        session_ops.collection.get.assert_not_called()
+        session_ops.collection.delete.assert_not_called()
+        metadata = session_ops.collection.upsert.call_args.kwargs['metadatas'][0]
+        assert metadata['expiration'] == expiry.isoformat()
+        assert metadata['data'] == '{"user_id":"user@example.com"}'
 
 
 class TestNutritionCacheLogic:
@@ -213,7 +230,7 @@ class TestDataLoaderIntegration:
         
         food_db = load_food_database()
         
-        assert isinstance(food_db, dict)
+        assert isinstance(food_db, Mapping)
         assert len(food_db) > 0
     
     def test_food_database_structure(self):
@@ -284,5 +301,95 @@ class TestErrorHandling:
         assert len(missing) > 0
 
 
+class TestClientFactory:
+    """Tests for the shared client, HTTP pooling, connect retries and cached collections"""
+    
+    CLOUD_ENV = {'CHROMA_API_KEY': 'key', 'CHROMA_TENANT': 'tenant', 'CHROMA_DATABASE': 'db',
+                 'CHROMA_USE_LOCAL': 'false', 'CHROMA_POOL_SIZE': '7', 'CHROMA_MAX_RETRIES': '2',
+                 'CHROMA_RETRY_BACKOFF_SECONDS': '0.01'}
+    
+    @staticmethod
+    def http_client():
+        """Stand-in for chromadb.HttpClient with a real requests.Session inside"""
+        import requests
+        client = Mock()
+        client._server._session = requests.Session()
+        return client
+    
+    def test_collection_handles_cached(self):
+        """Test that each collection costs one get_or_create round trip"""
+        from utils.chromadb_client import ChromaDBClient
+        
+        with patch.dict(os.environ, {'CHROMA_USE_LOCAL': 'true'}), \
+                patch('chromadb.PersistentClient') as persistent_client:
+            client = ChromaDBClient()
+            raw = persistent_client.return_value
+            calls_after_init = raw.get_or_create_collection.call_count
+            
+            first = client.collection('nutrition_cache')
+            second = client.collection('nutrition_cache')
+            client.collection('users')
+        
+        assert calls_after_init == len(ChromaDBClient.COLLECTIONS)
+        assert raw.get_or_create_collection.call_count == calls_after_init + 1
+        assert first is second
+        assert client.get_collection('users') is client.users_collection
+    
+    def test_http_session_pooled_with_retries(self):
+        """Test that the cloud client's session gets a sized pool and retry policy"""
+        from utils.chromadb_client import ChromaDBClient
+        
+        http_client = self.http_client()
+        with patch.dict(os.environ, self.CLOUD_ENV), \
+                patch('chromadb.HttpClient', return_value=http_client):
+            ChromaDBClient()
+        
+        adapter = http_client._server._session.get_adapter('https://api.trychroma.com')
+        assert adapter._pool_maxsize == 7
+        assert adapter.max_retries.total == 2
+        assert 503 in adapter.max_retries.status_forcelist
+    
+    def test_connect_retries_with_backoff(self):
+        """Test that a transient connect failure is retried instead of falling back to local"""
+        from utils.chromadb_client import ChromaDBClient
+        
+        http_client = self.http_client()
+        with patch.dict(os.environ, self.CLOUD_ENV), \
+                patch('chromadb.HttpClient', side_effect=[ConnectionError('reset'), http_client]) as connect, \
+                patch('chromadb.PersistentClient') as persistent_client, \
+                patch('utils.chromadb_client.time.sleep') as sleep:
+            client = ChromaDBClient()
+        
+        assert connect.call_count == 2
+        sleep.assert_called_once_with(0.01)
+        persistent_client.assert_not_called()
+        assert client.client is http_client
+    
+    def test_falls_back_to_local_after_retries(self):
+        """Test that local storage is used once every attempt has failed"""
+        from utils.chromadb_client import ChromaDBClient
+        
+        with patch.dict(os.environ, self.CLOUD_ENV), \
+                patch('chromadb.HttpClient', side_effect=ConnectionError('down')) as connect, \
+                patch('chromadb.PersistentClient'), \
+                patch('utils.chromadb_client.time.sleep'):
+            client = ChromaDBClient()
+        
+        assert connect.call_count == 3
+        assert client.database == 'local'
+    
+    def test_shared_client_created_once(self):
+        """Test that get_chroma_client returns one instance per process"""
+        from utils import chromadb_client
+        
+        with patch.object(chromadb_client, '_shared_client', None), \
+                patch.object(chromadb_client, 'ChromaDBClient') as factory:
+            first = chromadb_client.get_chroma_client()
+            second = chromadb_client.get_chroma_client()
+        
+        factory.assert_called_once_with()
+        assert first is second
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,173 @@
+"""
+Unit Tests for Food Catalog Module
+Tests the shared catalogue snapshot, atomic reload and parsers following the registry
+"""
+
+import pytest
+import sys
+import os
+import signal
+import threading
+import time
+from collections.abc import Mapping
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import utils.food_catalog as food_catalog
+from utils.food_catalog import FoodCatalog, CatalogRegistry, reload_on_signal
+from utils.food_parser import FoodParser
+
+
+FOODS = {
+    'chicken breast': {'calories': 165, 'protein': 31, 'carbs': 0, 'fat': 3.6, 'fiber': 0, 'category': 'protein'},
+    'brown rice': {'calories': 216, 'protein': 5, 'carbs': 45, 'fat': 1.8, 'fiber': 3.5, 'category': 'carbs'},
+    'apple': {'calories': 95, 'protein': 0.5, 'carbs': 25, 'fat': 0.3, 'fiber': 4.4, 'category': 'fruits'},
+}
+MORE_FOODS = dict(FOODS, **{
+    'mango lassi': {'calories': 180, 'protein': 5, 'carbs': 30, 'fat': 4, 'fiber': 1, 'category': 'dairy'},
+})
+
+
+class CountingLoader:
+    """Loader that records how often the catalogue is loaded"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def __call__(self, reload=False):
+        self.calls.append(reload)
+        return self.results[min(len(self.calls), len(self.results)) - 1]
+
+
+class TestFoodCatalog:
+    """Tests for the immutable snapshot"""
+
+    def test_indexes_built(self):
+        """Test that name, phrase and token indexes cover every food"""
+        catalog = FoodCatalog(FOODS)
+        assert catalog.names == ('chicken breast', 'brown rice', 'apple')
+        assert catalog.phrase_index['brown rice'] == 'brown rice'
+        assert catalog.token_index['rice'] == ['brown rice']
+        assert catalog.max_phrase_words == 2
+        assert [m.name for m in catalog.name_matcher.find_longest('some brown rice')] == ['brown rice']
+        assert catalog.fuzzy_index.get_close_matches('aple', n=1) == ['apple']
+
+    def test_category_codes(self):
+        """Test category codes line up with names and are read-only"""
+        catalog = FoodCatalog(FOODS)
+        categories = [catalog.category_names[code] for code in catalog.category_codes]
+        assert categories == ['protein', 'carbs', 'fruits']
+        with pytest.raises(ValueError):
+            catalog.category_codes[0] = 1
+
+
+class TestCatalogRegistry:
+    """Tests for loading once and swapping on reload"""
+
+    def test_loads_once(self):
+        """Test that concurrent first access loads a single catalogue"""
+        loader = CountingLoader(FOODS)
+        registry = CatalogRegistry(loader)
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(registry.current)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert loader.calls == [False]
+        assert all(catalog is seen[0] for catalog in seen)
+
+    def test_hands_out_read_only_foods(self):
+        """Test that dict sources are wrapped read-only"""
+        registry = CatalogRegistry(CountingLoader(dict(FOODS)))
+        foods = registry.current.foods
+        assert isinstance(foods, Mapping)
+        with pytest.raises(TypeError):
+            foods['pizza'] = {}
+
+    def test_reload_swaps_whole_catalog(self):
+        """Test that reload builds a new versioned catalogue and notifies listeners"""
+        loader = CountingLoader(FOODS, MORE_FOODS)
+        registry = CatalogRegistry(loader)
+        old = registry.current
+        notified = []
+        registry.subscribe(notified.append)
+        registry.subscribe(notified.append)
+
+        new = registry.reload()
+        assert loader.calls == [False, True]
+        assert new is registry.current and new is not old
+        assert (old.version, new.version) == (0, 1)
+        assert 'mango lassi' in new.foods and 'mango lassi' in new.phrase_index
+        assert 'mango lassi' not in old.foods and 'mango lassi' not in old.phrase_index
+        assert notified == [new]
+
+    def test_failing_listener_does_not_block_reload(self):
+        """Test that one bad listener does not stop the swap or other listeners"""
+        registry = CatalogRegistry(CountingLoader(FOODS))
+        notified = []
+        registry.subscribe(lambda catalog: 1 / 0)
+        registry.subscribe(notified.append)
+        catalog = registry.reload(MORE_FOODS)
+        assert registry.current is catalog
+        assert notified == [catalog]
+
+
+class TestParserFollowsRegistry:
+    """Tests for parsers sharing the registry's catalogue"""
+
+    def test_parsers_share_indexes(self):
+        """Test that two parsers on one registry use the same index objects"""
+        registry = CatalogRegistry(CountingLoader(FOODS))
+        first = FoodParser(registry, {}, {})
+        second = FoodParser(registry, {}, {})
+        assert first.name_matcher is second.name_matcher
+        assert first.fuzzy_index is second.fuzzy_index
+
+    def test_parser_sees_reload(self):
+        """Test that a parser picks up foods added by a reload"""
+        registry = CatalogRegistry(CountingLoader(FOODS))
+        parser = FoodParser(registry, {}, {})
+        assert 'mango lassi' not in parser.fuzzy_match_food('a mango lassi')
+
+        registry.reload(MORE_FOODS)
+        assert 'mango lassi' in parser.fuzzy_match_food('a mango lassi')
+        assert parser.parse_food_text('a mango lassi')[0]['nutrition']['calories'] == 180
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGUSR1'), reason='needs POSIX signals')
+class TestReloadSignal:
+    """Tests for the signal-triggered hot reload"""
+
+    def test_signal_swaps_catalog(self, monkeypatch):
+        """Test that the installed handler reloads the process-wide catalogue"""
+        registry = CatalogRegistry(CountingLoader(FOODS, MORE_FOODS))
+        monkeypatch.setattr(food_catalog, '_registry', registry)
+        assert registry.current.version == 0
+
+        previous = signal.getsignal(signal.SIGUSR1)
+        try:
+            assert reload_on_signal(signal.SIGUSR1)
+            os.kill(os.getpid(), signal.SIGUSR1)
+            deadline = time.monotonic() + 5
+            while registry.current.version == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+
+        assert registry.current.version == 1
+        assert 'mango lassi' in registry.current.foods
+
+    def test_not_installed_off_main_thread(self):
+        """Test that installing from a worker thread reports False instead of raising"""
+        installed = []
+        thread = threading.Thread(target=lambda: installed.append(reload_on_signal(signal.SIGUSR1)))
+        thread.start()
+        thread.join()
+        assert installed == [False]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
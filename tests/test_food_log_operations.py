@@ -0,0 +1,403 @@
+"""
+Unit Tests for Food Log Operations
+Runs FoodLogOperations against an in-memory ChromaDB to test daily rollups and queries
+"""
+
+import pytest
+import sys
+import os
+import json
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.chromadb_client import FoodLogOperations, MigrationOperations
+
+
+def nutrition(calories, protein=10):
+    return {'calories': calories, 'protein': protein, 'carbs': 20, 'fat': 5, 'fiber': 2}
+
+
+@pytest.fixture
+def food_log_ops(chroma_client):
+    return FoodLogOperations(chroma_client)
+
+
+def log_meal(food_log_ops, calories, user_id='user@example.com'):
+    return food_log_ops.create_log(user_id, 'lunch', [{'name': 'Rice'}], nutrition(calories), 'rice')
+
+
+def add_raw_log(collection, timestamp, calories=100, user_id='user@example.com',
+                time_keys=True, foods=None):
+    """Insert a log row directly with a chosen timestamp"""
+    metadata = {
+        'user_id': user_id,
+        'timestamp': timestamp.isoformat(),
+        'meal_type': 'lunch',
+        'foods': foods if foods is not None else json.dumps([{'name': 'Rice'}]),
+        'total_nutrition': json.dumps(nutrition(calories)),
+        'original_text': 'rice'
+    }
+    if time_keys:
+        metadata.update(FoodLogOperations._time_keys(timestamp))
+    log_id = str(uuid.uuid4())
+    collection.add(ids=[log_id], documents=['lunch: Rice'], metadatas=[metadata])
+    return log_id
+
+
+class TestDailyTotals:
+    """Tests for the materialized per-user daily rollup"""
+
+    def test_create_log_updates_total(self, food_log_ops):
+        """Test that each new log is added to today's total"""
+        log_meal(food_log_ops, 300)
+        log_meal(food_log_ops, 450)
+
+        total = food_log_ops.get_daily_total('user@example.com')
+        assert total['calories'] == 750
+        assert total['protein'] == 20
+        assert total['log_count'] == 2
+
+    def test_delete_log_subtracts(self, food_log_ops):
+        """Test that deleting a log removes it from the total"""
+        first = log_meal(food_log_ops, 300)
+        log_meal(food_log_ops, 450)
+
+        assert food_log_ops.delete_log(first['_id'], 'user@example.com')
+        total = food_log_ops.get_daily_total('user@example.com')
+        assert total['calories'] == 450
+        assert total['log_count'] == 1
+
+    def test_delete_by_other_user_ignored(self, food_log_ops):
+        """Test that a foreign delete changes neither the log nor the total"""
+        log = log_meal(food_log_ops, 300)
+        assert not food_log_ops.delete_log(log['_id'], 'someone@example.com')
+        assert food_log_ops.get_daily_total('user@example.com')['calories'] == 300
+
+    def test_matches_resummed_logs(self, food_log_ops):
+        """Test that the rollup equals summing today's logs"""
+        for calories in [120, 250.5, 310.2]:
+            log_meal(food_log_ops, calories)
+        logs = food_log_ops.get_today_logs('user@example.com')
+        total = food_log_ops.get_daily_total('user@example.com')
+        assert total['calories'] == round(sum(l['total_nutrition']['calories'] for l in logs), 1)
+
+    def test_users_kept_separate(self, food_log_ops):
+        """Test that totals are per user"""
+        log_meal(food_log_ops, 300, user_id='a@example.com')
+        log_meal(food_log_ops, 500, user_id='b@example.com')
+        assert food_log_ops.get_daily_total('a@example.com')['calories'] == 300
+        assert food_log_ops.get_daily_total('b@example.com')['calories'] == 500
+
+    def test_missing_rollup_rebuilt_from_logs(self, food_log_ops, chroma_client):
+        """Test that days logged before rollups existed are backfilled on read"""
+        log_meal(food_log_ops, 300)
+        log_meal(food_log_ops, 200)
+        chroma_client.daily_totals_collection.delete(
+            ids=[FoodLogOperations._daily_total_id('user@example.com', datetime.now().date().isoformat())]
+        )
+
+        assert food_log_ops.get_daily_total('user@example.com')['calories'] == 500
+        log_meal(food_log_ops, 100)
+        assert food_log_ops.get_daily_total('user@example.com')['calories'] == 600
+
+    def test_stale_rollup_corrected_by_next_write(self, food_log_ops, chroma_client):
+        """Test that a rollup clobbered by another worker is recomputed on the next write"""
+        log_meal(food_log_ops, 300)
+        other_worker = FoodLogOperations(chroma_client)
+        log_meal(other_worker, 200)
+        # Lost update: a stale writer puts back the one-log total
+        day = datetime.now().date().isoformat()
+        bucket = food_log_ops._empty_bucket()
+        bucket.update(calories=300.0, log_count=1)
+        food_log_ops._store_daily_totals('user@example.com', {day: bucket})
+
+        log_meal(food_log_ops, 100)
+        total = food_log_ops.get_daily_total('user@example.com')
+        assert total['calories'] == 600
+        assert total['log_count'] == 3
+
+    def test_rollup_checked_after_write(self, food_log_ops, chroma_client, monkeypatch):
+        """Test that a rollup computed before another worker's log landed is recomputed"""
+        compute = food_log_ops._compute_daily_totals
+        raced = []
+
+        def racing_compute(user_id, days):
+            buckets = compute(user_id, days)
+            if not raced:
+                # Another worker's log lands between our read and our upsert
+                raced.append(add_raw_log(chroma_client.food_logs_collection, datetime.now(), calories=500))
+            return buckets
+
+        monkeypatch.setattr(food_log_ops, '_compute_daily_totals', racing_compute)
+        log_meal(food_log_ops, 300)
+
+        stored = chroma_client.daily_totals_collection.get(
+            ids=[FoodLogOperations._daily_total_id('user@example.com', datetime.now().date().isoformat())]
+        )['metadatas'][0]
+        assert stored['log_count'] == 2
+        assert stored['calories'] == 800
+
+    def test_rollup_dropped_when_never_consistent(self, food_log_ops, chroma_client, monkeypatch):
+        """Test that a rollup that keeps losing the race is dropped for the next read to rebuild"""
+        compute = food_log_ops._compute_daily_totals
+
+        def racing_compute(user_id, days):
+            buckets = compute(user_id, days)
+            add_raw_log(chroma_client.food_logs_collection, datetime.now(), calories=10)
+            return buckets
+
+        monkeypatch.setattr(food_log_ops, '_compute_daily_totals', racing_compute)
+        log_meal(food_log_ops, 300)
+
+        assert chroma_client.daily_totals_collection.get(include=[])['ids'] == []
+        monkeypatch.undo()
+        assert food_log_ops.get_daily_total('user@example.com')['log_count'] == 4
+
+    def test_create_logs_single_add(self, food_log_ops, chroma_client):
+        """Test that a batch is stored with one add and lands in each day's rollup"""
+        yesterday = datetime.now() - timedelta(days=1)
+        entries = [
+            {'meal_type': 'lunch', 'foods': [{'name': 'Rice'}], 'total_nutrition': nutrition(300),
+             'original_text': 'rice', 'timestamp': yesterday},
+            {'meal_type': 'dinner', 'foods': [{'name': 'Rice'}], 'total_nutrition': nutrition(200),
+             'original_text': 'rice', 'timestamp': yesterday},
+            {'meal_type': 'snack', 'foods': [{'name': 'Apple'}], 'total_nutrition': nutrition(100),
+             'original_text': 'apple'},
+        ]
+        log_meal(food_log_ops, 50)
+        food_log_ops.collection = Mock(wraps=chroma_client.food_logs_collection)
+        
+        logs = food_log_ops.create_logs('user@example.com', entries)
+        
+        food_log_ops.collection.add.assert_called_once()
+        assert len(food_log_ops.collection.add.call_args.kwargs['ids']) == 3
+        assert [log['timestamp'] for log in logs[:2]] == [yesterday.isoformat()] * 2
+        assert food_log_ops.get_daily_total('user@example.com', yesterday)['calories'] == 500
+        assert food_log_ops.get_daily_total('user@example.com')['calories'] == 150
+        assert food_log_ops.get_daily_total('user@example.com')['log_count'] == 2
+    
+    def test_empty_day(self, food_log_ops):
+        """Test a day with no logs"""
+        total = food_log_ops.get_daily_total('user@example.com', datetime.now() - timedelta(days=3))
+        assert total['calories'] == 0
+        assert total['log_count'] == 0
+
+
+class TestRangeQueries:
+    """Tests for date filters pushed down to ChromaDB"""
+
+    @pytest.fixture
+    def history(self, chroma_client):
+        """Logs at noon on each of the last 10 days"""
+        noon = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        for days_ago in range(10):
+            add_raw_log(chroma_client.food_logs_collection, noon - timedelta(days=days_ago), calories=days_ago)
+        return noon
+
+    def test_range_filter(self, food_log_ops, history):
+        """Test that only logs inside the window are returned"""
+        logs = food_log_ops.get_user_logs('user@example.com',
+                                          start_date=history - timedelta(days=3, hours=1),
+                                          end_date=history - timedelta(days=1))
+        assert [l['total_nutrition']['calories'] for l in logs] == [1, 2, 3]
+
+    def test_where_clause_pushes_down_dates(self, food_log_ops, history):
+        """Test that date bounds become $gte/$lte predicates"""
+        calls = []
+        original_get = food_log_ops.collection.get
+
+        def spy(**kwargs):
+            calls.append(kwargs)
+            return original_get(**kwargs)
+
+        food_log_ops.collection = SimpleNamespace(get=spy)
+        food_log_ops.get_recent_logs('user@example.com', days=2)
+
+        conditions = calls[0]['where']['$and']
+        assert {'user_id': 'user@example.com'} in conditions
+        assert any('$gte' in c.get('timestamp_epoch', {}) for c in conditions)
+        assert calls[0]['include'] == ['metadatas']
+
+    def test_limit_keeps_newest(self, food_log_ops, history):
+        """Test that limit returns the newest logs first"""
+        logs = food_log_ops.get_user_logs('user@example.com', limit=3)
+        assert [l['total_nutrition']['calories'] for l in logs] == [0, 1, 2]
+
+    def test_only_returned_rows_decoded(self, food_log_ops, chroma_client, history):
+        """Test that rows cut by the limit are never JSON-decoded"""
+        add_raw_log(chroma_client.food_logs_collection, history - timedelta(days=30), foods='not json')
+        logs = food_log_ops.get_user_logs('user@example.com', limit=5)
+        assert len(logs) == 5
+
+    def test_backfill_makes_legacy_rows_visible(self, food_log_ops, chroma_client, history):
+        """Test that logs written without time keys are found after backfill"""
+        add_raw_log(chroma_client.food_logs_collection, history, calories=999, time_keys=False)
+        window = {'start_date': history - timedelta(hours=1), 'end_date': history + timedelta(hours=1)}
+
+        assert [l['total_nutrition']['calories'] for l in food_log_ops.get_user_logs('user@example.com', **window)] == [0]
+        assert food_log_ops.backfill_timestamps(batch_size=4) == 1
+        calories = sorted(l['total_nutrition']['calories'] for l in food_log_ops.get_user_logs('user@example.com', **window))
+        assert calories == [0, 999]
+        assert food_log_ops.backfill_timestamps() == 0
+
+    def test_backfill_runs_once(self, food_log_ops, chroma_client, history):
+        """Test that the startup backfill is skipped once its marker is stored"""
+        migrations = MigrationOperations(chroma_client)
+        add_raw_log(chroma_client.food_logs_collection, history, time_keys=False)
+        assert migrations.run_once('food_log_time_keys', food_log_ops.backfill_timestamps) == 1
+
+        food_log_ops.collection = Mock(wraps=chroma_client.food_logs_collection)
+        assert migrations.run_once('food_log_time_keys', food_log_ops.backfill_timestamps) is None
+        food_log_ops.collection.get.assert_not_called()
+
+    def test_failed_backfill_is_retried(self, food_log_ops, chroma_client, history):
+        """Test that no marker is stored when the backfill stops on an error"""
+        migrations = MigrationOperations(chroma_client)
+        food_log_ops.collection = Mock(get=Mock(side_effect=RuntimeError('offline')))
+
+        assert migrations.run_once('food_log_time_keys', food_log_ops.backfill_timestamps) is None
+        assert not migrations.is_done('food_log_time_keys')
+
+
+class TestLogPages:
+    """Tests for cursor pagination"""
+
+    @pytest.fixture
+    def history(self, chroma_client):
+        """Three logs a day over 40 days (the first day has two at the same second), oldest calories first"""
+        noon = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        calories = 0
+        for days_ago in range(39, -1, -1):
+            for hours in (-4, 0, 6):
+                add_raw_log(chroma_client.food_logs_collection,
+                            noon - timedelta(days=days_ago) + timedelta(hours=hours), calories=calories)
+                calories += 1
+        add_raw_log(chroma_client.food_logs_collection, noon - timedelta(days=39), calories=calories)
+        # Reading the range stores the rollups of days that have logs
+        FoodLogOperations(chroma_client).get_daily_buckets('user@example.com', noon - timedelta(days=39), noon)
+        return noon
+
+    def read_all(self, food_log_ops, limit, **kwargs):
+        pages, cursor = [], None
+        while True:
+            page = food_log_ops.get_logs_page('user@example.com', limit=limit, cursor=cursor, **kwargs)
+            pages.append(page['logs'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_history_once(self, food_log_ops, history):
+        """Test that following cursors returns every log once, newest first"""
+        pages = self.read_all(food_log_ops, limit=7)
+        logs = [log for page in pages for log in page]
+
+        assert all(len(page) == 7 for page in pages[:-1])
+        assert len(logs) == 121
+        assert len({log['_id'] for log in logs}) == 121
+        timestamps = [log['timestamp'] for log in logs]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+    def test_reads_are_bounded(self, food_log_ops, chroma_client, history):
+        """Test that a page reads about limit + two days of logs in one query and writes nothing"""
+        returned, writes = [], []
+        original_get = chroma_client.food_logs_collection.get
+
+        def spy(**kwargs):
+            results = original_get(**kwargs)
+            returned.append(len(results['ids']))
+            return results
+
+        food_log_ops.collection = SimpleNamespace(get=spy)
+        food_log_ops.daily_totals_collection = SimpleNamespace(
+            get=chroma_client.daily_totals_collection.get,
+            upsert=lambda **kwargs: writes.append(kwargs)
+        )
+        pages = self.read_all(food_log_ops, limit=5)
+
+        assert len(pages) == 25
+        assert len(returned) == 25
+        assert max(returned) <= 5 + 1 + 2 * 4
+        assert writes == []
+
+    def test_missing_rollups_still_page_everything(self, food_log_ops, chroma_client, history):
+        """Test that days without a stored rollup are still paged, just with wider reads"""
+        rollups = chroma_client.daily_totals_collection
+        rollups.delete(ids=rollups.get(include=[])['ids'][::2])
+
+        logs = [log for page in self.read_all(food_log_ops, limit=7) for log in page]
+        assert len({log['_id'] for log in logs}) == 121
+
+    def test_overcounted_rollup_still_pages_everything(self, food_log_ops, chroma_client, history):
+        """Test that a rollup whose log_count is too high does not end the history early"""
+        rollups = chroma_client.daily_totals_collection
+        today = food_log_ops._daily_total_id('user@example.com', history.date().isoformat())
+        rollups.update(ids=[today], metadatas=[{'log_count': 1000}])
+
+        logs = [log for page in self.read_all(food_log_ops, limit=7) for log in page]
+        assert len({log['_id'] for log in logs}) == 121
+
+    def test_rollups_read_in_windows(self, food_log_ops, chroma_client, history):
+        """Test that sizing a page reads only the rollups of the window it needs"""
+        returned = []
+        original_get = chroma_client.daily_totals_collection.get
+
+        def spy(**kwargs):
+            results = original_get(**kwargs)
+            returned.append(len(results['ids']))
+            return results
+
+        food_log_ops.PAGE_WINDOW_DAYS = 4
+        food_log_ops.daily_totals_collection = SimpleNamespace(get=spy)
+        food_log_ops.get_logs_page('user@example.com', limit=5)
+        assert returned == [4]
+
+    def test_sparse_history_paged(self, food_log_ops):
+        """Test that logs months apart are found by the widening windows"""
+        noon = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        food_log_ops.PAGE_WINDOW_DAYS = 4
+        food_log_ops.create_logs('user@example.com', [
+            {'meal_type': 'lunch', 'foods': [{'name': 'Rice'}], 'total_nutrition': nutrition(days_ago),
+             'original_text': 'rice', 'timestamp': noon - timedelta(days=days_ago)}
+            for days_ago in (0, 90, 400)
+        ])
+
+        pages = self.read_all(food_log_ops, limit=1)
+        assert [log['total_nutrition']['calories'] for page in pages for log in page] == [0, 90, 400]
+
+    def test_page_size_capped(self, food_log_ops, history):
+        """Test that limit is capped at MAX_PAGE_SIZE"""
+        food_log_ops.MAX_PAGE_SIZE = 10
+        page = food_log_ops.get_logs_page('user@example.com', limit=1000)
+        assert len(page['logs']) == 10
+        assert page['next_cursor']
+
+    def test_start_date_bounds_pages(self, food_log_ops, history):
+        """Test that pages stop at start_date"""
+        start = (history - timedelta(days=2)).replace(hour=0)
+        logs = [log for page in self.read_all(food_log_ops, limit=4, start_date=start) for log in page]
+        assert len(logs) == 9
+        assert min(log['timestamp'] for log in logs) >= start.isoformat()
+
+    def test_invalid_cursor(self, food_log_ops, history):
+        """Test that a malformed cursor raises ValueError"""
+        with pytest.raises(ValueError):
+            food_log_ops.get_logs_page('user@example.com', cursor='not-a-cursor')
+
+    @pytest.mark.parametrize('epoch', [1e20, -1e20, float('inf'), float('nan')])
+    def test_out_of_range_cursor(self, food_log_ops, epoch):
+        """Test that a cursor whose epoch is not a valid time raises ValueError"""
+        with pytest.raises(ValueError):
+            food_log_ops.get_logs_page('user@example.com', cursor=FoodLogOperations.encode_cursor(epoch, 'x'))
+
+    def test_empty_history(self, food_log_ops):
+        """Test that a user without logs gets an empty last page"""
+        assert food_log_ops.get_logs_page('nobody@example.com') == {'logs': [], 'next_cursor': None}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
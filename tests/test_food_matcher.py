@@ -0,0 +1,101 @@
+"""
+Unit Tests for Food Name Matcher Module
+Tests single-pass multi-pattern detection, match spans, and longest-match preference
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.food_matcher import FoodNameMatcher, FoodMatch
+
+
+TEST_FOOD_NAMES = [
+    'chicken breast', 'grilled chicken', 'chicken', 'banana', 'apple',
+    'rice', 'brown rice', 'egg', 'eggs', 'greek yogurt', 'yogurt',
+]
+
+
+@pytest.fixture
+def matcher():
+    """Create a FoodNameMatcher instance for testing"""
+    return FoodNameMatcher(TEST_FOOD_NAMES)
+
+
+class TestFindAll:
+    """Tests for overlapping match detection"""
+
+    def test_single_food(self, matcher):
+        """Test a single food name is found with its span"""
+        assert matcher.find_all("a banana") == [FoodMatch('banana', 2, 8)]
+
+    def test_overlapping_matches(self, matcher):
+        """Test that nested names are all reported"""
+        names = {m.name for m in matcher.find_all("chicken breast")}
+        assert names == {'chicken breast', 'chicken'}
+
+    def test_case_insensitive(self, matcher):
+        """Test that matching ignores case"""
+        assert [m.name for m in matcher.find_all("APPLE")] == ['apple']
+
+    def test_requires_word_start(self, matcher):
+        """Test that names inside other words are ignored"""
+        assert matcher.find_all("the price is right") == []
+
+    def test_plural_suffix_allowed(self, matcher):
+        """Test that names followed by a plural suffix still match"""
+        assert 'banana' in {m.name for m in matcher.find_all("two bananas")}
+
+    def test_empty_text(self, matcher):
+        """Test scanning empty text"""
+        assert matcher.find_all("") == []
+
+
+class TestFindLongest:
+    """Tests for longest-match selection"""
+
+    def test_longest_match_wins(self, matcher):
+        """Test that 'chicken breast' wins over 'chicken'"""
+        assert [m.name for m in matcher.find_longest("I had chicken breast")] == ['chicken breast']
+
+    def test_multiple_foods_in_order(self, matcher):
+        """Test that several foods are returned left to right"""
+        matches = matcher.find_longest("brown rice with greek yogurt and an apple")
+        assert [m.name for m in matches] == ['brown rice', 'greek yogurt', 'apple']
+
+    def test_spans_index_into_text(self, matcher):
+        """Test that spans point at the matched text"""
+        text = "eggs and rice"
+        for match in matcher.find_longest(text):
+            assert text[match.start:match.end] == match.name
+
+    def test_find_names_deduplicates(self, matcher):
+        """Test that repeated foods are reported once"""
+        assert matcher.find_names("rice, more rice and apple") == ['rice', 'apple']
+
+
+class TestMatcherConstruction:
+    """Tests for building the automaton"""
+
+    def test_size_counts_unique_names(self):
+        """Test that duplicate and empty names are ignored"""
+        matcher = FoodNameMatcher(['rice', 'rice', '', 'Rice'])
+        assert matcher.size == 1
+
+    def test_accepts_dict_keys(self):
+        """Test building from a food database dict"""
+        matcher = FoodNameMatcher({'banana': {}, 'apple': {}})
+        assert matcher.find_names("apple banana") == ['apple', 'banana']
+
+    def test_large_pattern_set(self):
+        """Test that a large catalogue still finds the right names"""
+        names = TEST_FOOD_NAMES + [f'dish number {i}' for i in range(20000)]
+        matcher = FoodNameMatcher(names)
+        assert matcher.find_names("dish number 123 and grilled chicken") == ['dish number 123', 'grilled chicken']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
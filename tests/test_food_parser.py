@@ -173,7 +173,53 @@ class TestFuzzyMatching:
         matches = food_parser.fuzzy_match_food("xyz123 nonsense food")
         # Should return empty or not match 'banana' etc
         assert 'banana' not in matches
+    
+    def test_plural_match(self, food_parser):
+        """Test that plural forms match the singular food name"""
+        matches = food_parser.fuzzy_match_food("2 bananas and some apples")
+        assert 'banana' in matches
+        assert 'apple' in matches
+    
+    def test_no_match_inside_other_words(self, food_parser):
+        """Test that food names hidden inside other words are ignored"""
+        matches = food_parser.fuzzy_match_food("the price was fair")
+        assert 'rice' not in matches
+    
+    def test_results_follow_database_order(self, food_parser):
+        """Test that matches are returned in food database order"""
+        matches = food_parser.fuzzy_match_food("apple and chicken breast")
+        order = list(TEST_FOOD_DATABASE.keys())
+        assert matches == sorted(matches, key=order.index)
+
 
+class TestNameIndex:
+    """Tests for the precompiled food name index"""
+    
+    def test_index_built_on_construction(self, food_parser):
+        """Test that every food name is reachable through the token index"""
+        for food_name in TEST_FOOD_DATABASE:
+            for word in food_name.split():
+                assert food_name in food_parser._token_index[word]
+    
+    def test_rebuild_after_database_change(self, food_parser):
+        """Test that new foods are found once the index is rebuilt"""
+        food_parser.food_database = dict(TEST_FOOD_DATABASE)
+        food_parser.food_database['mango lassi'] = {
+            'calories': 180, 'protein': 5, 'carbs': 30, 'fat': 4, 'fiber': 1, 'category': 'dairy'
+        }
+        assert 'mango lassi' not in food_parser.fuzzy_match_food("a mango lassi")
+        food_parser.build_name_index()
+        assert 'mango lassi' in food_parser.fuzzy_match_food("a mango lassi")
+    
+    def test_large_database_lookup(self):
+        """Test that matching works against a large catalogue"""
+        large_db = dict(TEST_FOOD_DATABASE)
+        for i in range(50000):
+            large_db[f'food item {i}'] = {'calories': 1, 'protein': 0, 'carbs': 0, 'fat': 0, 'fiber': 0, 'category': 'mixed'}
+        parser = FoodParser(large_db, TEST_PORTION_PATTERNS, TEST_PORTION_SIZES)
+        matches = parser.fuzzy_match_food("grilled chicken with brown rice")
+        assert 'grilled chicken' in matches
+        assert 'brown rice' in matches
 
 class TestGenericTermClarification:
     """Tests for generic term detection and clarification"""
@@ -234,6 +280,42 @@ class TestFoodTextParsing:
         assert isinstance(result, list)
 
 
+class FakeGeminiLookup:
+    """Records batch lookups and answers every name with a fixed meal"""
+
+    def __init__(self):
+        self.batches = []
+
+    def get_nutrition_batch(self, food_names, portion_text="1 serving"):
+        self.batches.append((list(food_names), portion_text))
+        return {
+            name: {'name': name.title(), 'calories': 100, 'protein': 5, 'carbs': 10, 'fat': 2,
+                   'fiber': 1, 'category': 'mixed', 'confidence': 0.9}
+            for name in food_names
+        }
+
+
+class TestBatchParsing:
+    """Tests for parsing many texts in one pass"""
+    
+    def test_matches_single_text_parsing(self, food_parser):
+        """Test that batch results equal parsing each text on its own"""
+        texts = ["banana", "2 cups brown rice", "I had grilled chicken with brown rice", "a soda", ""]
+        assert food_parser.parse_food_texts(texts) == [food_parser.parse_food_text(t) for t in texts]
+    
+    def test_one_gemini_request_per_portion(self):
+        """Test that unknown foods from many texts share Gemini batch requests"""
+        gemini = FakeGeminiLookup()
+        parser = FoodParser(TEST_FOOD_DATABASE, TEST_PORTION_PATTERNS, TEST_PORTION_SIZES,
+                            gemini_lookup=gemini)
+        results = parser.parse_food_texts(["jollof stew", "fufu and jollof stew", "large moi moi", "banana"])
+        
+        assert sorted(gemini.batches) == [(['jollof stew', 'fufu'], '1 serving'), (['large moi moi'], 'large')]
+        assert [food['name'] for food in results[1]] == ['Fufu', 'Jollof Stew']
+        assert results[2][0]['nutrition']['calories'] == 150
+        assert results[3][0]['source'] == 'static'
+
+
 class TestEdgeCases:
     """Tests for edge cases and error handling"""
     
@@ -0,0 +1,125 @@
+"""
+Unit Tests for Food Table Module
+Tests the compiled memory-mapped food database against its JSON sources
+"""
+
+import pytest
+import sys
+import os
+import json
+from collections.abc import Mapping
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.food_table import FoodTable, compile_food_table, MAGIC
+from utils.data_loader import get_data_path, load_json, FOOD_DATABASE_SOURCES
+
+
+BASE = {
+    'chicken breast': {'calories': 165, 'protein': 31, 'carbs': 0, 'fat': 3.6, 'fiber': 0, 'category': 'protein'},
+    'apple': {'calories': 95, 'protein': 0.5, 'carbs': 25, 'fat': 0.3, 'fiber': 4.4, 'category': 'fruits'},
+    'crème brûlée': {'calories': 330, 'protein': 5, 'carbs': 30, 'fat': 21.5, 'fiber': 0, 'category': 'treats'},
+}
+EXTENDED = {
+    'apple': {'calories': 100, 'protein': 0.5, 'carbs': 25, 'fat': 0.3, 'fiber': 4.4, 'category': 'fruits'},
+    'pizza': {'calories': 285, 'protein': 12, 'carbs': 36, 'fat': 10, 'fiber': 2.5, 'category': 'fast_food'},
+}
+
+
+@pytest.fixture
+def table(tmp_path):
+    sources = []
+    for name, foods in [('base.json', BASE), ('extended.json', EXTENDED)]:
+        path = tmp_path / name
+        path.write_text(json.dumps(foods), encoding='utf-8')
+        sources.append(str(path))
+    output = str(tmp_path / 'foods.bin')
+    compile_food_table(sources, output)
+    table = FoodTable(output)
+    yield table
+    table.close()
+
+
+class TestFoodTable:
+    """Tests for compiling and reading the table"""
+
+    def test_mapping_interface(self, table):
+        """Test length, membership and iteration"""
+        assert isinstance(table, Mapping)
+        assert len(table) == 4
+        assert 'pizza' in table
+        assert 'Pizza' not in table
+        assert 42 not in table
+        assert set(table) == {'chicken breast', 'apple', 'crème brûlée', 'pizza'}
+
+    def test_values_round_trip(self, table):
+        """Test that float32 storage gives back the JSON numbers and category"""
+        assert table['chicken breast'] == BASE['chicken breast']
+        assert table['crème brûlée'] == BASE['crème brûlée']
+        assert type(table['chicken breast']['calories']) is int
+
+    def test_later_source_wins(self, table):
+        """Test that the extended file overrides the base file"""
+        assert table['apple']['calories'] == 100
+
+    def test_missing_key(self, table):
+        """Test KeyError and get() default"""
+        with pytest.raises(KeyError):
+            table['tofu']
+        assert table.get('tofu') is None
+
+    def test_rows_are_copies(self, table):
+        """Test that modifying a returned row does not affect the table"""
+        row = table['pizza']
+        row['calories'] = 0
+        assert table['pizza']['calories'] == 285
+
+    def test_columns(self, table):
+        """Test the vectorized column views"""
+        names = list(table)
+        calories = table.column('calories')
+        assert calories.dtype.name == 'float32'
+        assert dict(zip(names, calories.tolist()))['pizza'] == 285
+        categories = [table.category_names[code] for code in table.category_codes]
+        assert dict(zip(names, categories))['apple'] == 'fruits'
+
+    def test_rows_keep_source_order(self, table):
+        """Test that iteration follows the merged JSON, not the sorted lookup index"""
+        merged = dict(BASE)
+        merged.update(EXTENDED)
+        assert list(table) == list(merged)
+        assert list(table.column('calories')) == [merged[name]['calories'] for name in merged]
+
+    def test_too_many_categories(self, tmp_path):
+        """Test that more categories than a uint8 code can hold are refused"""
+        path = tmp_path / 'foods.json'
+        path.write_text(json.dumps({f"food {i}": {'calories': i, 'category': f"c{i}"} for i in range(256)}),
+                        encoding='utf-8')
+        with pytest.raises(ValueError):
+            compile_food_table([str(path)], str(tmp_path / 'foods.bin'))
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test that a file without the header is refused"""
+        path = tmp_path / 'foods.bin'
+        path.write_bytes(b'NOPE' + b'\0' * 64)
+        with pytest.raises(ValueError):
+            FoodTable(str(path))
+        assert MAGIC != b'NOPE'
+
+    def test_real_database(self, tmp_path):
+        """Test the shipped JSON files compile to the same foods"""
+        sources = [get_data_path(name) for name in FOOD_DATABASE_SOURCES]
+        expected = {}
+        for path in sources:
+            expected.update(load_json(path))
+
+        output = str(tmp_path / 'foods.bin')
+        assert compile_food_table(sources, output) == len(expected)
+        table = FoodTable(output)
+        assert list(table.items()) == list(expected.items())
+        table.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
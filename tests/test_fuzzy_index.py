@@ -0,0 +1,78 @@
+"""
+Unit Tests for Fuzzy Food Index Module
+Tests typo-tolerant lookup and parity with difflib.get_close_matches
+"""
+
+import pytest
+import sys
+import os
+from difflib import get_close_matches
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.fuzzy_index import FuzzyFoodIndex
+from utils.data_loader import load_food_database
+
+
+@pytest.fixture(scope='module')
+def food_names():
+    """Food names from the real database"""
+    return list(load_food_database().keys())
+
+
+@pytest.fixture(scope='module')
+def fuzzy_index(food_names):
+    """Create a FuzzyFoodIndex over the real database"""
+    return FuzzyFoodIndex(food_names)
+
+
+class TestCloseMatches:
+    """Tests for typo-tolerant lookup"""
+
+    @pytest.mark.parametrize('typo', ['chiken', 'bananna', 'brocoli', 'klae', 'salmn', 'piza'])
+    def test_matches_difflib(self, fuzzy_index, food_names, typo):
+        """Test that suggestions and ranking match difflib for common typos"""
+        expected = get_close_matches(typo, food_names, n=3, cutoff=0.6)
+        assert fuzzy_index.get_close_matches(typo, n=3, cutoff=0.6) == expected
+
+    def test_best_match_first(self, fuzzy_index):
+        """Test that the closest name is ranked first"""
+        assert fuzzy_index.get_close_matches('chiken breast')[0] == 'chicken breast'
+
+    def test_respects_n(self, fuzzy_index):
+        """Test that at most n suggestions are returned"""
+        assert len(fuzzy_index.get_close_matches('chicken', n=1)) == 1
+
+    def test_no_match_below_cutoff(self, fuzzy_index):
+        """Test that unrelated text returns nothing"""
+        assert fuzzy_index.get_close_matches('xyzzy qwerty') == []
+
+    def test_empty_word(self, fuzzy_index):
+        """Test that an empty lookup returns nothing"""
+        assert fuzzy_index.get_close_matches('') == []
+
+    def test_invalid_arguments(self, fuzzy_index):
+        """Test that invalid n and cutoff raise like difflib"""
+        with pytest.raises(ValueError):
+            fuzzy_index.get_close_matches('rice', n=0)
+        with pytest.raises(ValueError):
+            fuzzy_index.get_close_matches('rice', cutoff=1.5)
+
+
+class TestIndexConstruction:
+    """Tests for building the index"""
+
+    def test_duplicates_ignored(self):
+        """Test that duplicate names are indexed once"""
+        index = FuzzyFoodIndex(['rice', 'rice', 'beans'])
+        assert len(index) == 2
+
+    def test_accepts_dict_keys(self):
+        """Test building from a food database dict"""
+        index = FuzzyFoodIndex({'banana': {}, 'apple': {}})
+        assert index.get_close_matches('banan') == ['banana']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
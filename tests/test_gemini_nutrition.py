@@ -0,0 +1,139 @@
+"""
+Unit Tests for Gemini Nutrition Lookup Module
+Tests batched lookups and per-item fallback against a local fake model
+"""
+
+import pytest
+import sys
+import os
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.gemini_nutrition import GeminiNutritionLookup
+from utils.food_parser import FoodParser
+
+
+def nutrition(name, calories):
+    """Build a complete nutrition entry as Gemini would return it"""
+    return {'name': name, 'calories': calories, 'protein': 10, 'carbs': 20,
+            'fat': 5, 'fiber': 2, 'category': 'mixed', 'confidence': 0.9}
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel, replaying canned responses"""
+
+    def __init__(self, batch_response, single_responses=None):
+        self.batch_response = batch_response
+        self.single_responses = single_responses or {}
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        if 'Foods:\n' in prompt:
+            return SimpleNamespace(text=self.batch_response)
+        for food_name, payload in self.single_responses.items():
+            if f"Food: {food_name}\n" in prompt:
+                return SimpleNamespace(text=json.dumps(payload))
+        return SimpleNamespace(text='not json')
+
+
+class TestNutritionBatch:
+    """Tests for get_nutrition_batch()"""
+
+    def test_single_request_for_many_foods(self):
+        """Test that several foods are resolved with one model call"""
+        model = FakeModel('```json\n' + json.dumps([
+            dict(nutrition('Haleem', 350), query='haleem'),
+            dict(nutrition('Nihari', 500), query='nihari'),
+        ]) + '\n```')
+        lookup = GeminiNutritionLookup(model=model)
+
+        results = lookup.get_nutrition_batch(['haleem', 'nihari'])
+
+        assert len(model.prompts) == 1
+        assert results['haleem']['calories'] == 350
+        assert results['nihari']['source'] == 'gemini'
+        assert 'query' not in results['nihari']
+
+    def test_matches_by_query_not_position(self):
+        """Test that reordered answers are mapped back by their query"""
+        model = FakeModel(json.dumps([
+            dict(nutrition('Nihari', 500), query='Nihari'),
+            dict(nutrition('Haleem', 350), query='haleem'),
+        ]))
+        results = GeminiNutritionLookup(model=model).get_nutrition_batch(['haleem', 'nihari'])
+        assert results['haleem']['name'] == 'Haleem'
+        assert results['nihari']['name'] == 'Nihari'
+
+    def test_invalid_entry_retried_individually(self):
+        """Test that only entries failing validation fall back to single lookups"""
+        model = FakeModel(
+            json.dumps([
+                dict(nutrition('Haleem', 350), query='haleem'),
+                {'query': 'nihari', 'name': 'Nihari', 'calories': 500},
+            ]),
+            single_responses={'nihari': nutrition('Nihari', 510)}
+        )
+        results = GeminiNutritionLookup(model=model).get_nutrition_batch(['haleem', 'nihari'])
+
+        assert len(model.prompts) == 2
+        assert 'Food: nihari\n' in model.prompts[1]
+        assert results['nihari']['calories'] == 510
+
+    def test_unparseable_batch_falls_back(self):
+        """Test that a broken batch response retries every food"""
+        model = FakeModel('sorry, I cannot help', single_responses={
+            'haleem': nutrition('Haleem', 350),
+        })
+        results = GeminiNutritionLookup(model=model).get_nutrition_batch(['haleem', 'nihari'])
+
+        assert len(model.prompts) == 3
+        assert results['haleem']['calories'] == 350
+        assert results['nihari'] is None
+
+    def test_duplicates_and_empty(self):
+        """Test that duplicates collapse and an empty batch makes no call"""
+        model = FakeModel('[]', single_responses={'haleem': nutrition('Haleem', 350)})
+        lookup = GeminiNutritionLookup(model=model)
+
+        assert lookup.get_nutrition_batch([]) == {}
+        results = lookup.get_nutrition_batch(['haleem', 'haleem'])
+        assert list(results) == ['haleem']
+        assert len(model.prompts) == 1
+
+
+class TestParserUsesBatch:
+    """Tests for FoodParser sending unknown foods as one batch"""
+
+    def test_unknown_foods_batched_and_cached(self):
+        """Test that unknown foods go to Gemini together and are cached together"""
+        model = FakeModel(json.dumps([
+            dict(nutrition('Haleem', 350), query='haleem'),
+            dict(nutrition('Nihari', 500), query='nihari'),
+        ]))
+        cache = Mock()
+        cache.get.return_value = None
+        parser = FoodParser({'banana': {'calories': 105, 'protein': 1.3, 'carbs': 27,
+                                        'fat': 0.4, 'fiber': 3.1, 'category': 'fruits'}},
+                            {}, {}, nutrition_cache=cache,
+                            gemini_lookup=GeminiNutritionLookup(model=model))
+
+        foods = parser.parse_food_text('haleem and nihari')
+
+        assert [f['name'] for f in foods] == ['Haleem', 'Nihari']
+        assert len(model.prompts) == 1
+        cache.set_many.assert_called_once()
+        assert set(cache.set_many.call_args.args[0]) == {'haleem', 'nihari'}
+
+    def test_split_food_names(self):
+        """Test splitting a meal description into food names"""
+        parser = FoodParser({}, {}, {})
+        assert parser.split_food_names('2 cups haleem, nihari with naan') == ['haleem', 'nihari', 'naan']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,181 @@
+"""
+Unit Tests for History Transfer
+Runs export and import against in-memory ChromaDB collections, plus the MongoDB migration records
+"""
+
+import pytest
+import sys
+import os
+import gzip
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.chromadb_client import ChatLogOperations, FoodLogOperations, UserOperations
+from utils.history_transfer import HistoryExporter, HistoryImporter, read_records
+
+
+def nutrition(calories):
+    return {'calories': calories, 'protein': 10, 'carbs': 20, 'fat': 5, 'fiber': 2}
+
+
+def fill(client, email, logs=5):
+    """Create a user with a few food logs and one chat log"""
+    UserOperations(client).create_user(email, 'Test', 'hash')
+    FoodLogOperations(client).create_logs(email, [{
+        'meal_type': 'lunch',
+        'foods': [{'name': 'Rice'}],
+        'total_nutrition': nutrition(100 + i),
+        'original_text': f"rice {i}",
+        'timestamp': datetime(2025, 11, 20, 12, i)
+    } for i in range(logs)])
+    ChatLogOperations(client).create_chat_log(email, 'hello', {'agent_response': 'hi'})
+
+
+def rows(collection):
+    page = collection.get(include=['documents', 'metadatas'])
+    return sorted(zip(page['ids'], page['documents'], page['metadatas']), key=lambda row: row[0])
+
+
+class CountingCollection:
+    """Wraps a collection and records get() calls"""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.gets = []
+
+    def get(self, **kwargs):
+        self.gets.append(kwargs)
+        return self._collection.get(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+class TestHistoryTransfer:
+    """Tests for paginated export and batched import"""
+
+    def test_user_export_round_trip(self, tmp_path, make_chroma_client):
+        """Test that one user's rows come back unchanged and other users are left out"""
+        source = make_chroma_client()
+        fill(source, 'a@example.com')
+        fill(source, 'b@example.com')
+        path = str(tmp_path / 'a.ndjson.gz')
+
+        assert HistoryExporter(source, batch_size=2).export(path, 'a@example.com') == 7
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            assert {json.loads(line)['kind'] for line in f} == {'users', 'food_logs', 'chat_logs'}
+
+        target = make_chroma_client()
+        counts = HistoryImporter(target, batch_size=2).import_file(path)
+        assert counts == {'users': 1, 'food_logs': 5, 'chat_logs': 1, 'skipped': 0, 'failed': 0}
+
+        for name in ('users', 'food_logs', 'chat_logs'):
+            source_rows = [row for row in rows(getattr(source, f"{name}_collection"))
+                           if 'a@example.com' in (row[2].get('user_id'), row[2].get('email'))]
+            assert rows(getattr(target, f"{name}_collection")) == source_rows
+
+        user = UserOperations(target).get_user_by_email('a@example.com')
+        assert user['name'] == 'Test'
+
+    def test_export_reads_in_pages(self, tmp_path, make_chroma_client):
+        """Test that the export reads bounded pages instead of whole collections"""
+        source = make_chroma_client()
+        fill(source, 'a@example.com', logs=7)
+        source.food_logs_collection = CountingCollection(source.food_logs_collection)
+
+        pages = list(HistoryExporter(source, batch_size=3).iter_pages(kinds=['food_logs']))
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert all(call['limit'] == 3 for call in source.food_logs_collection.gets)
+
+    def test_import_is_idempotent_and_refreshes_rollups(self, tmp_path, make_chroma_client):
+        """Test that re-importing keeps one copy and daily totals include imported logs"""
+        source = make_chroma_client()
+        fill(source, 'a@example.com', logs=3)
+        path = str(tmp_path / 'a.ndjson')
+        HistoryExporter(source).export(path, 'a@example.com', kinds=['food_logs'])
+
+        target = make_chroma_client()
+        target_logs = FoodLogOperations(target)
+        day = datetime(2025, 11, 20)
+        target_logs.create_logs('a@example.com', [{
+            'meal_type': 'dinner', 'foods': [{'name': 'Soup'}], 'total_nutrition': nutrition(50),
+            'original_text': 'soup', 'timestamp': datetime(2025, 11, 20, 19)
+        }])
+        assert target_logs.get_daily_total('a@example.com', day)['log_count'] == 1
+
+        importer = HistoryImporter(target)
+        importer.import_file(path)
+        importer.import_file(path)
+
+        assert target.food_logs_collection.count() == 4
+        totals = FoodLogOperations(target).get_daily_total('a@example.com', day)
+        assert totals['log_count'] == 4
+        assert totals['calories'] == 50 + 100 + 101 + 102
+
+    def test_unknown_kinds_are_skipped(self, make_chroma_client):
+        """Test that records for other collections are counted, not written"""
+        counts = HistoryImporter(make_chroma_client()).import_records([
+            {'kind': 'sessions', 'id': 's1', 'document': '', 'metadata': {}}
+        ])
+        assert counts['skipped'] == 1
+
+    def test_parquet_round_trip(self, tmp_path, make_chroma_client):
+        """Test that Parquet exports read back as the same records"""
+        pytest.importorskip('pyarrow')
+        source = make_chroma_client()
+        fill(source, 'a@example.com')
+        path = str(tmp_path / 'a.parquet')
+
+        exporter = HistoryExporter(source, batch_size=2)
+        exporter.export(path)
+        expected = [record for page in exporter.iter_pages() for record in page]
+        assert list(read_records(path)) == expected
+
+
+class FakeMongoCollection:
+    """Stands in for a pymongo collection; find() returns the documents"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.find_calls = []
+
+    def find(self, query, batch_size=None):
+        self.find_calls.append((query, batch_size))
+        return iter(self.docs)
+
+
+class TestMongoMigration:
+    """Tests for the MongoDB to ChromaDB migration records"""
+
+    def test_migrates_users_and_logs(self, make_chroma_client):
+        """Test that MongoDB documents land as app-readable ChromaDB rows"""
+        import migrate_mongo_to_chroma as migration
+
+        target = make_chroma_client()
+        importer = HistoryImporter(target, batch_size=2)
+        users = FakeMongoCollection([{
+            '_id': 'u1', 'email': 'a@example.com', 'name': 'Ann', 'password': 'hash',
+            'created_at': datetime(2024, 1, 1), 'goals': {'daily_calories': 1800}
+        }])
+        logs = FakeMongoCollection([{
+            '_id': f"65a0000000000000000000{i:02d}", 'user_id': 'a@example.com',
+            'timestamp': datetime(2024, 1, 2, 8 + i), 'meal_type': 'breakfast',
+            'foods': [{'name': 'Oats'}], 'total_nutrition': nutrition(200), 'original_text': 'oats'
+        } for i in range(3)])
+
+        assert migration.migrate_users(SimpleNamespace(users=users), importer, batch_size=2)
+        assert migration.migrate_food_logs(SimpleNamespace(food_logs=logs), importer, batch_size=2)
+        assert logs.find_calls == [({}, 2)]
+
+        user = UserOperations(target).get_user_by_email('a@example.com')
+        assert user['goals'] == {'daily_calories': 1800}
+        assert user['created_at'] == '2024-01-01T00:00:00'
+
+        imported = FoodLogOperations(target).get_user_logs('a@example.com')
+        assert [log['_id'] for log in imported] == [f"65a0000000000000000000{i:02d}" for i in (2, 1, 0)]
+        assert imported[0]['foods'] == [{'name': 'Oats'}]
+        assert FoodLogOperations(target).get_daily_total('a@example.com', datetime(2024, 1, 2))['log_count'] == 3
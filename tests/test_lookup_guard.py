@@ -0,0 +1,151 @@
+"""
+Unit Tests for Lookup Guard Module
+Tests per-call deadlines, bounded concurrency and the circuit breaker
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.lookup_guard import (
+    CircuitBreaker, LookupGuard, LookupTimeoutError, LookupUnavailableError
+)
+from utils.gemini_nutrition import GeminiNutritionLookup
+
+
+def fail():
+    raise ConnectionError('upstream down')
+
+
+@pytest.fixture
+def guard():
+    """Create a LookupGuard with short deadlines for testing"""
+    lookup_guard = LookupGuard(timeout=0.2, max_concurrency=2,
+                               breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.2))
+    yield lookup_guard
+    lookup_guard.shutdown()
+
+
+class TestDeadlines:
+    """Tests for per-call timeouts"""
+
+    def test_returns_result(self, guard):
+        """Test that a fast call returns its value"""
+        assert guard.call(lambda x: x * 2, 21) == 42
+        assert guard.get_stats()['succeeded'] == 1
+
+    def test_slow_call_times_out(self, guard):
+        """Test that the caller is released at the deadline"""
+        start = time.monotonic()
+        with pytest.raises(LookupTimeoutError):
+            guard.call(time.sleep, 1.0, timeout=0.05)
+        assert time.monotonic() - start < 0.5
+        assert guard.get_stats()['timed_out'] == 1
+
+    def test_errors_propagate(self, guard):
+        """Test that upstream exceptions reach the caller"""
+        with pytest.raises(ConnectionError):
+            guard.call(fail)
+        assert guard.get_stats()['failed'] == 1
+
+
+class TestConcurrency:
+    """Tests for the concurrency limit"""
+
+    def test_saturated_pool_rejects(self, guard):
+        """Test that callers beyond the limit give up at their deadline"""
+        release = threading.Event()
+        workers = [threading.Thread(target=guard.call, args=(release.wait, 1.0), kwargs={'timeout': 1.0})
+                   for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        time.sleep(0.05)
+
+        with pytest.raises(LookupUnavailableError):
+            guard.call(lambda: 'late', timeout=0.05)
+
+        release.set()
+        for worker in workers:
+            worker.join()
+        assert guard.get_stats()['saturated'] == 1
+        assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+class TestCircuitBreaker:
+    """Tests for opening, short-circuiting and recovery"""
+
+    def test_opens_after_threshold(self, guard):
+        """Test that repeated failures short-circuit later calls"""
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                guard.call(fail)
+        assert guard.breaker.state == CircuitBreaker.OPEN
+
+        calls = []
+        with pytest.raises(LookupUnavailableError):
+            guard.call(calls.append, 1)
+        assert calls == []
+        assert guard.get_stats()['short_circuited'] == 1
+
+    def test_half_open_trial_closes_on_success(self, guard):
+        """Test that one successful trial after the cool-down closes the circuit"""
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                guard.call(fail)
+        time.sleep(0.25)
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+        assert guard.call(lambda: 'ok') == 'ok'
+        assert guard.breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_trial_reopens_on_failure(self, guard):
+        """Test that a failed trial opens the circuit again"""
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                guard.call(fail)
+        time.sleep(0.25)
+        with pytest.raises(ConnectionError):
+            guard.call(fail)
+        assert guard.breaker.state == CircuitBreaker.OPEN
+        assert guard.breaker.times_opened == 2
+
+
+class TestGeminiFallback:
+    """Tests for GeminiNutritionLookup degrading instead of blocking"""
+
+    def test_hung_model_returns_none_quickly(self, guard):
+        """Test that a hung model yields no data within the deadline"""
+        hang = threading.Event()
+        model = SimpleNamespace(generate_content=lambda prompt: hang.wait(2.0))
+        lookup = GeminiNutritionLookup(model=model, guard=guard)
+
+        start = time.monotonic()
+        assert lookup.get_nutrition_data('haleem') is None
+        assert time.monotonic() - start < 0.5
+        hang.set()
+
+    def test_batch_not_retried_when_upstream_down(self, guard):
+        """Test that a failed batch does not fan out into single lookups"""
+        prompts = []
+
+        def generate_content(prompt):
+            prompts.append(prompt)
+            raise ConnectionError('upstream down')
+
+        lookup = GeminiNutritionLookup(model=SimpleNamespace(generate_content=generate_content), guard=guard)
+        for _ in range(2):
+            lookup.get_nutrition_data('warmup')
+        assert not lookup.available
+
+        results = lookup.get_nutrition_batch(['haleem', 'nihari'])
+        assert results == {'haleem': None, 'nihari': None}
+        assert len(prompts) == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,187 @@
+"""
+Unit Tests for Nutrition Cache Module
+Tests the in-memory LRU/TTL front cache and its interaction with ChromaDB
+"""
+
+import pytest
+import sys
+import os
+import time
+from unittest.mock import Mock
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.nutrition_cache import NutritionCache
+
+
+CACHED_DOC = {
+    'normalized_name': 'chicken biryani',
+    'name': 'Chicken Biryani',
+    'calories': '450',
+    'protein': '25',
+    'carbs': '55',
+    'fat': '14',
+    'fiber': '3',
+    'category': 'mixed',
+    'source': 'gemini',
+    'cached_at': '2025-11-20T10:00:00'
+}
+
+
+def make_cache(collection, **kwargs):
+    """Create a NutritionCache backed by a mocked collection"""
+    mock_client = Mock()
+    mock_client.collection.return_value = collection
+    cache = NutritionCache(mock_client, **kwargs)
+    cache.populate_from_static_db({'banana': {'calories': 105, 'protein': 1.3, 'carbs': 27,
+                                              'fat': 0.4, 'fiber': 3.1, 'category': 'fruits'}})
+    return cache
+
+
+@pytest.fixture
+def collection():
+    """Mocked ChromaDB collection holding one cached dish"""
+    mock_collection = Mock()
+
+    def get(ids=None, where=None, **kwargs):
+        if ids == [NutritionCache.cache_id('chicken biryani')]:
+            return {'ids': ids, 'metadatas': [CACHED_DOC]}
+        return {'ids': [], 'metadatas': []}
+
+    mock_collection.get.side_effect = get
+    return mock_collection
+
+
+class TestFrontCache:
+    """Tests for in-memory lookups in front of ChromaDB"""
+
+    def test_static_food_skips_chroma(self, collection):
+        """Test that static database foods never reach ChromaDB"""
+        cache = make_cache(collection)
+        assert cache.get('Banana')['source'] == 'static'
+        assert collection.get.call_count == 0
+
+    def test_repeated_hit_reaches_chroma_once(self, collection):
+        """Test that a cached dish is read from ChromaDB only once"""
+        cache = make_cache(collection)
+        first = cache.get('Chicken Biryani')
+        second = cache.get('chicken biryani ')
+        assert first == second
+        assert first['calories'] == 450.0
+        assert collection.get.call_count == 1
+
+    def test_known_miss_is_cached(self, collection):
+        """Test that unknown foods are remembered as misses"""
+        cache = make_cache(collection)
+        assert cache.get('dragon stew') is None
+        calls_after_miss = collection.get.call_count
+        assert cache.get('dragon stew') is None
+        assert collection.get.call_count == calls_after_miss
+        assert cache.get_stats()['negative_hits'] == 1
+
+    def test_returned_dict_is_a_copy(self, collection):
+        """Test that callers cannot mutate the cached entry"""
+        cache = make_cache(collection)
+        cache.get('chicken biryani')['calories'] = 0
+        assert cache.get('chicken biryani')['calories'] == 450.0
+
+    def test_entries_expire_after_ttl(self, collection):
+        """Test that entries go back to ChromaDB once the TTL passes"""
+        cache = make_cache(collection, ttl_seconds=0.05)
+        cache.get('chicken biryani')
+        time.sleep(0.1)
+        cache.get('chicken biryani')
+        assert collection.get.call_count == 2
+
+    def test_lru_eviction_counted(self, collection):
+        """Test that capacity evictions are counted"""
+        cache = make_cache(collection, max_entries=2)
+        for name in ['a dish', 'b dish', 'c dish']:
+            cache.get(name)
+        stats = cache.get_stats()
+        assert stats['evictions'] == 1
+        assert stats['size'] == 2
+
+
+class TestWriteThrough:
+    """Tests for set() keeping the front cache consistent"""
+
+    def test_set_replaces_known_miss(self, collection):
+        """Test that writing a food overrides an earlier known miss"""
+        cache = make_cache(collection)
+        assert cache.get('dragon stew') is None
+        cache.set('dragon stew', {'name': 'Dragon Stew', 'calories': 300, 'protein': 20,
+                                  'carbs': 10, 'fat': 15, 'fiber': 2, 'category': 'mixed'})
+        calls_after_set = collection.get.call_count
+        assert cache.get('dragon stew')['calories'] == 300.0
+        assert collection.get.call_count == calls_after_set
+
+    def test_invalidate_forces_reload(self, collection):
+        """Test that invalidate() sends the next lookup to ChromaDB"""
+        cache = make_cache(collection)
+        cache.get('chicken biryani')
+        cache.invalidate('Chicken Biryani')
+        cache.get('chicken biryani')
+        assert collection.get.call_count == 2
+
+    def test_stats_counters(self, collection):
+        """Test hit and miss counters"""
+        cache = make_cache(collection)
+        cache.get('chicken biryani')
+        cache.get('chicken biryani')
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+
+class TestUpsertWrites:
+    """Tests for deterministic ids and single-round-trip writes"""
+
+    def test_cache_id_is_deterministic(self):
+        """Test that ids depend only on the normalized name"""
+        assert NutritionCache.cache_id('Chicken Biryani ') == NutritionCache.cache_id('chicken biryani')
+        assert NutritionCache.cache_id('rice') != NutritionCache.cache_id('beans')
+
+    def test_set_is_single_upsert(self, collection):
+        """Test that set() writes with one upsert and no reads or deletes"""
+        cache = make_cache(collection)
+        cache.set('Dragon Stew', {'calories': 300, 'protein': 20, 'carbs': 10, 'fat': 15,
+                                  'fiber': 2, 'category': 'mixed'})
+        assert collection.upsert.call_count == 1
+        assert collection.get.call_count == 0
+        assert collection.delete.call_count == 0
+        assert collection.add.call_count == 0
+        kwargs = collection.upsert.call_args.kwargs
+        assert kwargs['ids'] == [NutritionCache.cache_id('dragon stew')]
+        assert kwargs['metadatas'][0]['normalized_name'] == 'dragon stew'
+
+    def test_set_many_batches_writes(self, collection):
+        """Test that set_many() writes all foods in one upsert"""
+        cache = make_cache(collection)
+        written = cache.set_many({
+            'Dragon Stew': {'calories': 300},
+            'dragon stew': {'calories': 320},
+            'Phoenix Wings': {'calories': 250},
+        })
+        assert written == 2
+        assert collection.upsert.call_count == 1
+        assert len(collection.upsert.call_args.kwargs['ids']) == 2
+        assert cache.get('dragon stew')['calories'] == 320.0
+
+    def test_set_many_empty(self, collection):
+        """Test that an empty batch does not touch ChromaDB"""
+        cache = make_cache(collection)
+        assert cache.set_many({}) == 0
+        assert collection.upsert.call_count == 0
+
+    def test_failed_upsert_not_cached(self, collection):
+        """Test that a failed write leaves the front cache untouched"""
+        collection.upsert.side_effect = RuntimeError('network down')
+        cache = make_cache(collection)
+        assert cache.set_many({'dragon stew': {'calories': 300}}) == 0
+        assert cache.get_stats()['size'] == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
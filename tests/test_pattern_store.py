@@ -0,0 +1,149 @@
+"""
+Unit Tests for Pattern Store Module
+Tests rolling 14-day patterns kept incrementally in day buckets
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.chromadb_client import FoodLogOperations
+from utils.pattern_store import PatternStore
+
+
+THRESHOLDS = {'low_protein': 60, 'high_calories': 2200}
+
+
+@pytest.fixture
+def food_log_ops(chroma_client):
+    """FoodLogOperations over fresh in-memory collections"""
+    return FoodLogOperations(chroma_client)
+
+
+@pytest.fixture
+def store(food_log_ops):
+    return PatternStore(food_log_ops)
+
+
+def log_at(food_log_ops, when, foods, calories, protein, meal_type='lunch'):
+    """Create a log as if it were written at `when`"""
+    with patch('utils.chromadb_client.datetime') as mock_datetime:
+        mock_datetime.now.return_value = when
+        mock_datetime.fromisoformat = datetime.fromisoformat
+        return food_log_ops.create_log(
+            'user@example.com', meal_type, [{'name': name} for name in foods],
+            {'calories': calories, 'protein': protein, 'carbs': 0, 'fat': 0, 'fiber': 0}, ''
+        )
+
+
+class TestRollingPatterns:
+    """Tests for patterns computed from day buckets"""
+
+    def test_empty_user(self, store):
+        """Test a user with no logs"""
+        patterns = store.get_patterns('user@example.com', THRESHOLDS)
+        assert patterns['total_meals'] == 0
+        assert patterns['food_frequency'] == {}
+
+    def test_counts_and_averages(self, food_log_ops, store):
+        """Test food frequency, meal types, averages and threshold days"""
+        now = datetime.now()
+        log_at(food_log_ops, now, ['Chicken', 'Rice'], 600, 50, 'lunch')
+        log_at(food_log_ops, now, ['Chicken'], 300, 30, 'dinner')
+        log_at(food_log_ops, now - timedelta(days=1), ['Pizza'], 2400, 20, 'dinner')
+
+        patterns = store.get_patterns('user@example.com', THRESHOLDS, now=now)
+
+        assert patterns['total_meals'] == 3
+        assert patterns['food_frequency'] == {'Chicken': 2, 'Rice': 1, 'Pizza': 1}
+        assert patterns['meal_times'] == {'lunch': 1, 'dinner': 2}
+        assert patterns['avg_calories'] == 1650
+        assert patterns['avg_protein'] == 50
+        assert patterns['low_protein_days'] == 1
+        assert patterns['high_calorie_days'] == 1
+
+    def test_old_days_expire(self, food_log_ops, store):
+        """Test that buckets older than the window are not counted"""
+        now = datetime.now()
+        log_at(food_log_ops, now - timedelta(days=20), ['Pizza'], 800, 20)
+        log_at(food_log_ops, now - timedelta(days=13), ['Salad'], 300, 10)
+
+        patterns = store.get_patterns('user@example.com', THRESHOLDS, now=now)
+        assert patterns['food_frequency'] == {'Salad': 1}
+
+    def test_delete_updates_counters(self, food_log_ops, store):
+        """Test that deleting a log removes its foods from the counters"""
+        now = datetime.now()
+        log = log_at(food_log_ops, now, ['Pizza'], 800, 20)
+        log_at(food_log_ops, now, ['Salad'], 300, 10)
+
+        food_log_ops.delete_log(log['_id'], 'user@example.com')
+        patterns = store.get_patterns('user@example.com', THRESHOLDS, now=now)
+        assert patterns['food_frequency'] == {'Salad': 1}
+        assert patterns['total_meals'] == 1
+
+    def test_reads_window_buckets_only(self, food_log_ops, store):
+        """Test that a warm query touches the day buckets, not the logs"""
+        log_at(food_log_ops, datetime.now(), ['Rice'], 200, 5)
+        store.get_patterns('user@example.com', THRESHOLDS)
+
+        with patch.object(food_log_ops, 'get_user_logs') as get_user_logs:
+            patterns = store.get_patterns('user@example.com', THRESHOLDS)
+        get_user_logs.assert_not_called()
+        assert patterns['total_meals'] == 1
+
+
+
+class TestSummary:
+    """Tests for the weekly-insight summary over day buckets"""
+
+    def log_day(self, food_log_ops, when, categories, calories, protein, carbs):
+        food_log_ops.create_logs('user@example.com', [{
+            'meal_type': 'lunch',
+            'foods': [{'name': category.title(), 'category': category} for category in categories],
+            'total_nutrition': {'calories': calories, 'protein': protein, 'carbs': carbs, 'fat': 0, 'fiber': 0},
+            'original_text': '',
+            'timestamp': when
+        }])
+
+    def test_empty_user(self, store):
+        """Test that a user with no logs has no logged days"""
+        summary = store.get_summary('user@example.com', days=7)
+        assert summary['days_logged'] == 0
+        assert summary['category_counts'] == {}
+
+    def test_averages_over_logged_days(self, food_log_ops, store):
+        """Test per-day averages over logged days and category counts, within the window"""
+        now = datetime.now()
+        self.log_day(food_log_ops, now, ['vegetables', 'protein'], 600, 50, 100)
+        self.log_day(food_log_ops, now, ['fast_food'], 900, 10, 100)
+        self.log_day(food_log_ops, now - timedelta(days=3), ['vegetables'], 300, 20, 50)
+        self.log_day(food_log_ops, now - timedelta(days=7), ['treats'], 5000, 0, 0)
+
+        summary = store.get_summary('user@example.com', days=7, now=now)
+
+        assert summary['days_logged'] == 2
+        assert (summary['avg_calories'], summary['avg_protein'], summary['avg_carbs']) == (900, 40, 125)
+        assert summary['category_counts'] == {'vegetables': 2, 'protein': 1, 'fast_food': 1}
+
+    def test_old_rollups_rebuilt_with_categories(self, food_log_ops, chroma_client, store):
+        """Test that a rollup stored before category counts existed is rebuilt from the logs"""
+        now = datetime.now()
+        self.log_day(food_log_ops, now, ['fruits'], 100, 1, 25)
+        rollups = chroma_client.daily_totals_collection
+        stored = rollups.get(include=['metadatas'])
+        metadata = {key: value for key, value in stored['metadatas'][0].items() if key != 'category_counts'}
+        rollups.delete(ids=stored['ids'])
+        rollups.add(ids=stored['ids'], documents=['old rollup'], metadatas=[metadata])
+
+        assert store.get_summary('user@example.com', days=1, now=now)['category_counts'] == {'fruits': 1}
+        assert 'category_counts' in rollups.get(include=['metadatas'])['metadatas'][0]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
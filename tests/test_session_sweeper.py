@@ -0,0 +1,116 @@
+"""
+Unit Tests for Session Expiry Sweeper
+Runs SessionOperations against an in-memory ChromaDB to test batched expiry deletes
+"""
+
+import pytest
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.chromadb_client import SessionOperations
+from utils.session_sweeper import SessionSweeper
+
+
+@pytest.fixture
+def session_ops(chroma_client):
+    return SessionOperations(chroma_client)
+
+
+def add_sessions(session_ops, count, expiry, prefix):
+    for i in range(count):
+        session_ops.save_session(f"{prefix}-{i}", 'user@example.com', expiry, '{}')
+
+
+class TestCleanupExpiredSessions:
+    """Tests for the pushed-down expiry delete"""
+
+    def test_deletes_only_expired(self, session_ops):
+        """Test that live sessions survive and expired ones are removed in batches"""
+        add_sessions(session_ops, 7, datetime.now() - timedelta(hours=1), 'old')
+        add_sessions(session_ops, 3, datetime.now() + timedelta(days=1), 'live')
+
+        assert session_ops.cleanup_expired_sessions(batch_size=3) == 7
+        remaining = session_ops.collection.get(include=[])['ids']
+        assert sorted(remaining) == ['live-0', 'live-1', 'live-2']
+
+    def test_max_batches_bounds_work(self, session_ops):
+        """Test that one call stops after max_batches"""
+        add_sessions(session_ops, 10, datetime.now() - timedelta(hours=1), 'old')
+        assert session_ops.cleanup_expired_sessions(batch_size=4, max_batches=1) == 4
+        assert session_ops.cleanup_expired_sessions(batch_size=4) == 6
+
+    def test_backfill_makes_legacy_sessions_sweepable(self, session_ops):
+        """Test that sessions stored with only an ISO expiry get expires_at"""
+        session_ops.collection.add(
+            ids=['legacy'], documents=['user@example.com'],
+            metadatas=[{'id': 'legacy', 'user_id': 'user@example.com',
+                        'expiration': (datetime.now() - timedelta(days=1)).isoformat()}]
+        )
+        assert session_ops.cleanup_expired_sessions() == 0
+        assert session_ops.backfill_expiry() == 1
+        assert session_ops.cleanup_expired_sessions() == 1
+        assert session_ops.backfill_expiry() == 0
+
+    def test_update_never_creates(self, session_ops):
+        """Test that update_session rewrites a stored session but does not restore a deleted one"""
+        expiry = datetime.now() + timedelta(days=1)
+        session_ops.save_session('s1', 'user@example.com', expiry, '{}')
+        assert session_ops.update_session('s1', 'user@example.com', expiry + timedelta(days=1), '{"a":1}')
+        assert session_ops.get_session('s1')['data'] == '{"a":1}'
+
+        session_ops.delete_session('s1')
+        session_ops.update_session('s1', 'user@example.com', expiry, '{}')
+        assert session_ops.get_session('s1') is None
+
+    def test_update_is_one_write(self, session_ops):
+        """Test that update_session costs a single round trip"""
+        session_ops.save_session('s1', 'user@example.com', datetime.now() + timedelta(days=1), '{}')
+        session_ops.collection = Mock(wraps=session_ops.collection)
+        assert session_ops.update_session('s1', 'user@example.com', datetime.now() + timedelta(days=2), '{}')
+        assert [name for name, _, _ in session_ops.collection.method_calls] == ['update']
+
+    def test_failed_backfill_returns_none(self, session_ops):
+        """Test that a backfill stopped by an error reports None, so its run-once marker is not stored"""
+        session_ops.collection = Mock(get=Mock(side_effect=RuntimeError('offline')))
+        assert session_ops.backfill_expiry() is None
+
+
+class TestSessionSweeper:
+    """Tests for the background sweeper"""
+
+    def test_sweep_reports_stats(self, session_ops):
+        """Test that a sweep records deletions and timing"""
+        add_sessions(session_ops, 5, datetime.now() - timedelta(hours=1), 'old')
+        sweeper = SessionSweeper(session_ops, interval=3600, batch_size=2)
+
+        assert sweeper.sweep() == 5
+        stats = sweeper.get_stats()
+        assert stats['sweeps'] == 1
+        assert stats['last_deleted'] == stats['deleted_total'] == 5
+        assert stats['last_duration_ms'] >= 0 and stats['last_run']
+        assert stats['running'] is False
+
+    def test_background_thread_sweeps(self, session_ops):
+        """Test that the scheduler runs sweeps and stops cleanly"""
+        add_sessions(session_ops, 2, datetime.now() - timedelta(hours=1), 'old')
+        sweeper = SessionSweeper(session_ops, interval=0.05)
+        sweeper.start()
+        try:
+            for _ in range(100):
+                if sweeper.get_stats()['deleted_total'] == 2:
+                    break
+                time.sleep(0.02)
+        finally:
+            sweeper.stop()
+        assert sweeper.get_stats()['deleted_total'] == 2
+        assert not sweeper._thread.is_alive()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
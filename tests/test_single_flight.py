@@ -0,0 +1,211 @@
+"""
+Unit Tests for Single Flight Module
+Tests coalescing of identical concurrent lookups and the issued/coalesced metrics
+"""
+
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.single_flight import SingleFlight
+from utils.gemini_nutrition import GeminiNutritionLookup
+
+
+def run_concurrently(target, count):
+    """Start count threads on target and collect their return values"""
+    results = [None] * count
+
+    def worker(i):
+        results[i] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight:
+    """Tests for the SingleFlight group"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that callers arriving during a call reuse its result"""
+        group = SingleFlight()
+        executions = []
+
+        def slow():
+            executions.append(1)
+            time.sleep(0.1)
+            return 'haleem'
+
+        results = run_concurrently(lambda: group.do('haleem', slow), 8)
+
+        assert len(executions) == 1
+        assert all(result == 'haleem' for result, _ in results)
+        # Only the followers report a shared result, not the caller that ran slow()
+        assert sum(1 for _, shared in results if shared) == 7
+        assert group.get_stats() == {'issued': 1, 'coalesced': 7, 'in_flight': 0}
+
+    def test_sequential_calls_not_coalesced(self):
+        """Test that a finished call is not reused by later callers"""
+        group = SingleFlight()
+        assert group.do('rice', lambda: 1) == (1, False)
+        assert group.do('rice', lambda: 2) == (2, False)
+        assert group.get_stats()['issued'] == 2
+
+    def test_distinct_keys_run_separately(self):
+        """Test that different keys do not wait on each other"""
+        group = SingleFlight()
+        assert group.do('rice', lambda: 'rice')[0] == 'rice'
+        assert group.do('beans', lambda: 'beans')[0] == 'beans'
+        assert group.get_stats()['coalesced'] == 0
+
+    def test_error_shared_with_followers(self):
+        """Test that followers see the leader's exception and the key is released"""
+        group = SingleFlight()
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise ConnectionError('upstream down')
+
+        errors = []
+
+        def call():
+            try:
+                group.do('stew', failing)
+            except ConnectionError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        leader.join()
+        follower.join()
+
+        assert len(errors) == 2
+        assert group.get_stats()['in_flight'] == 0
+
+    def test_do_many_sends_only_keys_not_in_flight(self):
+        """Test that a batch joins keys already in flight and leads the rest in one call"""
+        group = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def slow_rice():
+            started.set()
+            release.wait()
+            return 'rice'
+
+        single = threading.Thread(target=lambda: group.do('rice', slow_rice))
+        single.start()
+        started.wait()
+
+        batches = []
+
+        def fetch(keys):
+            batches.append(keys)
+            release.set()
+            return {key: key for key in keys}
+
+        results, shared = group.do_many(['rice', 'beans', 'beans'], fetch)
+        single.join()
+
+        assert batches == [['beans']]
+        assert results == {'rice': 'rice', 'beans': 'beans'}
+        assert shared == {'rice'}
+        assert group.get_stats() == {'issued': 2, 'coalesced': 1, 'in_flight': 0}
+
+
+class TestGeminiCoalescing:
+    """Tests for GeminiNutritionLookup.get_nutrition_data coalescing"""
+
+    def test_trending_dish_issues_one_upstream_call(self):
+        """Test that concurrent lookups of one dish share a single model call"""
+        prompts = []
+
+        def generate_content(prompt):
+            prompts.append(prompt)
+            time.sleep(0.1)
+            return SimpleNamespace(text=json.dumps({
+                'name': 'Haleem', 'calories': 350, 'protein': 20, 'carbs': 30,
+                'fat': 15, 'fiber': 5, 'category': 'mixed'
+            }))
+
+        lookup = GeminiNutritionLookup(model=SimpleNamespace(generate_content=generate_content))
+        names = ['Haleem', 'haleem ', 'HALEEM', 'haleem', 'Haleem ', 'haleem']
+        results = run_concurrently(lambda: lookup.get_nutrition_data(names.pop()), 6)
+
+        assert len(prompts) == 1
+        assert all(result['calories'] == 350 for result in results)
+        assert len({id(result) for result in results}) == 6
+
+        stats = lookup.get_lookup_stats()
+        assert stats['issued'] == 1
+        assert stats['coalesced'] == 5
+        assert stats['guard']['calls'] == 1
+
+    def test_concurrent_batches_share_one_upstream_call(self):
+        """Test that identical batches (the parser's path) coalesce per name"""
+        prompts = []
+
+        def generate_content(prompt):
+            prompts.append(prompt)
+            time.sleep(0.1)
+            return SimpleNamespace(text=json.dumps([
+                {'query': name, 'name': name.title(), 'calories': 300, 'protein': 20, 'carbs': 30,
+                 'fat': 15, 'fiber': 5, 'category': 'mixed'}
+                for name in ('haleem', 'nihari')
+            ]))
+
+        lookup = GeminiNutritionLookup(model=SimpleNamespace(generate_content=generate_content))
+        results = run_concurrently(lambda: lookup.get_nutrition_batch(['haleem', 'nihari']), 4)
+
+        assert len(prompts) == 1
+        assert all(result['nihari']['calories'] == 300 for result in results)
+        stats = lookup.get_lookup_stats()
+        assert stats['batch_lookups'] == 8
+        assert stats['batch_coalesced'] == 6
+
+    def test_batch_skips_names_already_in_flight(self):
+        """Test that a batch only asks upstream for names no other lookup is fetching"""
+        prompts = []
+        started, release = threading.Event(), threading.Event()
+
+        def generate_content(prompt):
+            prompts.append(prompt)
+            if 'Food: haleem\n' in prompt:
+                started.set()
+                release.wait()
+            name = 'haleem' if 'haleem' in prompt else 'nihari'
+            release.set()
+            return SimpleNamespace(text=json.dumps({
+                'name': name.title(), 'calories': 300, 'protein': 20, 'carbs': 30,
+                'fat': 15, 'fiber': 5, 'category': 'mixed'
+            }))
+
+        lookup = GeminiNutritionLookup(model=SimpleNamespace(generate_content=generate_content))
+        single = threading.Thread(target=lambda: lookup.get_nutrition_data('haleem'))
+        single.start()
+        started.wait()
+        results = lookup.get_nutrition_batch(['Haleem', 'nihari'])
+        single.join()
+
+        assert len(prompts) == 2
+        assert 'Food: nihari\n' in prompts[1]
+        assert results['Haleem']['name'] == 'Haleem' and results['nihari']['name'] == 'Nihari'
+        assert lookup.get_lookup_stats()['batch_coalesced'] == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
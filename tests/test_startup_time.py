@@ -0,0 +1,75 @@
+"""
+Startup Benchmark Tests
+Imports the app in a fresh interpreter with `python -X importtime` and checks
+that heavy dependencies stay out of the startup path
+"""
+
+import pytest
+import sys
+import os
+import subprocess
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+# Loaded on first lookup / first agent run, never while importing the app
+DEFERRED_MODULES = ['google.generativeai', 'langgraph.graph', 'langchain_core']
+
+
+def import_with_timing(statement, cwd):
+    """
+    Run `statement` under -X importtime in a new interpreter
+
+    Returns:
+        (stdout, {module: cumulative microseconds})
+    """
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, CHROMA_USE_LOCAL='true', PYTHONWARNINGS='ignore')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, _, cumulative, module = (part.strip() for part in line.replace('import time:', '|', 1).split('|'))
+        timings[module] = int(cumulative)
+    return result.stdout, timings
+
+
+@pytest.fixture(scope='module')
+def app_startup(tmp_path_factory):
+    """One cold import of app.py (local ChromaDB in a scratch directory)"""
+    return import_with_timing('import app', str(tmp_path_factory.mktemp('startup')))
+
+
+class TestStartupImports:
+    """Tests for what app startup loads"""
+
+    def test_report_startup_time(self, app_startup):
+        """Report the cumulative import time of the app module"""
+        _, timings = app_startup
+        print(f"\nimport app: {timings['app'] / 1e6:.2f}s")
+        assert timings['app'] > 0
+
+    @pytest.mark.parametrize('module', DEFERRED_MODULES)
+    def test_heavy_modules_deferred(self, app_startup, module):
+        """Test that SDK and graph libraries are not imported at startup"""
+        _, timings = app_startup
+        assert module not in timings
+
+    def test_single_chroma_client(self, app_startup):
+        """Test that the external blueprint reuses the app's ChromaDB client"""
+        stdout, _ = app_startup
+        assert stdout.count('Using local ChromaDB storage') == 1
+
+    def test_agent_module_import_is_light(self, tmp_path):
+        """Test that importing the agents does not compile their graphs"""
+        _, timings = import_with_timing('import agent, agent_chat', str(tmp_path))
+        for module in DEFERRED_MODULES:
+            assert module not in timings
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short', '-s'])
@@ -0,0 +1,135 @@
+"""
+Unit Tests for User History View Module
+Tests single-load history windows shared across the request pipeline
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.user_history import UserHistoryView
+from utils.recommendation_engine import RecommendationEngine
+
+
+NOW = datetime(2025, 11, 20, 18, 0, 0)
+
+
+def make_log(days_ago, hour=12, calories=100, protein=10, food='Rice'):
+    timestamp = (NOW - timedelta(days=days_ago)).replace(hour=hour, minute=0)
+    return {
+        'timestamp': timestamp.isoformat(),
+        'meal_type': 'lunch',
+        'foods': [{'name': food}],
+        'total_nutrition': {'calories': calories, 'protein': protein}
+    }
+
+
+@pytest.fixture
+def history():
+    """Two logs a day for the last 30 days, newest first"""
+    logs = [make_log(days_ago, hour) for days_ago in range(30) for hour in (13, 8)]
+    return UserHistoryView(logs, now=NOW)
+
+
+class TestWindows:
+    """Tests for date windows over one loaded history"""
+
+    def test_today(self, history):
+        """Test that today's window holds only today's logs"""
+        today = history.today()
+        assert len(today) == 2
+        assert all(log['timestamp'].startswith('2025-11-20') for log in today)
+
+    def test_last_days(self, history):
+        """Test 7/14/30-day windows"""
+        assert len(history.last_days(7)) == 14
+        assert len(history.last_days(14)) == 28
+        assert len(history.last_days(30)) == 60
+
+    def test_windows_share_storage(self, history):
+        """Test that windows are views over the same list, not copies"""
+        week = history.last_days(7)
+        assert week._logs is history._logs
+        assert week.today()._logs is history._logs
+        assert week[0] is history[0]
+
+    def test_nested_window_cannot_grow(self, history):
+        """Test that a wider window taken from a narrow one stays narrow"""
+        assert len(history.today().last_days(30)) == 2
+
+    def test_behaves_like_list(self, history):
+        """Test sequence behaviour used by existing callers"""
+        week = history.last_days(7)
+        assert list(week) == week[:]
+        assert week[-1] is history[13]
+        assert bool(history.since(NOW + timedelta(days=1))) is False
+        with pytest.raises(IndexError):
+            week[14]
+
+    def test_from_logs_sorts(self):
+        """Test that unordered client-supplied logs are sorted newest first"""
+        view = UserHistoryView.from_logs([make_log(3), make_log(0), make_log(1)], now=NOW)
+        assert [log['timestamp'][:10] for log in view] == ['2025-11-20', '2025-11-19', '2025-11-17']
+
+
+class TestLoading:
+    """Tests for the single store query"""
+
+    def test_load_queries_once(self):
+        """Test that load() issues one ranged query for the widest window"""
+        food_log_ops = Mock()
+        food_log_ops.get_user_logs.return_value = [make_log(0), make_log(10)]
+
+        view = UserHistoryView.load(food_log_ops, 'user@example.com', days=30, now=NOW)
+        view.today()
+        view.last_days(14)
+
+        food_log_ops.get_user_logs.assert_called_once_with(
+            'user@example.com', start_date=NOW - timedelta(days=30)
+        )
+        assert len(view.last_days(7)) == 1
+
+    def test_load_in_background_waits_on_first_use(self):
+        """Test that a background view runs the query on the executor and fills in lazily"""
+        from concurrent.futures import ThreadPoolExecutor
+        import threading
+
+        release = threading.Event()
+        food_log_ops = Mock()
+        food_log_ops.get_user_logs.side_effect = lambda *args, **kwargs: (
+            release.wait(5), [make_log(0), make_log(10)]
+        )[1]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            view = UserHistoryView.load_in_background(food_log_ops, 'user@example.com', executor,
+                                                      days=30, now=NOW)
+            assert isinstance(view, UserHistoryView)
+            release.set()
+            assert len(view) == 2
+            assert len(view.last_days(7)) == 1
+        food_log_ops.get_user_logs.assert_called_once()
+
+
+class TestRecommendationEngineWithView:
+    """Tests for the recommendation engine reading windows from the view"""
+
+    @pytest.fixture
+    def engine(self):
+        return RecommendationEngine({'low_protein': 60, 'good_protein': 80, 'target_protein': 120,
+                                     'high_calories': 2200, 'low_calories': 1200, 'target_calories': 2000},
+                                    {})
+
+    def test_patterns_use_last_14_days(self, engine, history):
+        """Test that patterns cover the last two weeks, not the oldest logs"""
+        patterns = engine.analyze_patterns(history)
+        assert patterns['total_meals'] == 28
+        assert patterns['avg_calories'] == 200
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
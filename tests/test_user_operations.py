@@ -0,0 +1,115 @@
+"""
+Unit Tests for User Operations
+Runs UserOperations against an in-memory ChromaDB to test id-derived lookups and the profile cache
+"""
+
+import pytest
+import sys
+import os
+import uuid
+from unittest.mock import Mock
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.chromadb_client import UserOperations
+
+
+class CountingCollection:
+    """Wraps a collection and counts get() calls"""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.gets = []
+
+    def get(self, **kwargs):
+        self.gets.append(kwargs)
+        return self._collection.get(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+@pytest.fixture
+def collection(chroma_client):
+    return CountingCollection(chroma_client.users_collection)
+
+
+@pytest.fixture
+def user_ops(chroma_client, collection):
+    chroma_client.users_collection = collection
+    return UserOperations(chroma_client)
+
+
+GOALS = {'daily_calories': 1800, 'daily_protein': 100, 'daily_carbs': 200, 'daily_fat': 60}
+
+
+class TestUserOperations:
+    """Tests for id-derived users and the profile cache"""
+
+    def test_id_derived_from_email(self, user_ops):
+        """Test that the same email always maps to the same id"""
+        result = user_ops.create_user('a@example.com', 'A', 'hash', GOALS)
+        assert result['user_id'] == UserOperations.user_id_for('a@example.com')
+        assert UserOperations.user_id_for('a@example.com') != UserOperations.user_id_for('b@example.com')
+
+    def test_duplicate_rejected(self, user_ops):
+        """Test that registering an email twice fails"""
+        assert user_ops.create_user('a@example.com', 'A', 'hash')['success']
+        assert user_ops.create_user('a@example.com', 'A', 'hash') == {'success': False, 'error': 'User already exists'}
+
+    def test_lookup_by_id_then_cached(self, user_ops, collection):
+        """Test that a lookup reads by id once and is then served from memory"""
+        user_ops.create_user('a@example.com', 'A', 'hash', GOALS)
+        user_ops._cache.clear()
+        collection.gets.clear()
+
+        for _ in range(3):
+            user = user_ops.get_user_by_email('a@example.com')
+            assert user['goals'] == GOALS and user['name'] == 'A'
+        assert collection.gets == [{'ids': [UserOperations.user_id_for('a@example.com')]}]
+
+    def test_callers_cannot_mutate_cache(self, user_ops):
+        """Test that changing a returned profile does not change the cached one"""
+        user_ops.create_user('a@example.com', 'A', 'hash', GOALS)
+        user_ops.get_user_by_email('a@example.com')['goals']['daily_calories'] = 0
+        assert user_ops.get_user_by_email('a@example.com')['goals'] == GOALS
+
+    def test_goal_update_writes_through(self, user_ops):
+        """Test that updated goals are seen at once and survive a cache flush"""
+        user_ops.create_user('a@example.com', 'A', 'hash', GOALS)
+        user_ops.get_user_by_email('a@example.com')
+        new_goals = dict(GOALS, daily_calories=2200)
+
+        assert user_ops.update_user_goals('a@example.com', new_goals)
+        assert user_ops.get_user_by_email('a@example.com')['goals'] == new_goals
+        user_ops._cache.clear()
+        assert user_ops.get_user_by_email('a@example.com')['goals'] == new_goals
+
+    def test_unknown_user(self, user_ops):
+        """Test lookups for an email that is not registered"""
+        assert user_ops.get_user_by_email('nobody@example.com') is None
+        assert not user_ops.user_exists('nobody@example.com')
+        assert not user_ops.update_user_goals('nobody@example.com', GOALS)
+
+    def test_backfill_moves_random_ids(self, user_ops, collection):
+        """Test that users stored under random ids are re-keyed by email"""
+        for i in range(5):
+            collection.add(ids=[str(uuid.uuid4())], documents=[f"u{i}@example.com"],
+                           metadatas=[{'email': f"u{i}@example.com", 'name': f"U{i}", 'password': 'hash',
+                                       'created_at': '', 'goals': '{}'}])
+        user_ops.create_user('a@example.com', 'A', 'hash')
+
+        assert user_ops.backfill_user_ids(batch_size=2) == 5
+        assert user_ops.get_user_by_email('u3@example.com')['name'] == 'U3'
+        assert collection.count() == 6
+        assert user_ops.backfill_user_ids() == 0
+
+    def test_failed_backfill_returns_none(self, user_ops):
+        """Test that a backfill stopped by an error reports None, so its run-once marker is not stored"""
+        user_ops.collection = Mock(get=Mock(side_effect=RuntimeError('offline')))
+        assert user_ops.backfill_user_ids() is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])